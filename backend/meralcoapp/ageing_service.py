@@ -0,0 +1,173 @@
+from django.db import connection, transaction
+from django.db.models import Count, Max, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import AgeingAnalysis, AgeingRunSummary, WorkOrder
+
+
+class AgeingAnalysisService:
+    """
+    Set-based generation of AgeingAnalysis runs.
+
+    Every open, energized work order gets one row per analysis_date. On
+    PostgreSQL age, months and bracket are computed with CASE expressions and
+    the whole run is written by a single INSERT ... SELECT; other backends
+    compute the same values from one values_list() query and bulk_create().
+    Regenerating a date replaces its previous run inside the same transaction.
+
+    Each run also writes its AgeingRunSummary rows, so the summary endpoints
+    don't scan ageing_analysis.
+    """
+
+    OPEN_STATUSES = ['NEW', 'FOR AUDIT', 'NO COC']
+
+    # (upper bound in months, bracket); anything above the last bound is '10+'
+    BRACKETS = [(3, '0-3'), (6, '4-6'), (9, '7-9')]
+    OLDEST_BRACKET = '10+'
+
+    @classmethod
+    def bracket_for(cls, age_months):
+        for upper, bracket in cls.BRACKETS:
+            if age_months <= upper:
+                return bracket
+        return cls.OLDEST_BRACKET
+
+    @classmethod
+    def generate(cls, analysis_date=None):
+        """Replace the run for analysis_date (default today); returns the number of rows"""
+        analysis_date = analysis_date or timezone.now().date()
+
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Serialize concurrent runs for the same date so they can't interleave
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT pg_advisory_xact_lock(hashtext('ageing_analysis'), %s)",
+                        [analysis_date.toordinal()]
+                    )
+
+            AgeingAnalysis.objects.filter(analysis_date=analysis_date).delete()
+
+            if connection.vendor == 'postgresql':
+                count = cls._insert_select(analysis_date)
+            else:
+                count = cls._bulk_create(analysis_date)
+
+            cls.summarize(analysis_date)
+
+        return count
+
+    @classmethod
+    def _insert_select(cls, analysis_date):
+        quote = connection.ops.quote_name
+        ageing = AgeingAnalysis._meta
+        work_orders = WorkOrder._meta
+
+        def column(opts, name):
+            return quote(opts.get_field(name).column)
+
+        bracket_case = 'CASE ' + ' '.join(
+            f"WHEN age_in_months <= {upper} THEN '{bracket}'" for upper, bracket in cls.BRACKETS
+        ) + f" ELSE '{cls.OLDEST_BRACKET}' END"
+
+        target_columns = ', '.join(column(ageing, name) for name in [
+            'analysis_date', 'work_order', 'age_bracket', 'age_in_days', 'age_in_months',
+            'supervisor', 'crew', 'status_at_analysis', 'created_at',
+        ])
+
+        sql = f"""
+            INSERT INTO {quote(ageing.db_table)} ({target_columns})
+            SELECT %s, wo_id, {bracket_case}, age_in_days, age_in_months,
+                   supervisor_id, crew, status, %s
+            FROM (
+                SELECT {column(work_orders, 'wo_id')} AS wo_id,
+                       {column(work_orders, 'supervisor')} AS supervisor_id,
+                       {column(work_orders, 'assigned_crew')} AS crew,
+                       {column(work_orders, 'status')} AS status,
+                       age_in_days,
+                       FLOOR(age_in_days / 30.0)::integer AS age_in_months
+                FROM (
+                    SELECT *, (%s::date - {column(work_orders, 'date_energized')}) AS age_in_days
+                    FROM {quote(work_orders.db_table)}
+                    WHERE {column(work_orders, 'status')} = ANY(%s)
+                      AND {column(work_orders, 'date_energized')} IS NOT NULL
+                ) aged
+            ) open_work_orders
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [analysis_date, timezone.now(), analysis_date, cls.OPEN_STATUSES])
+            return cursor.rowcount
+
+    @classmethod
+    def _bulk_create(cls, analysis_date):
+        rows = WorkOrder.objects.filter(
+            status__in=cls.OPEN_STATUSES,
+            date_energized__isnull=False
+        ).values_list('wo_id', 'date_energized', 'supervisor_id', 'assigned_crew', 'status')
+
+        records = []
+        for wo_id, date_energized, supervisor_id, crew, status in rows.iterator(chunk_size=2000):
+            age_days = (analysis_date - date_energized).days
+            age_months = age_days // 30
+            records.append(AgeingAnalysis(
+                analysis_date=analysis_date,
+                work_order_id=wo_id,
+                age_bracket=cls.bracket_for(age_months),
+                age_in_days=age_days,
+                age_in_months=age_months,
+                supervisor_id=supervisor_id,
+                crew=crew,
+                status_at_analysis=status
+            ))
+        AgeingAnalysis.objects.bulk_create(records, batch_size=1000)
+        return len(records)
+
+    # ------------------------------------------------------------------
+    # Summaries
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def summarize(cls, analysis_date):
+        """Rewrite the AgeingRunSummary rows for one run from its ageing_analysis rows"""
+        groups = AgeingAnalysis.objects.filter(analysis_date=analysis_date).order_by().values(
+            'age_bracket', 'supervisor_id',
+            crew_key=Coalesce('crew', Value(''))
+        ).annotate(
+            wo_count=Count('id'),
+            manhours=Sum('work_order__total_manhours')
+        )
+
+        with transaction.atomic():
+            AgeingRunSummary.objects.filter(analysis_date=analysis_date).delete()
+            AgeingRunSummary.objects.bulk_create([
+                AgeingRunSummary(
+                    analysis_date=analysis_date,
+                    age_bracket=group['age_bracket'],
+                    supervisor_id=group['supervisor_id'],
+                    crew=group['crew_key'],
+                    wo_count=group['wo_count'],
+                    total_manhours=group['manhours'] or 0
+                )
+                for group in groups
+            ], batch_size=1000)
+
+    @classmethod
+    def latest_run_date(cls):
+        """
+        Date of the most recent run, or None if no run has been generated.
+
+        Read from the database on every call (MAX over the analysis_date index
+        is a single index lookup). The nightly run happens in another process
+        and the default cache is per process, so a cached date would go stale.
+        """
+        return AgeingRunSummary.objects.aggregate(latest=Max('analysis_date'))['latest']
+
+    @classmethod
+    def bracket_summary(cls, analysis_date):
+        """Counts and manhours per bracket for one run"""
+        return AgeingRunSummary.objects.filter(
+            analysis_date=analysis_date
+        ).values('age_bracket').annotate(
+            count=Sum('wo_count'),
+            total_manhours=Sum('total_manhours')
+        ).order_by('age_bracket')
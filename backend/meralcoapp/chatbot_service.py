@@ -1,25 +1,31 @@
 import json
-from sentence_transformers import SentenceTransformer, util
 from django.conf import settings
-import torch
+from .embedding_index import EmbeddingIndex
+from .model_loading import LazyLoadedService
 
-class ChatbotService:
-    _instance = None
+class ChatbotService(LazyLoadedService):
+    """
+    Semantic-search chatbot over the knowledge base.
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ChatbotService, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    The SentenceTransformer (and torch) are imported and loaded on first use,
+    not when this module is imported (see LazyLoadedService).
+    """
     
-    def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
+    EMPTY_QUESTION_RESPONSE = "Please ask me a question about the Smart Vendor Monitoring System."
+    ERROR_RESPONSE = "I encountered an error. Please try rephrasing your question."
+    
+    def load(self):
         self.load_config()
     
+    def status(self):
+        status = super().status()
+        status['knowledge_base_size'] = len(self.kb_questions) if self.is_ready else None
+        return status
+    
     def load_config(self):
         """Load chatbot configuration and knowledge base"""
+        from sentence_transformers import SentenceTransformer
+        
         try:
             with open(settings.CHATBOT_CONFIG_PATH, 'r', encoding='utf-8') as f:
                 config = json.load(f)
@@ -41,13 +47,8 @@ class ChatbotService:
             # Extract just the questions for encoding
             self.kb_questions = [qa['question'] for qa in self.qa_pairs]
             
-            # Encode all questions
-            print("🔄 Encoding knowledge base questions...")
-            self.kb_embeddings = self.model.encode(
-                self.kb_questions, 
-                convert_to_tensor=True,
-                show_progress_bar=False
-            )
+            # Encode all questions (only new or edited ones when the embedding index is on)
+            self.kb_embeddings = self.load_kb_embeddings(config['model_name'])
             
             print(f"✅ Chatbot loaded with {len(self.kb_questions)} Q&A pairs")
             
@@ -60,6 +61,29 @@ class ChatbotService:
             print(f"❌ Error loading chatbot config: {e}")
             raise
     
+    def load_kb_embeddings(self, model_name):
+        """
+        Embedding tensor of kb_questions.
+        
+        With CHATBOT_EMBEDDINGS_DIR set the matrix comes from the persisted
+        EmbeddingIndex, memory-mapped and wrapped without a copy; otherwise
+        every question is encoded.
+        """
+        import torch
+        
+        directory = getattr(settings, 'CHATBOT_EMBEDDINGS_DIR', None)
+        if not directory:
+            print("🔄 Encoding knowledge base questions...")
+            return self.model.encode(self.kb_questions, convert_to_tensor=True, show_progress_bar=False)
+        
+        def encode(questions):
+            print(f"🔄 Encoding {len(questions)} new or changed knowledge base questions...")
+            return self.model.encode(questions, convert_to_numpy=True, show_progress_bar=False)
+        
+        matrix, _ = EmbeddingIndex(directory, model_name).load(self.kb_questions, encode)
+        # Same device as the question embeddings (a no-op on CPU)
+        return torch.from_numpy(matrix).to(self.model.device)
+    
     def answer(self, question, context_data=None, threshold=0.35):
         """
         Answer a question using semantic search
@@ -73,11 +97,16 @@ class ChatbotService:
             Answer string
         """
         try:
+            import torch
+            from sentence_transformers import util
+            
             # Clean the question
             question = question.strip()
             
             if not question:
-                return "Please ask me a question about the Smart Vendor Monitoring System."
+                return self.EMPTY_QUESTION_RESPONSE
+            
+            self.ensure_loaded()
             
             # Encode the user's question
             q_embedding = self.model.encode(question, convert_to_tensor=True)
@@ -113,7 +142,59 @@ class ChatbotService:
                 
         except Exception as e:
             print(f"❌ Error in answer(): {e}")
-            return "I encountered an error. Please try rephrasing your question."
+            return self.ERROR_RESPONSE
+    
+    def answer_batch(self, questions, threshold=0.35):
+        """
+        Answers for several questions from one encode call, matched the same
+        way as answer() (used by the inference server's micro-batching).
+        
+        Never raises: like answer(), a question that can't be answered gets
+        the error response, and only that question. If the shared encode
+        fails, the questions are answered one by one.
+        """
+        answers = []
+        for question in questions:
+            if not isinstance(question, str):
+                answers.append(self.ERROR_RESPONSE)
+            elif not question.strip():
+                answers.append(self.EMPTY_QUESTION_RESPONSE)
+            else:
+                answers.append(None)
+        asked = [i for i, answer in enumerate(answers) if answer is None]
+        if not asked:
+            return answers
+        
+        try:
+            self.ensure_loaded()
+        except Exception as e:
+            print(f"❌ Error in answer_batch(): {e}")
+            for i in asked:
+                answers[i] = self.ERROR_RESPONSE
+            return answers
+        
+        try:
+            from sentence_transformers import util
+            
+            embeddings = self.model.encode(
+                [questions[i].strip() for i in asked],
+                convert_to_tensor=True,
+                show_progress_bar=False
+            )
+            best_scores, best_indices = util.cos_sim(embeddings, self.kb_embeddings).max(dim=1)
+            matches = zip(best_scores.tolist(), best_indices.tolist())
+        except Exception as e:
+            print(f"❌ Error in answer_batch(), answering one by one: {e}")
+            for i in asked:
+                answers[i] = self.answer(questions[i], threshold=threshold)
+            return answers
+        
+        for i, (score, index) in zip(asked, matches):
+            if score > threshold:
+                answers[i] = self.qa_pairs[index]['answer']
+            else:
+                answers[i] = self._get_fallback_response(questions[i].strip())
+        return answers
     
     def _get_fallback_response(self, question):
         """Return a helpful fallback response when no good match is found"""
@@ -138,6 +219,10 @@ Try asking something like:
 
     def get_similar_questions(self, question, top_k=5):
         """Get similar questions from knowledge base"""
+        import torch
+        from sentence_transformers import util
+        
+        self.ensure_loaded()
         q_embedding = self.model.encode(question, convert_to_tensor=True)
         scores = util.cos_sim(q_embedding, self.kb_embeddings)[0]
         
@@ -153,5 +238,5 @@ Try asking something like:
         
         return similar
 
-# Singleton instance
+# Singleton instance (loads nothing until first use)
 chatbot_service = ChatbotService()
\ No newline at end of file
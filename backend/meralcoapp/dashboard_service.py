@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Count, Q, Sum
+from .models import Project, Vendor, QIInspection, DocumentCompliance, SLATracking, Penalty, Invoice
+
+logger = logging.getLogger(__name__)
+
+_pool_thread = threading.local()
+
+# (thread, connection) of every worker thread that has run a task; closed by
+# _close_exited_thread_connections() once the thread is gone
+_thread_connections = []
+_thread_connections_lock = threading.Lock()
+
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+
+def _run_with_thread_connection(func):
+    """
+    Run func on a long-lived worker thread, reusing the thread's DB connection.
+
+    The connection stays open between tasks, until the pool is shut down.
+    It is only replaced when unusable: after a task that hit a database error,
+    or when a ping fails after it sat idle for DASHBOARD_CONNECTION_IDLE_CHECK
+    seconds (the server may have dropped it meanwhile).
+    """
+    if not getattr(_pool_thread, 'registered', False):
+        with _thread_connections_lock:
+            _thread_connections.append((threading.current_thread(), connections[DEFAULT_DB_ALIAS]))
+        _pool_thread.registered = True
+    if connection.connection is not None:
+        idle = time.monotonic() - getattr(_pool_thread, 'last_used', 0)
+        if idle > getattr(settings, 'DASHBOARD_CONNECTION_IDLE_CHECK', 60) and not connection.is_usable():
+            connection.close()
+    try:
+        return func()
+    finally:
+        _pool_thread.last_used = time.monotonic()
+        if connection.errors_occurred:
+            if connection.is_usable():
+                connection.errors_occurred = False
+            else:
+                connection.close()
+
+
+def _close_exited_thread_connections():
+    """Close the connections left open by worker threads that have exited"""
+    with _thread_connections_lock:
+        exited = [entry for entry in _thread_connections if not entry[0].is_alive()]
+        for entry in exited:
+            _thread_connections.remove(entry)
+    for _, wrapper in exited:
+        # Owned by a dead thread, so closing it from this one is safe
+        wrapper.inc_thread_sharing()
+        try:
+            wrapper.close()
+        finally:
+            wrapper.dec_thread_sharing()
+
+
+class ConcurrentQueryRunner:
+    """
+    Runs independent read-only callables on a shared thread pool.
+
+    Each worker keeps its own database connection open across tasks, so the
+    round trips overlap instead of queueing on the request's connection, and
+    no task pays for connecting. Inside an
+    atomic block the callables run inline instead, since other connections
+    can't see the caller's uncommitted rows. So do callables started from a
+    pool thread (e.g. a bootstrap tile whose action fans out again): queueing
+    them behind their own caller could use up the pool and deadlock it.
+    """
+
+    _executor = None
+
+    @classmethod
+    def executor(cls):
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_QUERY_WORKERS', 8),
+                thread_name_prefix='dashboard',
+                initializer=_mark_pool_thread
+            )
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the pool and close its threads' connections"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+        _close_exited_thread_connections()
+
+    @classmethod
+    def run(cls, tasks):
+        """
+        Run {name: callable}; returns ({name: result}, {name: milliseconds}).
+
+        An exception raised by a task is re-raised here.
+        """
+        def timed(func):
+            started = time.perf_counter()
+            result = func()
+            return result, round((time.perf_counter() - started) * 1000, 2)
+
+        inline = connection.in_atomic_block or getattr(_pool_thread, 'active', False)
+        if inline or len(tasks) < 2:
+            outcomes = {name: timed(func) for name, func in tasks.items()}
+        else:
+            futures = {
+                name: cls.executor().submit(_run_with_thread_connection, lambda func=func: timed(func))
+                for name, func in tasks.items()
+            }
+            outcomes = {name: future.result() for name, future in futures.items()}
+
+        results = {name: result for name, (result, _) in outcomes.items()}
+        timings = {name: elapsed for name, (_, elapsed) in outcomes.items()}
+        return results, timings
+
+
+class DashboardStatsService:
+    """
+    Landing page counters.
+
+    One conditional-aggregation query per table (Count/Sum with filter=Q)
+    replaces the per-counter count() calls; the queries run concurrently and
+    the assembled response is cached. After DASHBOARD_STATS_TTL seconds the
+    cached copy is still served while a single background refresh rebuilds it,
+    so a page load is normally just a cache read.
+
+    The refresh runs on its own thread rather than on the query pool, so
+    waiting for the queries it fans out never ties up a pool worker. That
+    thread and the pool threads keep their connections between refreshes,
+    so a refresh runs its aggregates without connecting to the database.
+    """
+
+    CACHE_KEY = 'dashboard:stats'
+    REFRESH_LOCK_KEY = 'dashboard:stats:refreshing'
+    INACTIVE_PROJECT_STATUSES = ['Completed', 'Cancelled', 'Billed']
+
+    _refresh_executor = None
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, 'DASHBOARD_STATS_TTL', 60)
+
+    @classmethod
+    def refresh_executor(cls):
+        if cls._refresh_executor is None:
+            cls._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dashboard-refresh')
+        return cls._refresh_executor
+
+    @classmethod
+    def shutdown_refresh(cls):
+        """Stop the refresh thread and close its connection"""
+        if cls._refresh_executor is not None:
+            cls._refresh_executor.shutdown(wait=True)
+            cls._refresh_executor = None
+        _close_exited_thread_connections()
+
+    # ------------------------------------------------------------------
+    # Per-table queries
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def project_counts(cls):
+        return Project.objects.aggregate(
+            total_projects=Count('pk'),
+            active_projects=Count('pk', filter=~Q(status__status_name__in=cls.INACTIVE_PROJECT_STATUSES)),
+            delayed_projects=Count('pk', filter=Q(is_delayed=True)),
+            completed_projects=Count('pk', filter=Q(status__status_name='Completed')),
+        )
+
+    @staticmethod
+    def vendor_counts():
+        return Vendor.objects.aggregate(
+            total_vendors=Count('pk'),
+            active_vendors=Count('pk', filter=Q(is_active=True)),
+            blacklisted_vendors=Count('pk', filter=Q(is_blacklisted=True)),
+        )
+
+    @staticmethod
+    def inspection_counts():
+        return QIInspection.objects.aggregate(
+            pending_inspections=Count('pk', filter=Q(is_completed=False)),
+        )
+
+    @staticmethod
+    def document_counts():
+        return DocumentCompliance.objects.aggregate(
+            overdue_documents=Count('pk', filter=Q(is_overdue=True, is_submitted=False)),
+        )
+
+    @staticmethod
+    def sla_counts():
+        return SLATracking.objects.aggregate(
+            sla_breaches=Count('pk', filter=Q(is_breached=True)),
+        )
+
+    @staticmethod
+    def penalty_totals():
+        totals = Penalty.objects.aggregate(total_penalties=Sum('penalty_amount'))
+        return {'total_penalties': float(totals['total_penalties'] or 0)}
+
+    @staticmethod
+    def invoice_counts():
+        return Invoice.objects.aggregate(
+            pending_invoices=Count('pk', filter=~Q(payment_status='Paid')),
+        )
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def compute(cls):
+        """Run the per-table queries (concurrently) and merge them into one dict"""
+        results, _ = ConcurrentQueryRunner.run({
+            'projects': cls.project_counts,
+            'vendors': cls.vendor_counts,
+            'inspections': cls.inspection_counts,
+            'documents': cls.document_counts,
+            'sla': cls.sla_counts,
+            'penalties': cls.penalty_totals,
+            'invoices': cls.invoice_counts,
+        })
+        stats = {}
+        for values in results.values():
+            stats.update(values)
+        return stats
+
+    @classmethod
+    def refresh(cls):
+        """Recompute and store the cached stats; returns them"""
+        stats = cls.compute()
+        # Kept well past the TTL so stale copies can be served during a refresh
+        cache.set(
+            cls.CACHE_KEY,
+            {'stats': stats, 'refresh_at': time.time() + cls.ttl()},
+            timeout=cls.ttl() * 10
+        )
+        return stats
+
+    @classmethod
+    def _refresh_in_background(cls):
+        try:
+            cls.refresh()
+        except Exception:
+            logger.exception('Dashboard stats refresh failed')
+        finally:
+            cache.delete(cls.REFRESH_LOCK_KEY)
+
+    @classmethod
+    def get_stats(cls):
+        """Cached stats; computed inline only when nothing is cached"""
+        cached = cache.get(cls.CACHE_KEY)
+        if cached is None:
+            return cls.refresh()
+
+        if cached['refresh_at'] <= time.time() and cache.add(cls.REFRESH_LOCK_KEY, True, timeout=cls.ttl()):
+            cls.refresh_executor().submit(_run_with_thread_connection, cls._refresh_in_background)
+        return cached['stats']
@@ -0,0 +1,122 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingIndex:
+    """
+    Knowledge base question embeddings persisted as .npy files.
+
+    An index is keyed by a hash of the model name and the ordered questions:
+
+        <directory>/<key>.npy   float32 matrix, one row per question
+        <directory>/<key>.json  manifest: model name and a hash per row
+
+    load() memory-maps an existing index copy-on-write, so every process on
+    the host shares the same page-cache pages and startup costs no encoding.
+    When the questions changed, rows for questions already in the model's
+    previous index are copied from it and only new or edited questions are
+    encoded; the new index replaces the previous one.
+    """
+
+    def __init__(self, directory, model_name):
+        self.directory = directory
+        self.model_name = model_name
+
+    def key(self, questions):
+        return _digest(json.dumps([self.model_name, questions]))[:32]
+
+    def _path(self, key, extension):
+        return os.path.join(self.directory, f'{key}.{extension}')
+
+    def load(self, questions, encode):
+        """
+        (matrix, number of questions encoded) for questions.
+
+        encode(list of str) must return a float array with one row per question.
+        """
+        if not questions:
+            return np.empty((0, 0), dtype=np.float32), 0
+
+        key = self.key(questions)
+        if os.path.exists(self._path(key, 'npy')):
+            return np.load(self._path(key, 'npy'), mmap_mode='c'), 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        hashes = [_digest(question) for question in questions]
+        previous_rows, previous_matrix = self._previous()
+
+        missing = [i for i, question_hash in enumerate(hashes) if question_hash not in previous_rows]
+        encoded = np.asarray(encode([questions[i] for i in missing]), dtype=np.float32) if missing else None
+
+        dimension = encoded.shape[1] if encoded is not None else previous_matrix.shape[1]
+        matrix = np.empty((len(questions), dimension), dtype=np.float32)
+        if encoded is not None:
+            matrix[missing] = encoded
+        reused = [i for i, question_hash in enumerate(hashes) if question_hash in previous_rows]
+        if reused:
+            matrix[reused] = previous_matrix[[previous_rows[hashes[i]] for i in reused]]
+
+        self._write(key, matrix, hashes)
+        return np.load(self._path(key, 'npy'), mmap_mode='c'), len(missing)
+
+    def _manifests(self):
+        """Manifests of this model's indexes, newest first"""
+        manifests = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if manifest.get('model_name') == self.model_name:
+                manifests.append((os.path.getmtime(path), path, manifest))
+        manifests.sort(reverse=True)
+        return [(path, manifest) for _, path, manifest in manifests]
+
+    def _previous(self):
+        """({question hash: row}, matrix) of the model's latest index, or ({}, None)"""
+        for path, manifest in self._manifests():
+            npy_path = path[:-len('json')] + 'npy'
+            try:
+                matrix = np.load(npy_path, mmap_mode='r')
+            except (OSError, ValueError):
+                continue
+            if matrix.shape[0] == len(manifest['questions']):
+                return {question_hash: row for row, question_hash in enumerate(manifest['questions'])}, matrix
+        return {}, None
+
+    def _write(self, key, matrix, hashes):
+        """Write atomically (concurrent starts may race), then drop the model's older indexes"""
+        stale = [path for path, _ in self._manifests()]
+
+        manifest = json.dumps({'model_name': self.model_name, 'questions': hashes}).encode('utf-8')
+        self._replace(self._path(key, 'npy'), lambda f: np.save(f, matrix))
+        self._replace(self._path(key, 'json'), lambda f: f.write(manifest))
+
+        # Processes still mapping an old file keep their pages until they exit
+        for path in stale:
+            if path == self._path(key, 'json'):
+                continue
+            for stale_path in (path, path[:-len('json')] + 'npy'):
+                try:
+                    os.unlink(stale_path)
+                except FileNotFoundError:
+                    pass
+
+    def _replace(self, path, write):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
@@ -0,0 +1,283 @@
+import csv
+import tempfile
+from datetime import datetime
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+from rest_framework import renderers
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+# ============================================
+# EXPORT RENDERERS
+# ============================================
+
+class ExportRenderer(renderers.BaseRenderer):
+    """
+    Lets ?format=<fmt> pass DRF content negotiation for export views.
+
+    The view builds the file response itself; if it returns a regular
+    Response instead (validation errors) the data is rendered as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return renderers.JSONRenderer().render(data, accepted_media_type, renderer_context)
+
+
+class XLSXRenderer(ExportRenderer):
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class ParquetRenderer(ExportRenderer):
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+EXPORT_RENDERERS = [XLSXRenderer, CSVRenderer, ParquetRenderer, NDJSONRenderer]
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation for export views.
+
+    DRF answers a ?format= no renderer handles with 404 before the view runs;
+    here it falls back to the first renderer (JSON) instead, so the view's own
+    validation can answer 400 with the supported formats.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except Http404:
+            return renderers[0], renderers[0].media_type
+
+
+def export_content_negotiation(func):
+    """Use ExportContentNegotiation for an @api_view function (place it below @api_view)"""
+    func.content_negotiation_class = ExportContentNegotiation
+    return func
+
+
+# ============================================
+# WORK ORDER EXPORT (C1 SHEET)
+# ============================================
+
+class _Echo:
+    """Write-only file object for csv.writer; write() hands back the line"""
+
+    def write(self, value):
+        return value
+
+
+def _number(value):
+    return float(value) if value else 0
+
+
+class WorkOrderExporter:
+    """
+    Constant-memory export of work orders in the C1 sheet layout.
+
+    Rows come from one values_list() query (supervisor name joined in SQL)
+    read with iterator(chunk_size=...), so the queryset is never materialized.
+    XLSX uses an openpyxl write-only workbook spooled to a temp file, CSV and
+    NDJSON are generated line by line, and Parquet (needs pyarrow) is written
+    one row group per chunk. Every format is streamed back to the client.
+    """
+
+    # (header, values_list source, kind, column width)
+    COLUMNS = [
+        ('Date Received Jacket from P&S', 'date_received_jacket', 'date', 16),
+        ('Date Received Awarding of Wo', 'date_received_awarding', 'date', 16),
+        ('VIP', 'is_vip', 'text', 6),
+        ('WO INITIATOR', 'wo_initiator', 'text', 16),
+        ('WO NO', 'wo_no', 'text', 18),
+        ('DESCRIPTION', 'description', 'text', 50),
+        ('LOCATION', 'location', 'text', 30),
+        ('MUNICIPALITY', 'municipality', 'text', 18),
+        ('AREA OF RESPONSIBILITY', 'area_of_responsibility', 'text', 18),
+        ('VENDOR REMARKS', 'vendor_remarks', 'text', 40),
+        ('C1 REMARKS', 'c1_remarks', 'text', 40),
+        ('ASSIGNED', 'assigned_crew', 'text', 16),
+        ('SUPERVISOR', 'supervisor_name', 'text', 24),
+        ('TOTAL MANHOURS', 'total_manhours', 'number', 16),
+        ('TOTAL ESTIMATED COST', 'total_estimated_cost', 'number', 20),
+        ('BILLED COST', 'billed_cost', 'number', 16),
+        ('Date Energized', 'date_energized', 'date', 16),
+        ('Date COC Received', 'date_coc_received', 'date', 16),
+        ('Days Energized to COC', 'days_from_energized_to_coc', 'integer', 12),
+        ('Date For Audit', 'date_for_audit', 'date', 16),
+        ('Days COC to Audit', 'days_from_coc_to_audit', 'integer', 12),
+        ('Date Audited', 'date_audited', 'date', 16),
+        ('Days Audit to Billing', 'days_from_audit_to_billing', 'integer', 12),
+        ('Total Resolution Days', 'total_resolution_days', 'integer', 12),
+        ('Is Delayed', 'is_delayed', 'text', 10),
+        ('Delay Days', 'delay_days', 'integer', 10),
+        ('STATUS', 'status', 'text', 14),
+        ('EAM STATUS', 'eam_status', 'text', 16),
+    ]
+
+    FORMATTERS = {
+        'is_vip': lambda value: 'Y' if value else '',
+        'total_manhours': _number,
+        'total_estimated_cost': _number,
+        'billed_cost': _number,
+        'is_delayed': lambda value: 'Yes' if value else 'No',
+    }
+
+    CONTENT_TYPES = {
+        'xlsx': XLSXRenderer.media_type,
+        'csv': 'text/csv',
+        'parquet': ParquetRenderer.media_type,
+        'ndjson': NDJSONRenderer.media_type,
+    }
+
+    def __init__(self, queryset, chunk_size=None):
+        self.queryset = queryset
+        self.chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+    @property
+    def headers(self):
+        return [header for header, _, _, _ in self.COLUMNS]
+
+    def rows(self, formatted=True):
+        """Row tuples, read from the database chunk by chunk"""
+        sources = [source for _, source, _, _ in self.COLUMNS]
+        formatters = [self.FORMATTERS.get(source) if formatted else None for source in sources]
+
+        queryset = self.queryset.annotate(
+            supervisor_name=Trim(Concat(
+                'supervisor__first_name', Value(' '), 'supervisor__last_name'
+            ))
+        ).values_list(*sources)
+
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            yield tuple(
+                formatter(value) if formatter else value
+                for formatter, value in zip(formatters, row)
+            )
+
+    # ------------------------------------------------------------------
+    # Formats
+    # ------------------------------------------------------------------
+
+    def write_xlsx(self, output):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('C1')
+
+        for index, (_, _, _, width) in enumerate(self.COLUMNS, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+        ws.freeze_panes = 'A2'
+
+        header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+        header_font = Font(color='FFFFFF', bold=True)
+        header_alignment = Alignment(horizontal='center', vertical='center')
+
+        header_row = []
+        for header in self.headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        ws.append(header_row)
+
+        for row in self.rows():
+            ws.append(row)
+
+        wb.save(output)
+
+    def write_parquet(self, output):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError('Parquet export requires pyarrow to be installed')
+
+        types = {'date': pa.date32(), 'number': pa.float64(), 'integer': pa.int64(), 'text': pa.string()}
+        schema = pa.schema([(header, types[kind]) for header, _, kind, _ in self.COLUMNS])
+
+        def write_chunk(writer, chunk):
+            columns = zip(*chunk)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+
+        # An export with no rows still gets a valid file with just the schema
+        with pq.ParquetWriter(output, schema) as writer:
+            chunk = []
+            for row in self.rows():
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    write_chunk(writer, chunk)
+                    chunk = []
+            if chunk:
+                write_chunk(writer, chunk)
+
+    def stream_csv(self):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.headers)
+        for row in self.rows():
+            yield writer.writerow(row)
+
+    def stream_ndjson(self):
+        """One JSON object per line, keyed by field name with raw values"""
+        sources = [source for _, source, _, _ in self.COLUMNS]
+        encoder = DjangoJSONEncoder()
+        for row in self.rows(formatted=False):
+            yield encoder.encode(dict(zip(sources, row))) + '\n'
+
+    def response(self, export_format='xlsx', filename=None):
+        """
+        Streaming download in the requested format (xlsx, csv, ndjson or parquet).
+
+        Raises ValueError for an unsupported format or a missing optional
+        dependency.
+        """
+        if export_format not in self.CONTENT_TYPES:
+            raise ValueError(f'Unsupported export format. Choose from: {", ".join(self.CONTENT_TYPES)}')
+
+        filename = f'{filename or "work_orders_" + datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+
+        if export_format in ('csv', 'ndjson'):
+            stream = self.stream_csv() if export_format == 'csv' else self.stream_ndjson()
+            response = StreamingHttpResponse(stream, content_type=self.CONTENT_TYPES[export_format])
+            response['Content-Disposition'] = f'attachment; filename={filename}'
+            return response
+
+        # Spool to an anonymous temp file (removed on close) and stream it back
+        output = tempfile.TemporaryFile()
+        try:
+            if export_format == 'xlsx':
+                self.write_xlsx(output)
+            else:
+                self.write_parquet(output)
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
+            content_type=self.CONTENT_TYPES[export_format]
+        )
@@ -0,0 +1,31 @@
+import django_filters
+from .models import Invoice, Project
+
+
+class InvoiceFilter(django_filters.FilterSet):
+    """
+    Invoice list filters. is_overdue and the outstanding bounds filter on the
+    annotations InvoiceViewSet adds (see InvoiceSerializer).
+    """
+    is_overdue = django_filters.BooleanFilter(field_name='is_overdue')
+    outstanding_min = django_filters.NumberFilter(field_name='outstanding_amount', lookup_expr='gte')
+    outstanding_max = django_filters.NumberFilter(field_name='outstanding_amount', lookup_expr='lte')
+
+    class Meta:
+        model = Invoice
+        fields = ['vendor', 'project', 'payment_status']
+
+
+class ProjectFilter(django_filters.FilterSet):
+    """
+    Project list filters. The delay probability bounds filter on the
+    annotation ProjectViewSet adds from the nightly ProjectRiskScore run.
+    """
+    delay_probability_min = django_filters.NumberFilter(field_name='delay_probability', lookup_expr='gte')
+    delay_probability_max = django_filters.NumberFilter(field_name='delay_probability', lookup_expr='lte')
+    predicted_risk_level = django_filters.CharFilter(field_name='predicted_risk_level')
+
+    class Meta:
+        model = Project
+        fields = ['vendor', 'sector', 'status', 'priority', 'risk_score',
+                  'is_delayed', 'assigned_engineer', 'assigned_qi']
@@ -0,0 +1,188 @@
+import logging
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import ImportJob
+from .importers import WorkOrderExcelImporter, CrewMonitoringExcelImporter, QIMonitoringExcelImporter
+from .kpi_cache import KPICacheService
+
+logger = logging.getLogger(__name__)
+
+
+class ImportJobService:
+    """
+    Runs Excel imports outside the request.
+
+    Uploads are stored on the ImportJob and processed either by an in-process
+    thread pool (IMPORT_JOB_RUNNER = 'thread', the default) or by
+    `manage.py run_import_worker` (IMPORT_JOB_RUNNER = 'worker'). Both claim
+    jobs atomically, so running the two side by side is safe. Progress is
+    written to the job after every chunk for the frontend to poll.
+
+    Each progress write also stamps heartbeat_at. A RUNNING job with no
+    heartbeat for IMPORT_JOB_STALE_MINUTES (its process died mid-import) is
+    put back to PENDING and picked up again; imports upsert, so re-running
+    one is safe.
+    """
+
+    _executor = None
+
+    # Minimum seconds between progress writes for row-by-row importers
+    PROGRESS_INTERVAL = 1.0
+
+    @classmethod
+    def importer_for(cls, job):
+        if job.import_type == 'WORK_ORDERS':
+            return WorkOrderExcelImporter(), 0
+        if job.import_type == 'CREW_MONITORING':
+            return CrewMonitoringExcelImporter(), job.options.get('sheet_name', 0)
+        return QIMonitoringExcelImporter(), QIMonitoringExcelImporter.SHEET_NAME
+
+    # ------------------------------------------------------------------
+    # Enqueue / claim
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def executor(cls):
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMPORT_JOB_WORKERS', 2),
+                thread_name_prefix='import-job'
+            )
+        return cls._executor
+
+    @classmethod
+    def enqueue(cls, import_type, uploaded_file, user=None, options=None):
+        """Store the upload as a PENDING job and hand it to the configured runner"""
+        job = ImportJob.objects.create(
+            import_type=import_type,
+            file=uploaded_file,
+            original_filename=getattr(uploaded_file, 'name', None),
+            options=options or {},
+            created_by=user if user is not None and user.is_authenticated else None
+        )
+
+        if getattr(settings, 'IMPORT_JOB_RUNNER', 'thread') == 'thread':
+            # Jobs orphaned by a dead process are resumed along with the new one
+            job_ids = [job.pk] + cls.requeue_stale()
+
+            def submit():
+                for job_id in job_ids:
+                    cls.executor().submit(cls.run_in_thread, job_id)
+            transaction.on_commit(submit)
+
+        return job
+
+    @classmethod
+    def requeue_stale(cls):
+        """Move RUNNING jobs without a recent heartbeat back to PENDING; returns their ids"""
+        cutoff = timezone.now() - timedelta(minutes=getattr(settings, 'IMPORT_JOB_STALE_MINUTES', 30))
+        stale = ImportJob.objects.filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+            status='RUNNING'
+        )
+        job_ids = list(stale.values_list('pk', flat=True))
+        if job_ids:
+            stale.filter(pk__in=job_ids).update(status='PENDING', started_at=None, heartbeat_at=None)
+            logger.warning('Requeued stale import jobs: %s', ', '.join(str(job_id) for job_id in job_ids))
+        return job_ids
+
+    @classmethod
+    def claim(cls, job_id):
+        """Move a PENDING job to RUNNING; returns the job, or None if someone else has it"""
+        claimed = ImportJob.objects.filter(pk=job_id, status='PENDING').update(
+            status='RUNNING', started_at=timezone.now(), heartbeat_at=None
+        )
+        return ImportJob.objects.get(pk=job_id) if claimed else None
+
+    @classmethod
+    def claim_next(cls):
+        """Claim the oldest PENDING job (worker loop), after requeueing stale ones"""
+        cls.requeue_stale()
+        with transaction.atomic():
+            job = ImportJob.objects.select_for_update(skip_locked=True).filter(
+                status='PENDING'
+            ).order_by('created_at').first()
+            if job is None:
+                return None
+            job.status = 'RUNNING'
+            job.started_at = timezone.now()
+            job.heartbeat_at = None
+            job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+        return job
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def run_in_thread(cls, job_id):
+        close_old_connections()
+        try:
+            job = cls.claim(job_id)
+            if job is not None:
+                cls.run(job)
+        except Exception:
+            logger.exception('Import job %s crashed', job_id)
+        finally:
+            connection.close()
+
+    @classmethod
+    def _save_progress(cls, job, rows_processed, created, updated, errors):
+        job.rows_processed = rows_processed
+        job.created_count = created
+        job.updated_count = updated
+        job.errors = list(errors)
+        job.heartbeat_at = timezone.now()
+        ImportJob.objects.filter(pk=job.pk).update(
+            rows_processed=rows_processed,
+            created_count=created,
+            updated_count=updated,
+            errors=job.errors,
+            heartbeat_at=job.heartbeat_at
+        )
+
+    @classmethod
+    def run(cls, job):
+        """Process a RUNNING job to completion"""
+        last_write = [0.0]
+
+        def progress(rows_processed, created, updated, errors):
+            now = time.monotonic()
+            if rows_processed < job.total_rows and now - last_write[0] < cls.PROGRESS_INTERVAL:
+                return
+            last_write[0] = now
+            cls._save_progress(job, rows_processed, created, updated, errors)
+
+        try:
+            importer, sheet_name = cls.importer_for(job)
+            with job.file.open('rb') as excel_file:
+                df = pd.read_excel(excel_file, sheet_name=sheet_name)
+
+            job.total_rows = len(df)
+            job.heartbeat_at = timezone.now()
+            ImportJob.objects.filter(pk=job.pk).update(total_rows=job.total_rows, heartbeat_at=job.heartbeat_at)
+
+            importer.run(df, progress=progress)
+
+            if job.import_type == 'WORK_ORDERS':
+                KPICacheService.invalidate()
+
+            job.status = 'COMPLETED'
+        except Exception as e:
+            logger.exception('Import job %s failed', job.pk)
+            job.status = 'FAILED'
+            job.error_message = f'Failed to process file: {str(e)}'
+
+        job.finished_at = timezone.now()
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=job.status,
+            error_message=job.error_message,
+            finished_at=job.finished_at
+        )
+        return job
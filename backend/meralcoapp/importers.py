@@ -0,0 +1,470 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+import numpy as np
+import pandas as pd
+from django.db import connection
+from django.utils import timezone
+from .models import WorkOrder, CrewType, DailyCrewMonitoring, QIWeeklyAccomplishment, User
+from .kpi_rollup import WorkOrderRollupService
+from .vendor_metrics import VendorScorecardService
+
+
+# ============================================
+# WORK ORDER BULK IMPORT (C1 SHEET)
+# ============================================
+
+class WorkOrderExcelImporter:
+    """
+    Bulk importer for C1 work order sheets.
+
+    Columns are coerced once per column with pandas instead of per cell, the
+    fields WorkOrder.save() derives (day counts, delay flags) are computed in
+    array form, and rows are upserted in batches with
+    INSERT ... ON CONFLICT on wo_no (fed by COPY on PostgreSQL, bulk_create
+    elsewhere). Each batch runs in its own transaction (a savepoint when the
+    caller already holds one) and applies its own work order rollup delta.
+
+    Row semantics follow the old update_or_create loop: blank date cells keep
+    the stored date, blank text/number cells clear it, and the last row wins
+    when a WO NO repeats.
+    """
+
+    COLUMN_MAPPING = {
+        'WO NO': 'wo_no',
+        'DESCRIPTION': 'description',
+        'LOCATION': 'location',
+        'MUNICIPALITY': 'municipality',
+        'AREA OF RESPONSIBILITY': 'area_of_responsibility',
+        'Date Received Jacket from P&S': 'date_received_jacket',
+        'Date Received Awarding of Wo': 'date_received_awarding',
+        'Date Energized': 'date_energized',
+        'VENDOR REMARKS (free text)': 'vendor_remarks',
+        'C1 REMARKS (with or without issue)': 'c1_remarks',
+        'ASSIGNED': 'assigned_crew',
+        'SUPERVISOR': 'supervisor_code',
+        'TOTAL MANHOURS': 'total_manhours',
+        'TOTAL ESTIMATED COST (SERVICE ITEMS)': 'total_estimated_cost',
+        'VIP': 'is_vip',
+        'WO INITIATOR': 'wo_initiator',
+        'EAM STATUS': 'eam_status',
+    }
+
+    DATE_FIELDS = ['date_received_jacket', 'date_received_awarding', 'date_energized']
+    DECIMAL_FIELDS = ['total_manhours', 'total_estimated_cost']
+
+    # Stored values the derived fields depend on, and the derived fields themselves
+    DAY_SPANS = {
+        'days_from_energized_to_coc': ('date_coc_received', 'date_energized'),
+        'days_from_coc_to_audit': ('date_for_audit', 'date_coc_received'),
+        'days_from_audit_to_billing': ('date_audited', 'date_for_audit'),
+        'total_resolution_days': ('date_audited', 'date_energized'),
+    }
+    STATE_DATE_FIELDS = [
+        'date_received_jacket', 'date_received_awarding', 'date_energized',
+        'date_coc_received', 'date_for_audit', 'date_audited',
+    ]
+    DERIVED_FIELDS = list(DAY_SPANS) + ['is_delayed', 'delay_days']
+
+    DELAY_THRESHOLD_DAYS = 60
+    BATCH_SIZE = 2000
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.fields = []
+        self.processed = 0
+        self.model_fields = {field.name: field for field in WorkOrder._meta.concrete_fields}
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_dates(series):
+        """Return (datetime64 values, mask of cells that set the field)"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.dt.normalize(), series.notna()
+
+        is_text = series.map(lambda value: isinstance(value, str))
+        is_date = series.map(lambda value: isinstance(value, (datetime, date)))
+
+        # Strings must be YYYY-MM-DD; anything else clears the date
+        parsed = pd.to_datetime(series.where(is_text), format='%Y-%m-%d', errors='coerce')
+        parsed = parsed.where(is_text, pd.to_datetime(series.where(is_date), errors='coerce'))
+        return parsed.dt.normalize(), is_text | is_date
+
+    def _flag(self, row_errors, mask, message):
+        row_errors[mask & row_errors.isna()] = message
+
+    def parse(self, df):
+        """Coerce the sheet into model fields; returns (frame, date presence masks)"""
+        wo_no = df['WO NO'] if 'WO NO' in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+        if 'wo_no' in df.columns:
+            wo_no = wo_no.where(wo_no.notna() & (wo_no.astype(str) != ''), df['wo_no'])
+        keep = wo_no.notna() & (wo_no.astype(str) != '')
+        df = df[keep]
+
+        parsed = pd.DataFrame({'wo_no': wo_no[keep].astype(str)}, index=df.index)
+        present = pd.DataFrame(index=df.index)
+        row_errors = pd.Series(None, index=df.index, dtype=object)
+
+        self.fields = []
+        for excel_col, model_field in self.COLUMN_MAPPING.items():
+            if excel_col not in df.columns or model_field == 'wo_no' or model_field not in self.model_fields:
+                continue
+            self.fields.append(model_field)
+            column = df[excel_col]
+
+            if model_field in self.DATE_FIELDS:
+                parsed[model_field], present[model_field] = self._parse_dates(column)
+
+            elif model_field == 'is_vip':
+                parsed[model_field] = column.notna() & column.astype(str).str.upper().eq('Y')
+
+            elif model_field in self.DECIMAL_FIELDS:
+                values = pd.to_numeric(column, errors='coerce')
+                field = self.model_fields[model_field]
+                limit = 10 ** (field.max_digits - field.decimal_places)
+                self._flag(row_errors, column.notna() & values.isna(), f'{excel_col}: invalid number')
+                self._flag(row_errors, values.abs() >= limit, f'{excel_col}: value out of range')
+                parsed[model_field] = values
+
+            else:
+                values = column.astype(str).where(column.notna(), None)
+                max_length = self.model_fields[model_field].max_length
+                if max_length:
+                    self._flag(row_errors, values.str.len() > max_length,
+                               f'{excel_col}: longer than {max_length} characters')
+                parsed[model_field] = values
+
+        for index, message in row_errors.dropna().items():
+            self.errors.append(f"Row {index + 2}: {message}")
+
+        valid = row_errors.isna()
+        parsed, present = parsed[valid], present[valid]
+
+        # Last row wins for a repeated WO NO, as with sequential update_or_create
+        self.processed = len(parsed)
+        last = ~parsed['wo_no'].duplicated(keep='last')
+        return parsed[last], present[last]
+
+    # ------------------------------------------------------------------
+    # Derived fields
+    # ------------------------------------------------------------------
+
+    def _existing_state(self, wo_nos):
+        columns = ['wo_no'] + self.STATE_DATE_FIELDS + self.DERIVED_FIELDS
+        rows = WorkOrder.objects.filter(wo_no__in=wo_nos).values_list(*columns)
+        existing = pd.DataFrame.from_records(list(rows), columns=columns).set_index('wo_no')
+        for field in self.STATE_DATE_FIELDS:
+            existing[field] = pd.to_datetime(existing[field])
+        return existing
+
+    def _derive(self, state):
+        """Apply WorkOrder.save()'s derived-field rules to a whole batch"""
+        for field, (later, earlier) in self.DAY_SPANS.items():
+            days = (state[later] - state[earlier]).dt.days
+            state[field] = days.where(days.notna(), pd.to_numeric(state[field]))
+
+        resolution_days = state['total_resolution_days']
+        delayed = resolution_days.notna() & (resolution_days > self.DELAY_THRESHOLD_DAYS)
+        state['is_delayed'] = delayed | state['is_delayed'].fillna(False).astype(bool)
+        state['delay_days'] = (resolution_days - self.DELAY_THRESHOLD_DAYS).where(
+            delayed, pd.to_numeric(state['delay_days']).fillna(0)
+        )
+        return state
+
+    # ------------------------------------------------------------------
+    # Upsert
+    # ------------------------------------------------------------------
+
+    def _to_python(self, state, fields):
+        """Column-wise conversion to values the model fields accept"""
+        values = {}
+        for field in fields:
+            column = state[field]
+            if field in self.STATE_DATE_FIELDS:
+                column = column.dt.date
+            elif field in self.DAY_SPANS or field == 'delay_days':
+                column = column.round().astype('Int64')
+            elif field in ('is_delayed', 'is_vip'):
+                column = column.astype(bool)
+            values[field] = column.astype(object).where(column.notna(), None).tolist()
+        return values
+
+    def _copy_upsert(self, wo_nos, values, fields):
+        """
+        PostgreSQL fast path: COPY the batch into a temp table, then a single
+        INSERT ... SELECT ... ON CONFLICT (wo_no) DO UPDATE into work_orders.
+        """
+        opts = WorkOrder._meta
+        quote = connection.ops.quote_name
+        now = timezone.now()
+
+        # Every column gets a value; fields not in the sheet take their model default
+        columns = {}
+        for field in opts.concrete_fields:
+            if field.name == 'wo_no':
+                columns[field.column] = wo_nos
+            elif field.name in values:
+                columns[field.column] = values[field.name]
+            elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                columns[field.column] = now
+            elif callable(field.default):
+                columns[field.column] = [field.get_default() for _ in wo_nos]
+            else:
+                columns[field.column] = field.get_default()
+        frame = pd.DataFrame(columns, index=range(len(wo_nos)))
+
+        buffer = StringIO()
+        frame.to_csv(buffer, index=False, header=False, na_rep='\\N')
+        buffer.seek(0)
+
+        column_list = ', '.join(quote(column) for column in frame.columns)
+        update_columns = [opts.get_field(name).column for name in fields + ['updated_at']]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS work_orders_import "
+                f"(LIKE {quote(opts.db_table)}) ON COMMIT DROP"
+            )
+            cursor.execute("TRUNCATE work_orders_import")
+            cursor.copy_expert(
+                f"COPY work_orders_import ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {quote(opts.db_table)} ({column_list}) "
+                f"SELECT {column_list} FROM work_orders_import "
+                f"ON CONFLICT ({quote('wo_no')}) DO UPDATE SET "
+                + ', '.join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in update_columns)
+            )
+
+    def _upsert(self, wo_nos, values, fields):
+        # COPY needs psycopg2's copy_expert (the driver in requirements.txt)
+        if connection.vendor == 'postgresql':
+            return self._copy_upsert(wo_nos, values, fields)
+
+        work_orders = [
+            WorkOrder(wo_no=wo_no, **{field: values[field][i] for field in fields})
+            for i, wo_no in enumerate(wo_nos)
+        ]
+        WorkOrder.objects.bulk_create(
+            work_orders,
+            update_conflicts=True,
+            unique_fields=['wo_no'],
+            update_fields=fields + ['updated_at']
+        )
+
+    def _import_batch(self, batch, present):
+        wo_nos = batch['wo_no'].tolist()
+        existing = self._existing_state(wo_nos)
+
+        state = existing.reindex(wo_nos)
+        sheet = batch.set_index('wo_no')
+        present = present.set_index(batch['wo_no'])
+        for field in self.fields:
+            if field in self.DATE_FIELDS:
+                # Blank date cells leave the stored date alone
+                state[field] = sheet[field].where(present[field], state[field])
+            else:
+                state[field] = sheet[field]
+        state = self._derive(state)
+
+        fields = self.fields + self.DERIVED_FIELDS
+        self._upsert(wo_nos, self._to_python(state, fields), fields)
+
+        return len(wo_nos) - len(existing)
+
+    def run(self, df, progress=None):
+        """
+        Import a C1 sheet DataFrame; returns created/updated counts and row errors.
+        
+        progress, if given, is called after each batch with
+        (rows_processed, created, updated, errors) where rows_processed counts
+        sheet rows.
+        """
+        parsed, present = self.parse(df)
+
+        created = updated = 0
+
+        # Each batch commits with its own rollup delta and scorecard refresh, so
+        # progress written between batches is visible to pollers; a failed
+        # batch rolls back and simply contributes nothing
+        for start in range(0, len(parsed), self.batch_size):
+            batch = parsed.iloc[start:start + self.batch_size]
+            imported = WorkOrder.objects.filter(wo_no__in=batch['wo_no'].tolist())
+            try:
+                with WorkOrderRollupService.track(imported), VendorScorecardService.track_work_orders(imported):
+                    created += self._import_batch(batch, present.iloc[start:start + self.batch_size])
+                updated += len(batch)
+            except Exception as e:
+                first, last = batch.index[0] + 2, batch.index[-1] + 2
+                self.errors.append(f"Rows {first}-{last}: {str(e)}")
+            
+            if progress:
+                progress(df.index.get_loc(batch.index[-1]) + 1, created, updated - created, self.errors)
+
+        # Repeated WO NOs count as updates, as they did row by row
+        duplicates = self.processed - len(parsed)
+        self.created = created
+        self.updated = updated - created + duplicates
+        if progress:
+            progress(len(df), self.created, self.updated, self.errors)
+
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'errors': self.errors
+        }
+
+
+# ============================================
+# CREW / QI MONITORING IMPORT
+# ============================================
+
+class RowExcelImporter:
+    """Base for sheets imported one row at a time; subclasses implement import_row()"""
+
+    CHUNK_SIZE = 500
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def import_row(self, row):
+        raise NotImplementedError
+
+    def describe_error(self, row, error):
+        return str(error)
+
+    def run(self, df, progress=None):
+        """Import the sheet; progress(rows_processed, created, updated, errors) per chunk"""
+        for position, (index, row) in enumerate(df.iterrows(), start=1):
+            try:
+                self.import_row(row)
+            except Exception as e:
+                self.errors.append(f"Row {index + 2}: {self.describe_error(row, e)}")
+
+            if progress and position % self.CHUNK_SIZE == 0:
+                progress(position, self.created, 0, self.errors)
+
+        if progress:
+            progress(len(df), self.created, 0, self.errors)
+
+        return {
+            'created': self.created,
+            'errors': self.errors
+        }
+
+
+class CrewMonitoringExcelImporter(RowExcelImporter):
+    """Daily crew monitoring sheets (MAY 2025, JUNE 2025, etc.)"""
+
+    def import_row(self, row):
+        crew_code = row.get('CREW_CODE')
+        monitoring_date = row.get('DATE')
+
+        if pd.isna(crew_code) or pd.isna(monitoring_date):
+            return
+
+        # Get crew type
+        crew_type = CrewType.objects.get(crew_code=crew_code)
+
+        # Parse date
+        if isinstance(monitoring_date, pd.Timestamp):
+            date_obj = monitoring_date.date()
+        else:
+            date_obj = datetime.strptime(str(monitoring_date), '%Y-%m-%d').date()
+
+        # Get values A, B, C, D
+        value_a = int(row.get('VALUE_A', 0)) if pd.notna(row.get('VALUE_A')) else 0
+        value_b = int(row.get('VALUE_B', 0)) if pd.notna(row.get('VALUE_B')) else 0
+        value_c = int(row.get('VALUE_C', 0)) if pd.notna(row.get('VALUE_C')) else 0
+        value_d = int(row.get('VALUE_D', 0)) if pd.notna(row.get('VALUE_D')) else 0
+        daily_rate = float(row.get('RATE', 0)) if pd.notna(row.get('RATE')) else None
+
+        # Create or update record
+        monitoring, created = DailyCrewMonitoring.objects.update_or_create(
+            crew_type=crew_type,
+            monitoring_date=date_obj,
+            defaults={
+                'value_a': value_a,
+                'value_b': value_b,
+                'value_c': value_c,
+                'value_d': value_d,
+                'daily_rate': daily_rate,
+            }
+        )
+
+        if created:
+            self.created += 1
+
+    def describe_error(self, row, error):
+        if isinstance(error, CrewType.DoesNotExist):
+            return f"Crew type '{row.get('CREW_CODE')}' not found"
+        return str(error)
+
+
+class QIMonitoringExcelImporter(RowExcelImporter):
+    """QI weekly accomplishment sheet"""
+
+    SHEET_NAME = 'WEEKLY ACCOMPLISHMENT'
+
+    def import_row(self, row):
+        qi_name = row.get('QI_NAME')
+        week_start = row.get('WEEK_START_DATE')
+
+        if pd.isna(qi_name) or pd.isna(week_start):
+            return
+
+        # Get user by name
+        qi_user = User.objects.get(
+            first_name__icontains=qi_name.split()[0],
+            last_name__icontains=qi_name.split()[-1]
+        )
+
+        # Parse date
+        if isinstance(week_start, pd.Timestamp):
+            week_start_date = week_start.date()
+        else:
+            week_start_date = datetime.strptime(str(week_start), '%Y-%m-%d').date()
+
+        # Calculate week end
+        week_end_date = week_start_date + timedelta(days=6)
+
+        # Get daily counts
+        monday_count = int(row.get('MONDAY', 0)) if pd.notna(row.get('MONDAY')) else 0
+        tuesday_count = int(row.get('TUESDAY', 0)) if pd.notna(row.get('TUESDAY')) else 0
+        wednesday_count = int(row.get('WEDNESDAY', 0)) if pd.notna(row.get('WEDNESDAY')) else 0
+        thursday_count = int(row.get('THURSDAY', 0)) if pd.notna(row.get('THURSDAY')) else 0
+        friday_count = int(row.get('FRIDAY', 0)) if pd.notna(row.get('FRIDAY')) else 0
+        saturday_count = int(row.get('SATURDAY', 0)) if pd.notna(row.get('SATURDAY')) else 0
+        sunday_count = int(row.get('SUNDAY', 0)) if pd.notna(row.get('SUNDAY')) else 0
+        target = int(row.get('TARGET', 0)) if pd.notna(row.get('TARGET')) else 0
+
+        # Create or update
+        accomplishment, created = QIWeeklyAccomplishment.objects.update_or_create(
+            qi_user=qi_user,
+            week_start_date=week_start_date,
+            defaults={
+                'week_end_date': week_end_date,
+                'monday_count': monday_count,
+                'tuesday_count': tuesday_count,
+                'wednesday_count': wednesday_count,
+                'thursday_count': thursday_count,
+                'friday_count': friday_count,
+                'saturday_count': saturday_count,
+                'sunday_count': sunday_count,
+                'target_inspections': target,
+            }
+        )
+
+        if created:
+            self.created += 1
+
+    def describe_error(self, row, error):
+        if isinstance(error, User.DoesNotExist):
+            return f"User '{row.get('QI_NAME')}' not found"
+        return str(error)
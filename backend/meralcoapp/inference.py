@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# WIRE PROTOCOL
+# ============================================
+# Each message is a 4-byte big-endian length followed by that many bytes of
+# JSON. Requests are {"op": name, "args": {...}}; replies are
+# {"ok": true, "result": ...} or {"ok": false, "type": exception class, "error": message}.
+
+_LENGTH = struct.Struct('>I')
+
+
+def send_message(sock, payload):
+    data = json.dumps(payload).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError('Inference connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    (size,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return json.loads(_recv_exactly(sock, size))
+
+
+class InferenceUnavailable(Exception):
+    """The inference server could not be reached"""
+
+
+class InferenceError(Exception):
+    """The inference server failed to handle a request"""
+
+
+# ============================================
+# MICRO-BATCHING
+# ============================================
+
+class MicroBatcher:
+    """
+    Groups concurrent requests into one call of a batch function.
+
+    submit(items) queues a request's items and blocks until its results are
+    ready. A single thread takes the first waiting request, keeps collecting
+    others for up to window seconds or until max_items items, calls
+    func(all items) once and hands each request its slice of the results.
+    If the combined call fails anyway, each request is retried on its own so
+    one bad input only fails its own request; callers validate inputs first
+    so that this stays rare.
+    """
+
+    def __init__(self, func, window, max_items, name='batcher'):
+        self.func = func
+        self.window = window
+        self.max_items = max_items
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        if not items:
+            return []
+        future = Future()
+        self._queue.put((list(items), future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.window
+        while size < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.func([item for items, _ in batch for item in items])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    for items, future in batch:
+                        self._resolve(future, items)
+                continue
+
+            start = 0
+            for items, future in batch:
+                future.set_result(results[start:start + len(items)])
+                start += len(items)
+
+    def _resolve(self, future, items):
+        try:
+            future.set_result(self.func(items))
+        except Exception as e:
+            future.set_exception(e)
+
+
+# ============================================
+# SERVER
+# ============================================
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Hosts MLService and ChatbotService once for every web worker on the host.
+
+    Each client connection gets a thread; delay predictions and chat answers
+    from all connections are micro-batched into single model calls.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # Every thread of every web worker may connect at once
+
+    def __init__(self, socket_path, batch_window=None, max_batch=None):
+        from .chatbot_service import chatbot_service
+        from .ml_service import ml_service
+
+        window = (batch_window if batch_window is not None else settings.INFERENCE_BATCH_WINDOW_MS) / 1000
+        max_batch = max_batch or settings.INFERENCE_MAX_BATCH
+        self.ml_service = ml_service
+        self.chatbot_service = chatbot_service
+        self.delay_batcher = MicroBatcher(ml_service.predict_delay_batch, window, max_batch, 'delay-batcher')
+        self.chat_batcher = MicroBatcher(chatbot_service.answer_batch, window, max_batch, 'chat-batcher')
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Stale socket from a previous run
+        super().__init__(socket_path, InferenceRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def dispatch(self, op, args):
+        from .model_loading import local_readiness
+
+        if op == 'predict_delay_batch':
+            # Rejected here, a bad project can't fail (and re-run) a whole batch window
+            self.ml_service.validate_delay_input(args['projects'])
+            return self.delay_batcher.submit(args['projects'])
+        if op == 'predict_penalty':
+            return self.ml_service.predict_penalty(args['violation_type'], args['delay_days'])
+        if op == 'answer':
+            # answer_batch never raises; like answer(), errors become the error response
+            return self.chat_batcher.submit([args['question']])[0]
+        if op == 'get_similar_questions':
+            return self.chatbot_service.get_similar_questions(args['question'], top_k=args.get('top_k', 5))
+        if op == 'status':
+            return local_readiness()
+        raise ValueError(f'Unknown inference operation: {op}')
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class InferenceRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                reply = {'ok': True, 'result': self.server.dispatch(message['op'], message.get('args', {}))}
+            except Exception as e:
+                if not isinstance(e, ValueError):
+                    logger.exception('Inference request %s failed', message.get('op'))
+                reply = {'ok': False, 'type': type(e).__name__, 'error': str(e)}
+            send_message(self.request, reply)
+
+
+# ============================================
+# CLIENT
+# ============================================
+
+class InferenceClient:
+    """
+    Calls the inference server over its Unix socket.
+
+    Each thread keeps one connection, reconnecting once if it was dropped
+    (e.g. the server restarted). A ValueError raised by the server is raised
+    again here, so callers handle bad input the same way as with the local
+    services.
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout or settings.INFERENCE_TIMEOUT
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise InferenceUnavailable(f'Inference server unavailable at {self.socket_path}: {e}')
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def call(self, op, **args):
+        for attempt in range(2):
+            if getattr(self._local, 'sock', None) is None:
+                self._local.sock = self._connect()
+            try:
+                send_message(self._local.sock, {'op': op, 'args': args})
+                reply = recv_message(self._local.sock)
+                break
+            except socket.timeout:
+                self._close()
+                raise InferenceUnavailable(f'Inference server timed out after {self.timeout}s')
+            except (ConnectionError, OSError) as e:
+                self._close()
+                if attempt:
+                    raise InferenceUnavailable(f'Inference server connection failed: {e}')
+
+        if reply['ok']:
+            return reply['result']
+        if reply['type'] == 'ValueError':
+            raise ValueError(reply['error'])
+        raise InferenceError(f"{reply['type']}: {reply['error']}")
+
+
+class RemoteMLService:
+    """MLService interface backed by the inference server"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def predict_delay(self, project_data):
+        return self.predict_delay_batch([project_data])[0]
+
+    def predict_delay_batch(self, projects):
+        return self.client.call('predict_delay_batch', projects=list(projects))
+
+    def predict_penalty(self, violation_type, delay_days):
+        return self.client.call('predict_penalty', violation_type=violation_type, delay_days=delay_days)
+
+
+class RemoteChatbotService:
+    """ChatbotService interface backed by the inference server"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def answer(self, question):
+        return self.client.call('answer', question=question)
+
+    def get_similar_questions(self, question, top_k=5):
+        return self.client.call('get_similar_questions', question=question, top_k=top_k)
+
+    def status(self):
+        return remote_readiness(self.client)['services']['chatbot']
+
+    @property
+    def is_ready(self):
+        return self.status()['state'] == 'ready'
+
+
+def remote_readiness(client=None):
+    """Readiness as reported by the inference server, or why it can't be reached"""
+    try:
+        result = (client or _client()).call('status')
+    except (InferenceUnavailable, InferenceError) as e:
+        unavailable = {'state': 'unavailable', 'load_seconds': None, 'error': str(e)}
+        return {'ready': False, 'services': {'ml': unavailable, 'chatbot': unavailable}}
+    result['server'] = True
+    return result
+
+
+# ============================================
+# BACKEND SELECTION
+# ============================================
+
+_clients = {}
+
+
+def _client():
+    path = settings.INFERENCE_SOCKET
+    if path not in _clients:
+        _clients[path] = InferenceClient(path)
+    return _clients[path]
+
+
+def ml_backend():
+    """The inference server's MLService when INFERENCE_SOCKET is set, else the in-process one"""
+    if getattr(settings, 'INFERENCE_SOCKET', None):
+        return RemoteMLService(_client())
+    from .ml_service import ml_service
+    return ml_service
+
+
+def chatbot_backend():
+    """The inference server's ChatbotService when INFERENCE_SOCKET is set, else the in-process one"""
+    if getattr(settings, 'INFERENCE_SOCKET', None):
+        return RemoteChatbotService(_client())
+    from .chatbot_service import chatbot_service
+    return chatbot_service
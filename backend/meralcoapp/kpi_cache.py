@@ -0,0 +1,82 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from .kpi_service import KPICalculationService
+
+
+class KPICacheService:
+    """
+    Cache for calculated KPI results keyed by (period_start, period_end, kpi_type).
+    
+    Uses the 'kpi' cache alias when configured and falls back to the default
+    cache (local memory unless CACHES says otherwise). Every key embeds a
+    generation number; invalidate() bumps it so all cached periods go stale
+    at once without having to enumerate keys.
+    """
+    
+    CACHE_ALIAS = 'kpi'
+    GENERATION_KEY = 'kpi:generation'
+    ALL_KPIS = 'ALL'
+    
+    @classmethod
+    def backend(cls):
+        try:
+            return caches[cls.CACHE_ALIAS]
+        except InvalidCacheBackendError:
+            return caches['default']
+    
+    @classmethod
+    def timeout(cls):
+        return getattr(settings, 'KPI_CACHE_TIMEOUT', 300)
+    
+    @classmethod
+    def generation(cls):
+        cache = cls.backend()
+        generation = cache.get(cls.GENERATION_KEY)
+        if generation is None:
+            # Seed from the clock so a culled counter never revives old entries
+            cache.add(cls.GENERATION_KEY, int(time.time()), timeout=None)
+            generation = cache.get(cls.GENERATION_KEY)
+        return generation
+    
+    @classmethod
+    def make_key(cls, period_start, period_end, kpi_type):
+        return f"kpi:{cls.generation()}:{period_start.isoformat()}:{period_end.isoformat()}:{kpi_type}"
+    
+    @classmethod
+    def get_or_calculate(cls, period_start, period_end, kpi_type, calculate):
+        """Return the cached value for the key, calculating and storing it on a miss"""
+        cache = cls.backend()
+        key = cls.make_key(period_start, period_end, kpi_type)
+        
+        result = cache.get(key)
+        if result is None:
+            result = calculate()
+            cache.set(key, result, timeout=cls.timeout())
+        return result
+    
+    @classmethod
+    def get_all_kpis(cls, period_start, period_end):
+        """Cached KPICalculationService.calculate_all_kpis"""
+        return cls.get_or_calculate(
+            period_start, period_end, cls.ALL_KPIS,
+            lambda: KPICalculationService.calculate_all_kpis(period_start, period_end)
+        )
+    
+    @classmethod
+    def get_kpi(cls, kpi_type, period_start, period_end, calculate):
+        """Cached single-KPI calculation (calculate takes period_start, period_end)"""
+        return cls.get_or_calculate(
+            period_start, period_end, kpi_type,
+            lambda: calculate(period_start, period_end)
+        )
+    
+    @classmethod
+    def invalidate(cls):
+        """Drop every cached KPI result"""
+        cache = cls.backend()
+        try:
+            cache.incr(cls.GENERATION_KEY)
+        except ValueError:
+            cache.set(cls.GENERATION_KEY, int(time.time()), timeout=None)
@@ -9,7 +9,7 @@ from .models import (
     EmailNotificationLog, WorkOrder, KPISnapshot, 
     BackjobMonitoring, QIInspection, SLATracking
 )
-from .kpi_service import KPICalculationService
+from .kpi_cache import KPICacheService
 
 
 class KPIEmailService:
@@ -71,7 +71,7 @@ class KPIEmailService:
         period_start = today.replace(day=1)
         period_end = (period_start + relativedelta(months=1)) - timedelta(days=1)
         
-        return KPICalculationService.calculate_all_kpis(period_start, period_end)
+        return KPICacheService.get_all_kpis(period_start, period_end)
     
     @staticmethod
     def get_critical_issues():
@@ -0,0 +1,218 @@
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractYear, TruncDate
+from django.utils import timezone
+from .models import WorkOrder, WorkOrderDailyRollup
+
+
+ZERO = Decimal('0')
+
+
+class WorkOrderRollupService:
+    """
+    Maintains WorkOrderDailyRollup from work order writes.
+
+    A work order contributes one bucket per populated date field, keyed by
+    (date_field, day, vendor_id, crew, status, received_year). Writes compute
+    the old and new contributions of the touched rows and apply only the
+    difference, so the rollups never need a full recompute outside rebuild().
+    """
+
+    DATE_FIELDS = {
+        'RECEIVED': 'date_received_jacket',
+        'ENERGIZED': 'date_energized',
+        'AUDITED': 'date_audited',
+        'CREATED': 'created_at',
+    }
+    SOURCE_FIELDS = [
+        'status', 'vendor_id', 'assigned_crew',
+        'date_received_jacket', 'date_energized', 'date_audited', 'created_at',
+        'total_manhours', 'total_estimated_cost', 'billed_cost',
+    ]
+    KEY_FIELDS = ['date_field', 'day', 'vendor_id', 'crew', 'status', 'received_year']
+    MEASURES = ['wo_count', 'total_manhours', 'total_estimated_cost', 'billed_cost']
+
+    # ------------------------------------------------------------------
+    # Contributions
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _day(value):
+        if isinstance(value, datetime):
+            return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        return value
+
+    @classmethod
+    def row_contributions(cls, row):
+        """Buckets a single work order (dict of SOURCE_FIELDS) adds to"""
+        contributions = {}
+        if row is None:
+            return contributions
+
+        received = row['date_received_jacket']
+        measures = (
+            1,
+            row['total_manhours'] or ZERO,
+            row['total_estimated_cost'] or ZERO,
+            row['billed_cost'] or ZERO,
+        )
+        for date_field, source in cls.DATE_FIELDS.items():
+            day = cls._day(row[source])
+            if day is None:
+                continue
+            key = (
+                date_field, day, row['vendor_id'], row['assigned_crew'] or '',
+                row['status'], received.year if received else None
+            )
+            contributions[key] = measures
+        return contributions
+
+    @classmethod
+    def queryset_contributions(cls, queryset):
+        """Buckets a set of work orders adds to, grouped in the database"""
+        contributions = {}
+        for date_field, source in cls.DATE_FIELDS.items():
+            day = TruncDate(source) if source == 'created_at' else F(source)
+            rows = queryset.order_by().filter(**{f'{source}__isnull': False}).values(
+                'vendor_id', 'status',
+                bucket_day=day,
+                crew_key=Coalesce('assigned_crew', Value('')),
+                received_year=ExtractYear('date_received_jacket'),
+            ).annotate(
+                wo_count=Count('pk'),
+                manhours=Sum('total_manhours'),
+                estimated_cost=Sum('total_estimated_cost'),
+                billed=Sum('billed_cost'),
+            )
+            for row in rows:
+                key = (
+                    date_field, row['bucket_day'], row['vendor_id'], row['crew_key'],
+                    row['status'], row['received_year']
+                )
+                contributions[key] = (
+                    row['wo_count'],
+                    row['manhours'] or ZERO,
+                    row['estimated_cost'] or ZERO,
+                    row['billed'] or ZERO,
+                )
+        return contributions
+
+    @staticmethod
+    def diff(before, after):
+        """after - before, per bucket"""
+        delta = {key: tuple(measures) for key, measures in after.items()}
+        for key, measures in before.items():
+            current = delta.get(key, (0, ZERO, ZERO, ZERO))
+            delta[key] = tuple(new - old for new, old in zip(current, measures))
+        return delta
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def apply_delta(cls, delta):
+        """Add per-bucket measure deltas to the rollup table"""
+        delta = {key: measures for key, measures in delta.items() if any(measures)}
+        if not delta:
+            return
+
+        days_by_field = {}
+        for key in delta:
+            days_by_field.setdefault(key[0], set()).add(key[1])
+        lookup = Q()
+        for date_field, days in days_by_field.items():
+            lookup |= Q(date_field=date_field, day__in=days)
+
+        with transaction.atomic():
+            existing = {}
+            for rollup in WorkOrderDailyRollup.objects.select_for_update().filter(lookup).order_by('pk'):
+                existing.setdefault(tuple(getattr(rollup, field) for field in cls.KEY_FIELDS), rollup)
+
+            # Changed buckets are rewritten (delete + insert) rather than
+            # bulk_update()d, which degrades badly on large CASE statements
+            to_delete, to_create = [], []
+            for key, measures in delta.items():
+                rollup = existing.get(key)
+                if rollup is not None:
+                    to_delete.append(rollup.pk)
+                    measures = [
+                        getattr(rollup, field) + change
+                        for field, change in zip(cls.MEASURES, measures)
+                    ]
+                    if not any(measures):
+                        continue
+
+                to_create.append(WorkOrderDailyRollup(
+                    **dict(zip(cls.KEY_FIELDS, key)),
+                    **dict(zip(cls.MEASURES, measures))
+                ))
+
+            if to_delete:
+                WorkOrderDailyRollup.objects.filter(pk__in=to_delete).delete()
+            if to_create:
+                WorkOrderDailyRollup.objects.bulk_create(to_create, batch_size=1000)
+
+    @classmethod
+    def apply_change(cls, previous, work_order):
+        """Apply a single save; previous is the stored SOURCE_FIELDS dict (None on insert)"""
+        current = {field: getattr(work_order, field) for field in cls.SOURCE_FIELDS}
+        cls.apply_delta(cls.diff(cls.row_contributions(previous), cls.row_contributions(current)))
+
+    @classmethod
+    def remove(cls, work_order):
+        """Take a deleted work order out of the rollups"""
+        current = {field: getattr(work_order, field) for field in cls.SOURCE_FIELDS}
+        cls.apply_delta(cls.diff(cls.row_contributions(current), {}))
+
+    @classmethod
+    @contextmanager
+    def track(cls, queryset):
+        """
+        Keep rollups correct across a bulk write that bypasses save().
+
+        queryset should select the touched rows by key (e.g. wo_id__in / wo_no__in)
+        so the same rows are matched before and after the write.
+        """
+        with transaction.atomic():
+            before = cls.queryset_contributions(queryset)
+            yield
+            after = cls.queryset_contributions(queryset)
+            cls.apply_delta(cls.diff(before, after))
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every rollup row from work_orders; returns the number of buckets"""
+        with transaction.atomic():
+            WorkOrderDailyRollup.objects.all().delete()
+            contributions = cls.queryset_contributions(WorkOrder.objects.all())
+            WorkOrderDailyRollup.objects.bulk_create(
+                (
+                    WorkOrderDailyRollup(
+                        **dict(zip(cls.KEY_FIELDS, key)),
+                        **dict(zip(cls.MEASURES, measures))
+                    )
+                    for key, measures in contributions.items()
+                ),
+                batch_size=1000
+            )
+        return len(contributions)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def totals(**filters):
+        """
+        Sum rollup measures in one query. Each keyword maps a result name to a
+        (measure, Q) pair, e.g. received=('wo_count', Q(date_field='RECEIVED', ...)).
+        """
+        totals = WorkOrderDailyRollup.objects.aggregate(**{
+            name: Sum(measure, filter=condition)
+            for name, (measure, condition) in filters.items()
+        })
+        return {name: value or 0 for name, value in totals.items()}
@@ -1,5 +1,9 @@
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+import numpy as np
+import pandas as pd
+from django.conf import settings
 from django.db.models import Count, Sum, Avg, F, Q
 from django.utils import timezone
 from .models import (
@@ -10,49 +14,21 @@ from .models import (
 class KPICalculationService:
     """Service for calculating all KPI metrics"""
     
-    @staticmethod
-    def get_spt_by_applied_load(applied_load: float) -> float:
+    # SPT clusters: inclusive upper bounds and the SPT of each bucket (last bucket is open-ended)
+    SPT_APPLIED_LOAD_BOUNDS = [50, 100, 200, 300, 400, 500, 1000]
+    SPT_APPLIED_LOAD_VALUES = [36.0, 34.0, 32.0, 30.0, 28.0, 26.0, 23.0, 20.0]
+    SPT_MANHOUR_BOUNDS = [50, 100, 200, 300, 400, 500, 1000, 1500, 2000]
+    SPT_MANHOUR_VALUES = [20.0, 23.0, 26.0, 28.0, 30.0, 32.0, 36.0, 40.0, 45.0, 50.0]
+    
+    @classmethod
+    def get_spt_by_applied_load(cls, applied_load: float) -> float:
         """Get Standard Processing Time based on Applied Load cluster"""
-        if applied_load <= 50:
-            return 36.0
-        elif applied_load <= 100:
-            return 34.0
-        elif applied_load <= 200:
-            return 32.0
-        elif applied_load <= 300:
-            return 30.0
-        elif applied_load <= 400:
-            return 28.0
-        elif applied_load <= 500:
-            return 26.0
-        elif applied_load <= 1000:
-            return 23.0
-        else:
-            return 20.0
+        return cls.SPT_APPLIED_LOAD_VALUES[bisect_left(cls.SPT_APPLIED_LOAD_BOUNDS, applied_load)]
     
-    @staticmethod
-    def get_spt_by_manhour(manhours: float) -> float:
+    @classmethod
+    def get_spt_by_manhour(cls, manhours: float) -> float:
         """Get Standard Processing Time based on Manhour cluster"""
-        if manhours <= 50:
-            return 20.0
-        elif manhours <= 100:
-            return 23.0
-        elif manhours <= 200:
-            return 26.0
-        elif manhours <= 300:
-            return 28.0
-        elif manhours <= 400:
-            return 30.0
-        elif manhours <= 500:
-            return 32.0
-        elif manhours <= 1000:
-            return 36.0
-        elif manhours <= 1500:
-            return 40.0
-        elif manhours <= 2000:
-            return 45.0
-        else:
-            return 50.0
+        return cls.SPT_MANHOUR_VALUES[bisect_left(cls.SPT_MANHOUR_BOUNDS, manhours)]
     
     @classmethod
     def calculate_ccti(cls, period_start, period_end):
@@ -374,8 +350,21 @@ class KPICalculationService:
         }
     
     @classmethod
-    def calculate_all_kpis(cls, period_start, period_end):
-        """Calculate all KPIs for a given period"""
+    def calculate_all_kpis(cls, period_start, period_end, engine=None):
+        """
+        Calculate all KPIs for a given period
+        
+        engine: 'vectorized' (default, see KPI_ENGINE setting) computes everything
+        from one pass over work_orders; 'rollup' sums WorkOrderDailyRollup rows
+        for the count/cost KPIs; 'queryset' runs the per-KPI methods above.
+        """
+        engine = engine or getattr(settings, 'KPI_ENGINE', 'vectorized')
+        
+        if engine == 'vectorized':
+            return VectorizedKPIEngine(period_start, period_end).calculate_all()
+        if engine == 'rollup':
+            return RollupKPIEngine(period_start, period_end).calculate_all()
+        
         return {
             'period_start': period_start,
             'period_end': period_end,
@@ -387,4 +376,408 @@ class KPICalculationService:
             'cost_settlement': cls.calculate_cost_settlement(period_start, period_end),
             'quality_index': cls.calculate_quality_index(period_start, period_end),
             'capability_utilization': cls.calculate_capability_utilization(period_start, period_end)
-        }
\ No newline at end of file
+        }
+
+
+class VectorizedKPIEngine:
+    """
+    Set-based KPI engine.
+    
+    Pulls the date/decimal columns the KPIs need from work_orders in a single
+    values_list query (plus one for vendor productivity) and computes every KPI
+    with pandas/NumPy array operations. Returns the same dict shape as the
+    per-KPI methods on KPICalculationService.
+    """
+    
+    WORK_ORDER_COLUMNS = [
+        'wo_no', 'status',
+        'date_received_jacket', 'date_received_awarding', 'date_energized', 'date_audited',
+        'total_manhours', 'total_estimated_cost', 'billed_cost',
+    ]
+    DATE_COLUMNS = ['date_received_jacket', 'date_received_awarding', 'date_energized', 'date_audited']
+    DECIMAL_COLUMNS = ['total_manhours', 'total_estimated_cost', 'billed_cost']
+    
+    OPEN_STATUSES = ['NEW', 'FOR AUDIT']
+    COMPLETED_STATUSES = ['AUDITED', 'PAID']
+    
+    def __init__(self, period_start, period_end, ageing_cutoff_year=2024, prdi_spt_days=60.0):
+        self.period_start = period_start
+        self.period_end = period_end
+        self.ageing_cutoff_year = ageing_cutoff_year
+        self.prdi_spt_days = prdi_spt_days
+        self._work_orders = None
+    
+    # ------------------------------------------------------------------
+    # Data loading
+    # ------------------------------------------------------------------
+    
+    # KPIs computed from the work order frame; subclasses that answer some
+    # KPIs from elsewhere narrow this so fewer rows are loaded
+    FRAME_KPIS = [
+        'ccti', 'pca_conversion', 'ageing_completion', 'termination_apt',
+        'prdi', 'cost_settlement', 'quality_index',
+    ]
+    
+    def _kpi_filters(self):
+        """Rows each frame KPI can use"""
+        period = [self.period_start, self.period_end]
+        return {
+            'ccti': Q(date_energized__range=period),
+            'pca_conversion': (
+                Q(status__in=self.OPEN_STATUSES, date_received_jacket__lt=self.period_start)
+                | Q(date_received_jacket__range=period)
+                | Q(date_audited__range=period)
+            ),
+            'ageing_completion': Q(date_received_jacket__lt=date(self.ageing_cutoff_year + 1, 1, 1)),
+            'termination_apt': Q(date_audited__range=period),
+            'prdi': Q(date_audited__range=period),
+            'cost_settlement': Q(status__in=['NEW', 'AUDITED', 'PAID']),
+            'quality_index': Q(date_audited__range=period),
+        }
+    
+    def _relevant_filter(self):
+        """Rows that can contribute to at least one frame KPI"""
+        filters = self._kpi_filters()
+        relevant = Q()
+        for kpi in self.FRAME_KPIS:
+            relevant |= filters[kpi]
+        return relevant
+    
+    @property
+    def work_orders(self):
+        if self._work_orders is None:
+            rows = WorkOrder.objects.filter(self._relevant_filter()).values_list(*self.WORK_ORDER_COLUMNS)
+            df = pd.DataFrame.from_records(list(rows), columns=self.WORK_ORDER_COLUMNS)
+            
+            for column in self.DATE_COLUMNS:
+                df[column] = pd.to_datetime(df[column])
+            for column in self.DECIMAL_COLUMNS:
+                df[column] = pd.to_numeric(df[column])
+            
+            self._work_orders = df
+        return self._work_orders
+    
+    def _in_period(self, column):
+        dates = self.work_orders[column]
+        return (dates >= pd.Timestamp(self.period_start)) & (dates <= pd.Timestamp(self.period_end))
+    
+    @staticmethod
+    def _days_between(later, earlier):
+        return (later - earlier).dt.days.astype('int64')
+    
+    @staticmethod
+    def spt_lookup(values, bounds, spt_values):
+        """Vectorized SPT cluster lookup (same buckets as the scalar helpers)"""
+        return np.asarray(spt_values)[np.searchsorted(bounds, values, side='left')]
+    
+    # ------------------------------------------------------------------
+    # KPIs
+    # ------------------------------------------------------------------
+    
+    def ccti(self):
+        df = self.work_orders
+        mask = (
+            self._in_period('date_energized')
+            & df['date_received_awarding'].notna()
+            & df['total_manhours'].notna()
+            & df['total_estimated_cost'].notna()
+        )
+        selected = df[mask]
+        
+        if selected.empty:
+            return {'value': 0, 'sample_size': 0, 'details': []}
+        
+        # Use estimated cost as proxy for applied load (kW equivalent)
+        applied_load = selected['total_estimated_cost'].to_numpy() / 1000
+        manhours = selected['total_manhours'].to_numpy()
+        duration = self._days_between(selected['date_energized'], selected['date_received_awarding']).to_numpy()
+        
+        spt_m = self.spt_lookup(manhours, KPICalculationService.SPT_MANHOUR_BOUNDS,
+                                KPICalculationService.SPT_MANHOUR_VALUES)
+        spt_r = self.spt_lookup(applied_load, KPICalculationService.SPT_APPLIED_LOAD_BOUNDS,
+                                KPICalculationService.SPT_APPLIED_LOAD_VALUES)
+        components = (0.30 * (duration / spt_m)) + (0.70 * (duration / spt_r))
+        
+        details = [
+            {
+                'wo_no': wo_no,
+                'duration': days,
+                'spt_m': m,
+                'spt_r': r,
+                'ccti_component': round(component, 4)
+            }
+            for wo_no, days, m, r, component in zip(
+                selected['wo_no'].tolist(), duration.tolist(), spt_m.tolist(),
+                spt_r.tolist(), components.tolist()
+            )
+        ]
+        
+        return {
+            'value': round(float(components.mean()), 4),
+            'sample_size': len(details),
+            'details': details
+        }
+    
+    def pca_conversion(self):
+        df = self.work_orders
+        received_mask = self._in_period('date_received_jacket')
+        
+        carryover = int((
+            (df['date_received_jacket'] < pd.Timestamp(self.period_start))
+            & df['status'].isin(self.OPEN_STATUSES)
+        ).sum())
+        received = int(received_mask.sum())
+        cancelled = int((received_mask & (df['status'] == 'CANCELLED')).sum())
+        completed = int((self._in_period('date_audited') & df['status'].isin(self.COMPLETED_STATUSES)).sum())
+        
+        return self._pca_conversion_result(carryover, received, cancelled, completed)
+    
+    @staticmethod
+    def _pca_conversion_result(carryover, received, cancelled, completed):
+        total_wos = carryover + received - cancelled
+        conversion_rate = (completed / total_wos) * 100 if total_wos != 0 else 0
+        
+        return {
+            'value': round(conversion_rate, 2),
+            'numerator': completed,
+            'denominator': total_wos,
+            'details': {
+                'carryover': carryover,
+                'received': received,
+                'cancelled': cancelled,
+                'completed': completed
+            }
+        }
+    
+    def ageing_completion(self):
+        df = self.work_orders
+        ageing_mask = df['date_received_jacket'].dt.year <= self.ageing_cutoff_year
+        
+        total_ageing = int(ageing_mask.sum())
+        completed_ageing = int((
+            ageing_mask
+            & self._in_period('date_audited')
+            & df['status'].isin(self.COMPLETED_STATUSES)
+        ).sum())
+        
+        return self._ageing_completion_result(total_ageing, completed_ageing)
+    
+    def _ageing_completion_result(self, total_ageing, completed_ageing):
+        completion_rate = (completed_ageing / total_ageing) * 100 if total_ageing != 0 else 0
+        
+        return {
+            'value': round(completion_rate, 2),
+            'numerator': completed_ageing,
+            'denominator': total_ageing,
+            'details': {
+                'cutoff_year': self.ageing_cutoff_year,
+                'total_ageing': total_ageing,
+                'completed_ageing': completed_ageing
+            }
+        }
+    
+    def termination_apt(self):
+        df = self.work_orders
+        selected = df[self._in_period('date_audited') & df['date_received_awarding'].notna()]
+        
+        if selected.empty:
+            return {'value': 0, 'sample_size': 0, 'details': []}
+        
+        days = self._days_between(selected['date_audited'], selected['date_received_awarding'])
+        details = [
+            {'wo_no': wo_no, 'processing_days': processing_days}
+            for wo_no, processing_days in zip(selected['wo_no'].tolist(), days.tolist())
+        ]
+        
+        return {
+            'value': round(float(days.mean()), 2),
+            'sample_size': len(details),
+            'details': details
+        }
+    
+    def prdi(self):
+        df = self.work_orders
+        selected = df[self._in_period('date_audited') & df['date_energized'].notna()]
+        
+        if selected.empty:
+            return {'value': 0, 'sample_size': 0, 'details': []}
+        
+        duration = self._days_between(selected['date_audited'], selected['date_energized'])
+        components = duration / self.prdi_spt_days
+        details = [
+            {'wo_no': wo_no, 'duration': days, 'prdi_component': round(component, 4)}
+            for wo_no, days, component in zip(
+                selected['wo_no'].tolist(), duration.tolist(), components.tolist()
+            )
+        ]
+        
+        return {
+            'value': round(float(components.mean()), 4),
+            'sample_size': len(details),
+            'details': details
+        }
+    
+    def cost_settlement(self):
+        df = self.work_orders
+        status = df['status']
+        
+        teco_closed_cost = float(df.loc[status == 'PAID', 'billed_cost'].sum())
+        pending_cost = float(df.loc[status == 'NEW', 'total_estimated_cost'].sum())
+        comp_cost = float(df.loc[status == 'AUDITED', 'billed_cost'].sum())
+        
+        return self._cost_settlement_result(teco_closed_cost, pending_cost, comp_cost)
+    
+    @staticmethod
+    def _cost_settlement_result(teco_closed_cost, pending_cost, comp_cost):
+        total_cost = pending_cost + comp_cost + teco_closed_cost
+        settlement_rate = (teco_closed_cost / total_cost) * 100 if total_cost != 0 else 0
+        
+        return {
+            'value': round(settlement_rate, 2),
+            'numerator': teco_closed_cost,
+            'denominator': total_cost,
+            'details': {
+                'teco_closed_cost': teco_closed_cost,
+                'pending_cost': pending_cost,
+                'comp_cost': comp_cost,
+                'total_cost': total_cost
+            }
+        }
+    
+    def quality_index(self):
+        df = self.work_orders
+        audited_mask = self._in_period('date_audited')
+        
+        audited_wos = int(audited_mask.sum())
+        passed_wos = int((audited_mask & df['status'].isin(self.COMPLETED_STATUSES)).sum())
+        
+        return self._quality_index_result(audited_wos, passed_wos)
+    
+    @staticmethod
+    def _quality_index_result(audited_wos, passed_wos):
+        quality_index = (passed_wos / audited_wos) * 100 if audited_wos != 0 else 0
+        
+        return {
+            'value': round(quality_index, 2),
+            'numerator': passed_wos,
+            'denominator': audited_wos,
+            'details': {
+                'audited_wos': audited_wos,
+                'passed_wos': passed_wos
+            }
+        }
+    
+    def capability_utilization(self):
+        rows = list(VendorProductivityMonthly.objects.filter(
+            month=self.period_start.replace(day=1)
+        ).values_list('vendor__vendor_name', 'monthly_accomplishment', 'monthly_capability'))
+        
+        if not rows:
+            return {'value': 0, 'sample_size': 0, 'details': []}
+        
+        vendor_names = [row[0] for row in rows]
+        accomplishment = np.array([float(row[1]) for row in rows])
+        capability = np.array([float(row[2]) for row in rows])
+        
+        total_actual = float(accomplishment.sum())
+        total_capability = float(capability.sum())
+        utilization = (total_actual / total_capability) * 100 if total_capability != 0 else 0
+        
+        vendor_util = np.divide(
+            accomplishment * 100, capability,
+            out=np.zeros_like(accomplishment), where=capability > 0
+        )
+        details = [
+            {
+                'vendor': vendor_name,
+                'accomplishment': actual,
+                'capability': capable,
+                'utilization': round(util, 2)
+            }
+            for vendor_name, actual, capable, util in zip(
+                vendor_names, accomplishment.tolist(), capability.tolist(), vendor_util.tolist()
+            )
+        ]
+        
+        return {
+            'value': round(utilization, 2),
+            'numerator': total_actual,
+            'denominator': total_capability,
+            'sample_size': len(rows),
+            'details': details
+        }
+    
+    def calculate_all(self):
+        return {
+            'period_start': self.period_start,
+            'period_end': self.period_end,
+            'ccti': self.ccti(),
+            'pca_conversion': self.pca_conversion(),
+            'ageing_completion': self.ageing_completion(),
+            'termination_apt': self.termination_apt(),
+            'prdi': self.prdi(),
+            'cost_settlement': self.cost_settlement(),
+            'quality_index': self.quality_index(),
+            'capability_utilization': self.capability_utilization()
+        }
+
+
+class RollupKPIEngine(VectorizedKPIEngine):
+    """
+    KPI engine backed by WorkOrderDailyRollup.
+    
+    The count/sum KPIs (PCA conversion, ageing completion, cost settlement,
+    quality index) are answered by one aggregate over the rollup rows, so they
+    cost O(days in period) rather than O(work orders). KPIs that report
+    per-work-order details still come from the work order frame, which is
+    narrowed to rows energized/audited in the period.
+    """
+    
+    FRAME_KPIS = ['ccti', 'termination_apt', 'prdi']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._totals = None
+    
+    @property
+    def totals(self):
+        if self._totals is None:
+            from .kpi_rollup import WorkOrderRollupService
+            
+            received = Q(date_field='RECEIVED')
+            audited_in_period = Q(date_field='AUDITED', day__range=[self.period_start, self.period_end])
+            completed = Q(status__in=self.COMPLETED_STATUSES)
+            ageing = Q(received_year__lte=self.ageing_cutoff_year)
+            created = Q(date_field='CREATED')
+            
+            self._totals = WorkOrderRollupService.totals(
+                carryover=('wo_count', received & Q(day__lt=self.period_start, status__in=self.OPEN_STATUSES)),
+                received=('wo_count', received & Q(day__range=[self.period_start, self.period_end])),
+                cancelled=('wo_count', received & Q(day__range=[self.period_start, self.period_end], status='CANCELLED')),
+                audited=('wo_count', audited_in_period),
+                completed=('wo_count', audited_in_period & completed),
+                total_ageing=('wo_count', received & ageing),
+                completed_ageing=('wo_count', audited_in_period & completed & ageing),
+                teco_closed_cost=('billed_cost', created & Q(status='PAID')),
+                pending_cost=('total_estimated_cost', created & Q(status='NEW')),
+                comp_cost=('billed_cost', created & Q(status='AUDITED')),
+            )
+        return self._totals
+    
+    def pca_conversion(self):
+        totals = self.totals
+        return self._pca_conversion_result(
+            totals['carryover'], totals['received'], totals['cancelled'], totals['completed']
+        )
+    
+    def ageing_completion(self):
+        return self._ageing_completion_result(self.totals['total_ageing'], self.totals['completed_ageing'])
+    
+    def cost_settlement(self):
+        totals = self.totals
+        return self._cost_settlement_result(
+            float(totals['teco_closed_cost']), float(totals['pending_cost']), float(totals['comp_cost'])
+        )
+    
+    def quality_index(self):
+        return self._quality_index_result(self.totals['audited'], self.totals['completed'])
@@ -0,0 +1,58 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.core.management.base import BaseCommand
+
+BOOT = (
+    'import importlib, django; django.setup(); '
+    'from django.conf import settings; importlib.import_module(settings.ROOT_URLCONF)'
+)
+WARMUP = (
+    BOOT + '; import json; from meralcoapp.model_loading import readiness, warmup; '
+    'warmup(); print(json.dumps(readiness()))'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures cold start in fresh interpreters: Django setup plus the URLconf import '
+        '(what every worker and manage.py command pays), with and without loading the ML '
+        'and chatbot models (the cost every boot paid when they loaded at import)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Interpreters started per scenario')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'meralcosys.settings')
+
+        scenarios = [
+            ('python startup', 'pass'),
+            ('boot (models lazy)', BOOT),
+            ('boot + model warmup', WARMUP),
+        ]
+        self.stdout.write(f'{"scenario":<24}{"min s":>10}{"median s":>10}')
+        for name, code in scenarios:
+            timings, output = [], ''
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                result = subprocess.run(
+                    [sys.executable, '-c', code], env=env, capture_output=True, text=True
+                )
+                timings.append(time.perf_counter() - started)
+                if result.returncode != 0:
+                    raise SystemExit(f'{name} failed:\n{result.stderr}')
+                output = result.stdout
+            self.stdout.write(f'{name:<24}{min(timings):>10.2f}{statistics.median(timings):>10.2f}')
+
+            if code is WARMUP:
+                readiness = json.loads(output.strip().splitlines()[-1])
+                for service, status in readiness['services'].items():
+                    line = f'  {service}: {status["state"]}, loaded in {status["load_seconds"]}s'
+                    if status['error']:
+                        line = f'  {service}: {status["state"]} ({status["error"]})'
+                    self.stdout.write(line)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from meralcoapp.ageing_service import AgeingAnalysisService
+
+
+class Command(BaseCommand):
+    help = 'Generates (or regenerates) the ageing analysis run for a date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Analysis date as YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **kwargs):
+        analysis_date = None
+        if kwargs['date']:
+            try:
+                analysis_date = datetime.strptime(kwargs['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Invalid date format. Use YYYY-MM-DD')
+
+        count = AgeingAnalysisService.generate(analysis_date)
+        self.stdout.write(self.style.SUCCESS(f'Generated ageing analysis for {count} work orders'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from meralcoapp.vendor_metrics import VendorScorecardService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds vendor_scorecards from projects, penalties, SLA tracking and work orders'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Rebuilding vendor scorecards...')
+        vendors = VendorScorecardService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt scorecards for {vendors} vendors'))
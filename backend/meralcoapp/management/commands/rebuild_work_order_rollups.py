@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from meralcoapp.kpi_cache import KPICacheService
+from meralcoapp.kpi_rollup import WorkOrderRollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds work_order_daily_rollups from work_orders'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Rebuilding work order daily rollups...')
+        buckets = WorkOrderRollupService.rebuild()
+        KPICacheService.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {buckets} rollup buckets'))
@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from meralcoapp.import_jobs import ImportJobService
+
+
+class Command(BaseCommand):
+    help = 'Processes pending Excel import jobs (use with IMPORT_JOB_RUNNER = "worker")'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Process pending jobs and exit instead of polling')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Import worker started')
+
+        while True:
+            close_old_connections()
+            job = ImportJobService.claim_next()
+
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'Processing {job.import_type} job {job.pk}...')
+            job = ImportJobService.run(job)
+            style = self.style.SUCCESS if job.status == 'COMPLETED' else self.style.ERROR
+            self.stdout.write(style(f'Job {job.pk} {job.status.lower()} ({job.rows_processed}/{job.total_rows} rows)'))
@@ -0,0 +1,49 @@
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from meralcoapp.inference import InferenceServer
+from meralcoapp.model_loading import local_readiness, warmup
+
+
+class Command(BaseCommand):
+    help = (
+        'Serves the ML and chatbot models to every web worker on this host over a Unix socket '
+        '(set INFERENCE_SOCKET in the web workers to use it)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=None,
+                            help='Socket path (default: INFERENCE_SOCKET)')
+        parser.add_argument('--batch-window-ms', type=float, default=None,
+                            help='How long to gather concurrent requests into one model call '
+                                 '(default: INFERENCE_BATCH_WINDOW_MS)')
+        parser.add_argument('--max-batch', type=int, default=None,
+                            help='Most items per model call (default: INFERENCE_MAX_BATCH)')
+
+    def handle(self, *args, **options):
+        socket_path = options['socket'] or settings.INFERENCE_SOCKET
+        if not socket_path:
+            raise CommandError('Pass --socket or set INFERENCE_SOCKET')
+
+        self.stdout.write('Loading models...')
+        warmup()
+        for name, status in local_readiness()['services'].items():
+            if status['state'] == 'ready':
+                self.stdout.write(self.style.SUCCESS(f'{name} loaded in {status["load_seconds"]}s'))
+            else:
+                self.stdout.write(self.style.WARNING(f'{name} failed to load: {status["error"]}'))
+
+        server = InferenceServer(socket_path, options['batch_window_ms'], options['max_batch'])
+        self.stdout.write(f'Inference server listening on {socket_path}')
+        # Stop on SIGTERM like on Ctrl-C, so the socket file is removed
+        signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
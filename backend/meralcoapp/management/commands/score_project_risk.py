@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from meralcoapp.risk_scoring import ProjectRiskScoringService
+
+
+class Command(BaseCommand):
+    help = 'Scores the delay risk of every active project into project_risk_scores (run nightly)'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Scoring active projects...')
+        scored, skipped = ProjectRiskScoringService.score()
+        self.stdout.write(self.style.SUCCESS(f'Scored {scored} projects'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'Skipped {skipped} projects with a status, priority or risk the model does not know'
+            ))
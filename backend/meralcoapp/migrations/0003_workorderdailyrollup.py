@@ -0,0 +1,80 @@
+# Generated by Django 4.2 on 2026-10-18 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, ExtractYear, TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    """Seed the rollups from existing work orders (same buckets as WorkOrderRollupService)"""
+    WorkOrder = apps.get_model('meralcoapp', 'WorkOrder')
+    WorkOrderDailyRollup = apps.get_model('meralcoapp', 'WorkOrderDailyRollup')
+
+    date_fields = {
+        'RECEIVED': 'date_received_jacket',
+        'ENERGIZED': 'date_energized',
+        'AUDITED': 'date_audited',
+        'CREATED': 'created_at',
+    }
+    rollups = []
+    for date_field, source in date_fields.items():
+        day = TruncDate(source) if source == 'created_at' else F(source)
+        rows = WorkOrder.objects.order_by().filter(**{f'{source}__isnull': False}).values(
+            'vendor_id', 'status',
+            bucket_day=day,
+            crew_key=Coalesce('assigned_crew', Value('')),
+            received_year=ExtractYear('date_received_jacket'),
+        ).annotate(
+            wo_count=Count('pk'),
+            manhours=Sum('total_manhours'),
+            estimated_cost=Sum('total_estimated_cost'),
+            billed=Sum('billed_cost'),
+        )
+        for row in rows:
+            rollups.append(WorkOrderDailyRollup(
+                date_field=date_field,
+                day=row['bucket_day'],
+                vendor_id=row['vendor_id'],
+                crew=row['crew_key'],
+                status=row['status'],
+                received_year=row['received_year'],
+                wo_count=row['wo_count'],
+                total_manhours=row['manhours'] or 0,
+                total_estimated_cost=row['estimated_cost'] or 0,
+                billed_cost=row['billed'] or 0,
+            ))
+    WorkOrderDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meralcoapp', '0002_changelog_delayfactor_documentcompliance_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkOrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_field', models.CharField(choices=[('RECEIVED', 'Date Received Jacket'), ('ENERGIZED', 'Date Energized'), ('AUDITED', 'Date Audited'), ('CREATED', 'Date Created')], max_length=20)),
+                ('day', models.DateField()),
+                ('crew', models.CharField(blank=True, default='', max_length=50)),
+                ('status', models.CharField(max_length=50)),
+                ('received_year', models.IntegerField(blank=True, null=True)),
+                ('wo_count', models.IntegerField(default=0)),
+                ('total_manhours', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('total_estimated_cost', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('billed_cost', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('vendor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='work_order_rollups', to='meralcoapp.vendor')),
+            ],
+            options={
+                'db_table': 'work_order_daily_rollups',
+                'ordering': ['date_field', 'day'],
+                'indexes': [models.Index(fields=['date_field', 'day'], name='work_order__date_fi_c26801_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
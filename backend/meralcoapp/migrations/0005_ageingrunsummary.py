@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_summaries(apps, schema_editor):
+    """Summarize ageing runs generated before the summary table existed"""
+    AgeingAnalysis = apps.get_model('meralcoapp', 'AgeingAnalysis')
+    AgeingRunSummary = apps.get_model('meralcoapp', 'AgeingRunSummary')
+
+    groups = AgeingAnalysis.objects.order_by().values(
+        'analysis_date', 'age_bracket', 'supervisor_id',
+        crew_key=Coalesce('crew', Value(''))
+    ).annotate(
+        wo_count=Count('id'),
+        manhours=Sum('work_order__total_manhours')
+    )
+    AgeingRunSummary.objects.bulk_create(
+        (
+            AgeingRunSummary(
+                analysis_date=group['analysis_date'],
+                age_bracket=group['age_bracket'],
+                supervisor_id=group['supervisor_id'],
+                crew=group['crew_key'],
+                wo_count=group['wo_count'],
+                total_manhours=group['manhours'] or 0
+            )
+            for group in groups
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('meralcoapp', '0004_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgeingRunSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('analysis_date', models.DateField()),
+                ('age_bracket', models.CharField(choices=[('0-3', '0-3 Months'), ('4-6', '4-6 Months'), ('7-9', '7-9 Months'), ('10+', '10 Months and Above')], max_length=10)),
+                ('crew', models.CharField(blank=True, default='', max_length=50)),
+                ('wo_count', models.IntegerField(default=0)),
+                ('total_manhours', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('supervisor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ageing_run_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'ageing_run_summaries',
+                'ordering': ['-analysis_date', 'age_bracket'],
+                'indexes': [models.Index(fields=['analysis_date', 'age_bracket'], name='ageing_run__analysi_2e5a86_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
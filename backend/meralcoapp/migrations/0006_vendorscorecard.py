@@ -0,0 +1,92 @@
+# Generated by Django 4.2 on 2026-10-18 13:00
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q, Sum
+
+
+def backfill_scorecards(apps, schema_editor):
+    """Seed scorecards for every vendor (same metrics as VendorMetrics, grouped per table)"""
+    Vendor = apps.get_model('meralcoapp', 'Vendor')
+    Project = apps.get_model('meralcoapp', 'Project')
+    Penalty = apps.get_model('meralcoapp', 'Penalty')
+    SLATracking = apps.get_model('meralcoapp', 'SLATracking')
+    WorkOrder = apps.get_model('meralcoapp', 'WorkOrder')
+    VendorScorecard = apps.get_model('meralcoapp', 'VendorScorecard')
+
+    metrics = {}
+
+    def merge(rows):
+        for row in rows:
+            metrics.setdefault(row.pop('vendor'), {}).update(row)
+
+    merge(Project.objects.order_by().values('vendor').annotate(
+        total_projects=Count('pk'),
+        active_projects=Count('pk', filter=~Q(status__status_name__in=['Completed', 'Cancelled', 'Billed'])),
+        delayed_projects=Count('pk', filter=Q(is_delayed=True)),
+    ))
+    merge(Penalty.objects.exclude(penalty_status='Waived').order_by().values('vendor').annotate(
+        total_penalties=Sum('penalty_amount'),
+    ))
+    merge(SLATracking.objects.filter(is_breached=True).order_by().values(vendor=models.F('project__vendor')).annotate(
+        sla_breaches=Count('pk'),
+    ))
+    merge(WorkOrder.objects.order_by().values('vendor').annotate(
+        total_work_orders=Count('pk'),
+        completed_work_orders=Count('pk', filter=Q(status='AUDITED')),
+        delayed_work_orders=Count('pk', filter=Q(is_delayed=True)),
+        avg_resolution_days=Avg('total_resolution_days'),
+    ))
+
+    scorecards = []
+    for vendor_id, compliance_score in Vendor.objects.values_list('pk', 'compliance_score'):
+        values = metrics.get(vendor_id, {})
+        total, delayed = values.get('total_projects', 0), values.get('delayed_projects', 0)
+        scorecards.append(VendorScorecard(
+            vendor_id=vendor_id,
+            compliance_score=compliance_score or 0,
+            on_time_percentage=Decimal(str(round((total - delayed) / total * 100, 2))) if total else 0,
+            total_projects=total,
+            active_projects=values.get('active_projects', 0),
+            delayed_projects=delayed,
+            total_penalties=values.get('total_penalties') or 0,
+            sla_breaches=values.get('sla_breaches', 0),
+            total_work_orders=values.get('total_work_orders', 0),
+            completed_work_orders=values.get('completed_work_orders', 0),
+            delayed_work_orders=values.get('delayed_work_orders', 0),
+            avg_resolution_days=values.get('avg_resolution_days'),
+        ))
+    VendorScorecard.objects.bulk_create(scorecards, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meralcoapp', '0005_ageingrunsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorScorecard',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scorecard', serialize=False, to='meralcoapp.vendor')),
+                ('total_projects', models.IntegerField(default=0)),
+                ('active_projects', models.IntegerField(default=0)),
+                ('delayed_projects', models.IntegerField(default=0)),
+                ('on_time_percentage', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('total_penalties', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('sla_breaches', models.IntegerField(default=0)),
+                ('compliance_score', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('total_work_orders', models.IntegerField(default=0)),
+                ('completed_work_orders', models.IntegerField(default=0)),
+                ('delayed_work_orders', models.IntegerField(default=0)),
+                ('avg_resolution_days', models.FloatField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'vendor_scorecards',
+            },
+        ),
+        migrations.RunPython(backfill_scorecards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meralcoapp', '0006_vendorscorecard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ageinganalysis',
+            index=models.Index(fields=['-analysis_date', '-age_in_days', '-id'], name='ageing_anal_analysi_30ad42_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workorder',
+            index=models.Index(fields=['-date_received_jacket', '-wo_id'], name='work_orders_date_re_2161ed_idx'),
+        ),
+    ]
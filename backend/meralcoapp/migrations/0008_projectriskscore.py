@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 18:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meralcoapp', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectRiskScore',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='risk_prediction', serialize=False, to='meralcoapp.project')),
+                ('delay_probability', models.FloatField()),
+                ('will_delay', models.BooleanField(default=False)),
+                ('risk_level', models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], max_length=10)),
+                ('model_version', models.CharField(max_length=50)),
+                ('scored_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'project_risk_scores',
+                'indexes': [models.Index(fields=['-delay_probability'], name='project_ris_delay_p_3c6500_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,271 @@
+import re
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .exporters import NDJSONRenderer
+from .serializers import AnnotatedField
+
+
+class AnnotatedFieldsMixin:
+    """
+    Annotates the queryset with every AnnotatedField of the serializer in use,
+    so those fields cost no extra queries regardless of page size and can be
+    used by the filter and ordering backends. Updates respond with the
+    annotations re-read after the save.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        annotations = AnnotatedField.annotations_for(self.get_serializer_class())
+        if annotations:
+            # Meta.ordering is dropped from aggregated (GROUP BY) querysets; keep it explicit
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.annotate(**annotations).order_by(*ordering)
+        return queryset
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        annotations = AnnotatedField.annotations_for(self.get_serializer_class())
+        if not annotations:
+            return
+        # get_object() annotated the row as it was before the save; re-read it
+        saved = self.get_queryset().filter(pk=serializer.instance.pk).first()
+        if saved is not None:
+            serializer.instance = saved
+        else:
+            # No longer in this viewset's queryset: each field evaluates its own expression
+            for name in annotations:
+                serializer.instance.__dict__.pop(name, None)
+
+
+class SerializerQueryPlan:
+    """
+    The joins and columns a ModelSerializer needs, read from its fields.
+
+    Dotted sources ('vendor.vendor_name', 'created_by.get_full_name') and
+    nested serializers become select_related paths for forward/one-to-one
+    relations and prefetch_related paths for many relations (and anything
+    below one). Primary-key related fields only need the local column.
+
+    SerializerMethodFields can't be inspected, so a serializer lists what each
+    one reads in Meta.method_field_relations, using the same dotted paths:
+
+        method_field_relations = {'supervisor_name': ['supervisor']}
+
+    The columns of the model itself are collected too, so list/retrieve can
+    load them with only(); any root field whose source can't be resolved to
+    model fields (an undeclared method field, a property) turns that off.
+    """
+
+    _cache = {}
+
+    def __init__(self, model):
+        self.model = model
+        self.select = set()
+        self.prefetch = set()
+        self.columns = {model._meta.pk.name}
+        self.columns_known = True
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        """Plan for serializer_class (cached), or None if it isn't a ModelSerializer"""
+        if serializer_class not in cls._cache:
+            model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+            plan = None
+            if model is not None:
+                plan = cls(model)
+                plan._add_serializer(serializer_class(), model, '', False)
+            cls._cache[serializer_class] = plan
+        return cls._cache[serializer_class]
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def _add_serializer(self, serializer, model, prefix, in_prefetch):
+        method_fields = getattr(getattr(serializer, 'Meta', None), 'method_field_relations', {})
+
+        for name, field in serializer.fields.items():
+            if field.write_only or isinstance(field, AnnotatedField):
+                continue
+
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in method_fields and not prefix:
+                    self.columns_known = False
+                for path in method_fields.get(name, []):
+                    self._add_path(path.split('.'), model, prefix, in_prefetch)
+                continue
+
+            if field.source == '*':
+                if isinstance(field, serializers.BaseSerializer):
+                    self._add_serializer(field, model, prefix, in_prefetch)
+                elif not prefix:
+                    self.columns_known = False
+                continue
+
+            attrs = field.source_attrs
+            if isinstance(field, serializers.ManyRelatedField):
+                field = field.child_relation
+                pk_only = False
+            else:
+                pk_only = isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization()
+
+            if pk_only:
+                # Only the final object's primary key is read, from the local column
+                self._add_path(attrs, model, prefix, in_prefetch, follow_last=False)
+                continue
+
+            target = self._add_path(attrs, model, prefix, in_prefetch)
+            if target is not None and isinstance(field, serializers.BaseSerializer):
+                child = field.child if isinstance(field, serializers.ListSerializer) else field
+                self._add_serializer(child, *target)
+
+    def _add_path(self, attrs, model, prefix, in_prefetch, follow_last=True):
+        """
+        Record the relations and local columns attrs traverses.
+
+        Returns (model, prefix, in_prefetch) at the end of the path if it ends
+        on a relation, otherwise None.
+        """
+        for index, attr in enumerate(attrs):
+            root = not prefix
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                display = re.fullmatch(r'get_(\w+)_display', attr)
+                if root and display and self._is_column(model, display.group(1)):
+                    self.columns.add(display.group(1))
+                elif root:
+                    self.columns_known = False
+                return None
+
+            if root and field.concrete:
+                self.columns.add(field.name)
+            last = index == len(attrs) - 1
+            if not field.is_relation or (last and not follow_last):
+                return None
+
+            path = prefix + attr
+            if field.many_to_many or field.one_to_many:
+                in_prefetch = True
+            (self.prefetch if in_prefetch else self.select).add(path)
+            model = field.related_model
+            prefix = path + '__'
+
+        return model, prefix, in_prefetch
+
+    @staticmethod
+    def _is_column(model, name):
+        try:
+            return model._meta.get_field(name).concrete
+        except FieldDoesNotExist:
+            return False
+
+    # ------------------------------------------------------------------
+    # Applying
+    # ------------------------------------------------------------------
+
+    def apply(self, queryset, restrict_columns=False):
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch))
+
+        if restrict_columns and self.columns_known:
+            select_related = queryset.query.select_related
+            if select_related is True:
+                return queryset
+            # Relations the queryset already joins can't be deferred
+            columns = self.columns | {
+                name for name in (select_related or {})
+                if self._is_column(self.model, name)
+            }
+            concrete = {field.name for field in self.model._meta.concrete_fields}
+            if columns < concrete:
+                queryset = queryset.only(*sorted(columns))
+        return queryset
+
+
+class QuerysetOptimizerMixin:
+    """
+    Adds the select_related/prefetch_related paths the current action's
+    serializer needs (see SerializerQueryPlan), and for list/retrieve loads
+    only the columns it reads.
+    """
+
+    column_restricted_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        plan = SerializerQueryPlan.for_serializer(self.get_serializer_class())
+        if plan is None or plan.model is not queryset.model:
+            return queryset
+        return plan.apply(
+            queryset,
+            restrict_columns=getattr(self, 'action', None) in self.column_restricted_actions
+        )
+
+
+class PaginatedActionsMixin:
+    """
+    Response helper for custom @action endpoints that return a queryset.
+
+        return self.list_response(queryset)
+
+    Results are paginated with the viewset's pagination_class like the list
+    action. ?stream=1 instead streams every row as NDJSON, reading and
+    serializing EXPORT_CHUNK_SIZE rows at a time, so neither the response
+    nor the worker ever holds the whole table.
+
+    The related rows the serializer reads are joined or prefetched as the
+    optimizer does for the list action.
+    """
+
+    stream_query_param = 'stream'
+
+    def wants_stream(self):
+        return self.request.query_params.get(self.stream_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def list_response(self, queryset, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        plan = SerializerQueryPlan.for_serializer(serializer_class)
+        if plan is not None and plan.model is queryset.model:
+            queryset = plan.apply(queryset)
+
+        if self.wants_stream():
+            return StreamingHttpResponse(
+                self.stream_rows(queryset, serializer_class),
+                content_type=NDJSONRenderer.media_type
+            )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=self.get_serializer_context())
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    def stream_rows(self, queryset, serializer_class):
+        """One JSON object per line, serialized a chunk at a time"""
+        chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        context = self.get_serializer_context()
+        encoder = JSONEncoder()
+
+        chunk = []
+        # iterator() with a chunk_size still runs prefetch_related, per chunk
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(instance)
+            if len(chunk) >= chunk_size:
+                yield self._encode_chunk(chunk, serializer_class, context, encoder)
+                chunk = []
+        if chunk:
+            yield self._encode_chunk(chunk, serializer_class, context, encoder)
+
+    @staticmethod
+    def _encode_chunk(chunk, serializer_class, context, encoder):
+        data = serializer_class(chunk, many=True, context=context).data
+        return ''.join(encoder.encode(row) + '\n' for row in data)
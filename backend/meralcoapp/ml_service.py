@@ -1,23 +1,16 @@
 import pickle
 import numpy as np
 from django.conf import settings
+from .model_loading import LazyLoadedService
 
-class MLService:
-    _instance = None
+class MLService(LazyLoadedService):
+    """Delay and penalty models, unpickled on first use (see LazyLoadedService)"""
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(MLService, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    # Delay model inputs: encoder column -> project key, then the numeric keys
+    DELAY_CATEGORY_FIELDS = {'status': 'status', 'priority': 'priority', 'risk': 'risk_score'}
+    DELAY_NUMERIC_FIELDS = ['days_since_start', 'contract_value', 'compliance_score']
     
-    def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
-        self.load_models()
-    
-    def load_models(self):
+    def load(self):
         with open(settings.ML_MODELS_PATH, 'rb') as f:
             package = pickle.load(f)
         
@@ -27,31 +20,83 @@ class MLService:
         self.feature_cols = package['feature_cols']
         self.metadata = package['metadata']
         
+        # class -> code lookups, so a batch is encoded without LabelEncoder.transform calls
+        self.delay_class_index = {
+            column: {label: code for code, label in enumerate(encoder.classes_)}
+            for column, encoder in self.encoders['delay'].items()
+        }
+        
         print(f"✅ Models loaded (v{self.metadata['model_version']})")
     
+    @property
+    def model_version(self):
+        self.ensure_loaded()
+        return str(self.metadata.get('model_version', ''))
+    
     def predict_delay(self, project_data):
-        # Encode features
-        status_enc = self.encoders['delay']['status'].transform([project_data['status']])[0]
-        priority_enc = self.encoders['delay']['priority'].transform([project_data['priority']])[0]
-        risk_enc = self.encoders['delay']['risk'].transform([project_data['risk_score']])[0]
+        return self.predict_delay_batch([project_data])[0]
+    
+    def encode_delay_column(self, column, values):
+        """Encoder codes for values; raises ValueError naming an unseen label"""
+        self.ensure_loaded()
+        index = self.delay_class_index[column]
+        try:
+            return np.fromiter((index[value] for value in values), dtype=np.float64, count=len(values))
+        except KeyError as e:
+            raise ValueError(f'Unknown {column} value: {e.args[0]!r}')
+    
+    def validate_delay_input(self, projects):
+        """Raise ValueError for the first project predict_delay_batch would reject"""
+        self.ensure_loaded()
+        for project in projects:
+            try:
+                for column, key in self.DELAY_CATEGORY_FIELDS.items():
+                    if project[key] not in self.delay_class_index[column]:
+                        raise ValueError(f'Unknown {column} value: {project[key]!r}')
+                for key in self.DELAY_NUMERIC_FIELDS:
+                    float(project[key])
+            except KeyError as e:
+                raise ValueError(f'Missing {e.args[0]}')
+            except TypeError as e:
+                raise ValueError(f'Invalid project data: {e}')
+    
+    def predict_delay_batch(self, projects):
+        """
+        Delay predictions for many projects with one model call.
         
-        X = np.array([[
-            status_enc, priority_enc, risk_enc,
-            project_data['days_since_start'],
-            project_data['contract_value'],
-            project_data['compliance_score']
-        ]])
+        projects is a list of dicts shaped like DelayPredictionSerializer;
+        predictions come back in the same order.
+        """
+        if not projects:
+            return []
+        self.ensure_loaded()
         
-        prediction = self.delay_model.predict(X)[0]
-        probability = self.delay_model.predict_proba(X)[0][1]
+        X = np.column_stack([
+            *(
+                self.encode_delay_column(column, [p[key] for p in projects])
+                for column, key in self.DELAY_CATEGORY_FIELDS.items()
+            ),
+            np.array([
+                [p[key] for key in self.DELAY_NUMERIC_FIELDS]
+                for p in projects
+            ], dtype=np.float64)
+        ])
         
-        return {
-            'will_delay': bool(prediction),
-            'delay_probability': float(probability),
-            'risk_level': 'High' if probability > 0.7 else 'Medium' if probability > 0.4 else 'Low'
-        }
+        proba = self.delay_model.predict_proba(X)
+        # Same decision predict() makes: the most probable class
+        will_delay = self.delay_model.classes_[proba.argmax(axis=1)]
+        
+        return [
+            {
+                'will_delay': bool(delay),
+                'delay_probability': float(probability),
+                'risk_level': 'High' if probability > 0.7 else 'Medium' if probability > 0.4 else 'Low'
+            }
+            for delay, probability in zip(will_delay, proba[:, 1])
+        ]
     
     def predict_penalty(self, violation_type, delay_days):
+        self.ensure_loaded()
         violation_enc = self.encoders['violation'].transform([violation_type])[0]
         X = np.array([[violation_enc, delay_days]])
         amount = self.penalty_model.predict(X)[0]
@@ -62,5 +107,5 @@ class MLService:
             'predicted_penalty': round(float(amount), 2)
         }
 
-# Singleton instance
+# Singleton instance (loads nothing until first use)
 ml_service = MLService()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LazyLoadedService:
+    """
+    Singleton service whose models are loaded on first use instead of at import.
+
+    Subclasses implement load(). Every public method calls ensure_loaded()
+    first; the first caller loads (other threads wait on the lock) and a
+    failed load is retried on the next call. status() reports readiness
+    without loading anything, for the health endpoints.
+    """
+
+    NOT_LOADED = 'not_loaded'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __new__(cls):
+        # One instance per subclass
+        if cls.__dict__.get('_instance') is None:
+            instance = super().__new__(cls)
+            instance._initialized = False
+            cls._instance = instance
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._state = self.NOT_LOADED
+        self._error = None
+        self._load_seconds = None
+
+    def load(self):
+        raise NotImplementedError
+
+    @property
+    def is_ready(self):
+        return self._state == self.READY
+
+    def ensure_loaded(self):
+        if self._state == self.READY:
+            return
+        with self._lock:
+            if self._state == self.READY:
+                return
+            self._state = self.LOADING
+            started = time.perf_counter()
+            try:
+                self.load()
+            except Exception as e:
+                self._state = self.FAILED
+                self._error = str(e)
+                logger.exception('Loading %s failed', type(self).__name__)
+                raise
+            self._load_seconds = round(time.perf_counter() - started, 3)
+            self._state = self.READY
+            self._error = None
+            logger.info('%s loaded in %.2fs', type(self).__name__, self._load_seconds)
+
+    def status(self):
+        return {'state': self._state, 'load_seconds': self._load_seconds, 'error': self._error}
+
+
+# ============================================
+# WARMUP AND READINESS
+# ============================================
+
+def services():
+    """{name: service} for every lazily loaded service"""
+    from .chatbot_service import chatbot_service
+    from .ml_service import ml_service
+    return {'ml': ml_service, 'chatbot': chatbot_service}
+
+
+def warmup(background=False):
+    """
+    Load every service now rather than on its first request.
+
+    With background=True the loading runs in a daemon thread and this
+    returns immediately; requests that need a model meanwhile wait for it.
+    Failures are logged and show up in readiness().
+    """
+    def load_all():
+        for service in services().values():
+            try:
+                service.ensure_loaded()
+            except Exception:
+                pass  # Logged by ensure_loaded; reported by readiness()
+
+    if background:
+        thread = threading.Thread(target=load_all, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+    load_all()
+
+
+def warmup_from_settings():
+    """
+    Warmup hook for the WSGI/ASGI entry points, driven by MODEL_WARMUP:
+    'background' (default), 'blocking' or 'off'.
+
+    Servers that fork after loading the application (gunicorn --preload)
+    should use 'off' and call warmup() in each worker (post_fork), since
+    threads don't survive a fork. Nothing is loaded when INFERENCE_SOCKET
+    points the workers at the inference server.
+    """
+    if getattr(settings, 'INFERENCE_SOCKET', None):
+        return  # The inference server holds the models
+    mode = getattr(settings, 'MODEL_WARMUP', 'background')
+    if mode == 'blocking':
+        warmup()
+    elif mode == 'background':
+        warmup(background=True)
+
+
+def local_readiness():
+    """{'ready': bool, 'services': {name: status}} for this process, without loading anything"""
+    statuses = {name: service.status() for name, service in services().items()}
+    return {
+        'ready': all(status['state'] == LazyLoadedService.READY for status in statuses.values()),
+        'services': statuses,
+    }
+
+
+def readiness():
+    """Readiness of the models serving this process: the inference server's when INFERENCE_SOCKET is set"""
+    if getattr(settings, 'INFERENCE_SOCKET', None):
+        from .inference import remote_readiness
+        return remote_readiness()
+    return local_readiness()
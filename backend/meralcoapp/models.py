@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -1123,6 +1123,8 @@ class WorkOrder(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['vendor']),
             models.Index(fields=['assigned_crew']),
+            # Keyset pagination order (see meralcoapp.pagination)
+            models.Index(fields=['-date_received_jacket', '-wo_id']),
         ]
     
     def __str__(self):
@@ -1148,7 +1150,60 @@ class WorkOrder(models.Model):
             self.is_delayed = True
             self.delay_days = self.total_resolution_days - 60
         
-        super().save(*args, **kwargs)
+        # Keep the daily rollups in step with this row
+        from .kpi_rollup import WorkOrderRollupService
+        
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = WorkOrder.objects.filter(pk=self.pk).values(
+                    *WorkOrderRollupService.SOURCE_FIELDS
+                ).first()
+            
+            super().save(*args, **kwargs)
+            WorkOrderRollupService.apply_change(previous, self)
+
+
+class WorkOrderDailyRollup(models.Model):
+    """
+    Work order totals per day x vendor x crew x status, kept up to date on write.
+    
+    Each work order contributes one row per populated date field (received,
+    energized, audited, created), so period KPIs sum a handful of rollup rows
+    instead of scanning work_orders. Rows are only ever summed, never read one
+    at a time, so a duplicated bucket is harmless.
+    """
+    
+    DATE_FIELD_CHOICES = [
+        ('RECEIVED', 'Date Received Jacket'),
+        ('ENERGIZED', 'Date Energized'),
+        ('AUDITED', 'Date Audited'),
+        ('CREATED', 'Date Created'),
+    ]
+    
+    date_field = models.CharField(max_length=20, choices=DATE_FIELD_CHOICES)
+    day = models.DateField()
+    vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True, blank=True, related_name='work_order_rollups')
+    crew = models.CharField(max_length=50, blank=True, default='')
+    status = models.CharField(max_length=50)
+    received_year = models.IntegerField(null=True, blank=True)  # Year of date_received_jacket, for ageing KPIs
+    
+    wo_count = models.IntegerField(default=0)
+    total_manhours = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_estimated_cost = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    billed_cost = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'work_order_daily_rollups'
+        ordering = ['date_field', 'day']
+        indexes = [
+            models.Index(fields=['date_field', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date_field} {self.day} - {self.status}: {self.wo_count}"
 
 
 class WorkOrderDocument(models.Model):
@@ -1485,6 +1540,73 @@ class VendorProductivityMonthly(models.Model):
         super().save(*args, **kwargs)
 
 
+class VendorScorecard(models.Model):
+    """
+    Materialized per-vendor metrics read by the vendor and dashboard endpoints.
+    
+    Kept current by VendorScorecardService from Project, Penalty, SLATracking,
+    WorkOrder and Vendor writes; `manage.py rebuild_vendor_scorecards`
+    recomputes every row.
+    """
+    
+    vendor = models.OneToOneField(Vendor, on_delete=models.CASCADE, primary_key=True, related_name='scorecard')
+    
+    # Projects
+    total_projects = models.IntegerField(default=0)
+    active_projects = models.IntegerField(default=0)
+    delayed_projects = models.IntegerField(default=0)
+    on_time_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)
+    total_penalties = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)  # Excludes waived
+    sla_breaches = models.IntegerField(default=0)
+    compliance_score = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)  # Copied from vendor
+    
+    # Work orders
+    total_work_orders = models.IntegerField(default=0)
+    completed_work_orders = models.IntegerField(default=0)  # AUDITED
+    delayed_work_orders = models.IntegerField(default=0)
+    avg_resolution_days = models.FloatField(null=True, blank=True)
+    
+    refreshed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'vendor_scorecards'
+    
+    def __str__(self):
+        return f"{self.vendor_id} scorecard"
+
+
+class ProjectRiskScore(models.Model):
+    """
+    Latest delay prediction for an active project.
+
+    Written by ProjectRiskScoringService (`manage.py score_project_risk`,
+    run nightly), so the project endpoints can filter and sort by predicted
+    delay without running the model per request.
+    """
+
+    RISK_LEVEL_CHOICES = [
+        ('Low', 'Low'),
+        ('Medium', 'Medium'),
+        ('High', 'High'),
+    ]
+
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='risk_prediction')
+    delay_probability = models.FloatField()
+    will_delay = models.BooleanField(default=False)
+    risk_level = models.CharField(max_length=10, choices=RISK_LEVEL_CHOICES)
+    model_version = models.CharField(max_length=50)
+    scored_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'project_risk_scores'
+        indexes = [
+            models.Index(fields=['-delay_probability']),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} delay risk {self.delay_probability:.2f}"
+
+
 # ============================================
 # AGEING ANALYSIS MODELS
 # ============================================
@@ -1522,12 +1644,43 @@ class AgeingAnalysis(models.Model):
         indexes = [
             models.Index(fields=['analysis_date']),
             models.Index(fields=['age_bracket']),
+            models.Index(fields=['-analysis_date', '-age_in_days', '-id']),
         ]
     
     def __str__(self):
         return f"{self.work_order.wo_no} - {self.age_bracket}"
 
 
+class AgeingRunSummary(models.Model):
+    """
+    Per-run ageing totals by bracket, supervisor and crew.
+    
+    Written by AgeingAnalysisService when a run is generated, so bracket
+    summaries are indexed lookups instead of aggregates over ageing_analysis.
+    """
+    
+    analysis_date = models.DateField()
+    age_bracket = models.CharField(max_length=10, choices=AgeingAnalysis.AGE_BRACKET_CHOICES)
+    supervisor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='ageing_run_summaries')
+    crew = models.CharField(max_length=50, blank=True, default='')
+    
+    # Measures
+    wo_count = models.IntegerField(default=0)
+    total_manhours = models.DecimalField(max_digits=15, decimal_places=2, default=0)  # As of the run
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ageing_run_summaries'
+        ordering = ['-analysis_date', 'age_bracket']
+        indexes = [
+            models.Index(fields=['analysis_date', 'age_bracket']),
+        ]
+    
+    def __str__(self):
+        return f"{self.analysis_date} - {self.age_bracket} ({self.wo_count})"
+
+
 # ============================================
 # BACKJOB MONITORING MODEL
 # ============================================
@@ -1689,3 +1842,85 @@ class EmailNotificationLog(models.Model):
     
     def __str__(self):
         return f"{self.notification_type} - {self.notification_date}"
+
+
+# ============================================
+# IMPORT JOBS
+# ============================================
+
+class ImportJob(models.Model):
+    """Excel upload processed in the background, with progress for polling"""
+    
+    IMPORT_TYPE_CHOICES = [
+        ('WORK_ORDERS', 'Work Orders (C1)'),
+        ('CREW_MONITORING', 'Crew Monitoring'),
+        ('QI_MONITORING', 'QI Monitoring'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    import_type = models.CharField(max_length=30, choices=IMPORT_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    
+    file = models.FileField(upload_to='import_jobs/%Y/%m/')
+    original_filename = models.CharField(max_length=255, blank=True, null=True)
+    options = models.JSONField(default=dict, blank=True)  # e.g. sheet_name
+    
+    # Progress
+    total_rows = models.IntegerField(default=0)
+    rows_processed = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True, null=True)  # Set when the whole job fails
+    
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # Last progress write while RUNNING
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'import_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.import_type} - {self.status} ({self.rows_processed}/{self.total_rows})"
+    
+    @property
+    def elapsed_seconds(self):
+        if not self.started_at:
+            return None
+        end = self.finished_at or timezone.now()
+        return (end - self.started_at).total_seconds()
+    
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed_seconds
+        if not elapsed or not self.rows_processed:
+            return None
+        return round(self.rows_processed / elapsed, 2)
+    
+    @property
+    def progress_percent(self):
+        if not self.total_rows:
+            return 100.0 if self.status == 'COMPLETED' else 0.0
+        return round(self.rows_processed * 100 / self.total_rows, 2)
+    
+    @property
+    def eta_seconds(self):
+        if self.status != 'RUNNING':
+            return 0 if self.status == 'COMPLETED' else None
+        rate = self.rows_per_second
+        if not rate:
+            return None
+        return round(max(self.total_rows - self.rows_processed, 0) / rate, 1)
@@ -0,0 +1,304 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# ============================================
+# ROW COUNTS
+# ============================================
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run
+EXACT_COUNT_BELOW = 1000
+
+
+def estimated_count(queryset):
+    """
+    Approximate row count of queryset without a COUNT(*) scan.
+
+    On PostgreSQL an unfiltered queryset uses the table's pg_class.reltuples
+    (maintained by ANALYZE / autovacuum) and a filtered one the planner's row
+    estimate. Small estimates, tables never analyzed and other backends get an
+    exact count().
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+
+    if estimate < EXACT_COUNT_BELOW:
+        return queryset.count()
+    return int(estimate)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count comes from estimated_count()"""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+# ============================================
+# KEYSET (CURSOR) PAGINATION
+# ============================================
+
+def _cursor_value(value):
+    """JSON-safe value; datetimes keep full precision so ties compare exactly"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over the queryset's own ordering.
+
+    The ordering (after OrderingFilter, else Meta.ordering) gets the primary
+    key appended as a tie-breaker, and each page continues after the ordering
+    values of the previous page's last row instead of using OFFSET, so page
+    1000 costs the same as page 1. NULLs sort as PostgreSQL does by default
+    (last ascending, first descending), so rows come back in the same order
+    as page-number mode.
+
+    ?cursor=<opaque> moves between pages; ?page_size= up to max_page_size.
+    Only plain model fields of the paginated model can be ordered on.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size or PageNumberPagination.page_size or 10
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': [_cursor_value(value) for value in values], 'r': reverse})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            if len(payload['v']) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, payload['v'])]
+            return values, bool(payload['r'])
+        except Exception:
+            raise NotFound('Invalid cursor')
+
+    # ------------------------------------------------------------------
+    # Ordering and keyset filter
+    # ------------------------------------------------------------------
+
+    def resolve_ordering(self, queryset):
+        opts = queryset.model._meta
+        ordering = list(queryset.query.order_by or opts.ordering)
+        names = [term.lstrip('-') for term in ordering if isinstance(term, str)]
+        if len(names) != len(ordering):
+            raise ValidationError('Cursor pagination needs a plain field ordering')
+        pk_names = ('pk', opts.pk.name)
+        if any(name in pk_names for name in names):
+            # Terms after the (unique) primary key never decide the order
+            index = next(index for index, name in enumerate(names) if name in pk_names)
+            sign = '-' if ordering[index].startswith('-') else ''
+            ordering = ordering[:index] + [sign + opts.pk.name]
+        else:
+            # Tie-break on the primary key, in the direction of the last term
+            descending = ordering[-1].startswith('-') if ordering else False
+            ordering.append(('-' if descending else '') + opts.pk.name)
+
+        self.fields, self.descending = [], []
+        for term in ordering:
+            try:
+                field = opts.get_field(term.lstrip('-'))
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.concrete:
+                raise ValidationError(f'Cannot paginate by cursor on "{term}"')
+            self.fields.append(field)
+            self.descending.append(term.startswith('-'))
+
+    def order_by(self, reverse):
+        terms = []
+        for field, descending in zip(self.fields, self.descending):
+            descending = descending != reverse
+            expression = F(field.attname)
+            # NULLs after every value ascending, before every value descending
+            terms.append(expression.desc(nulls_first=True) if descending else expression.asc(nulls_last=True))
+        return terms
+
+    @staticmethod
+    def after(name, value, descending):
+        """Rows strictly after value on one field (NULL last ascending, first descending)"""
+        if value is None:
+            return Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+        if descending:
+            return Q(**{f'{name}__lt': value})
+        return Q(**{f'{name}__gt': value}) | Q(**{f'{name}__isnull': True})
+
+    @staticmethod
+    def equal(name, value):
+        return Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+
+    def keyset_filter(self, values, reverse):
+        """(f1 after v1) OR (f1 = v1 AND (f2 after v2 OR (f2 = v2 AND ...)))"""
+        condition = None
+        for field, descending, value in reversed(list(zip(self.fields, self.descending, values))):
+            after = self.after(field.attname, value, descending != reverse)
+            if condition is None:
+                condition = after
+            else:
+                condition = after | (self.equal(field.attname, value) & condition)
+
+        # Redundant bound on the leading field so an index scan can start at the cursor
+        lead, lead_value = self.fields[0].attname, values[0]
+        if lead_value is not None:
+            if self.descending[0] != reverse:
+                condition &= Q(**{f'{lead}__lte': lead_value})
+            else:
+                condition &= Q(**{f'{lead}__gte': lead_value}) | Q(**{f'{lead}__isnull': True})
+        return condition
+
+    # ------------------------------------------------------------------
+    # Paging
+    # ------------------------------------------------------------------
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        self.resolve_ordering(queryset)
+        values, reverse = self.decode_cursor(request)
+
+        page_queryset = queryset.order_by(*self.order_by(reverse))
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred:
+            # The cursor is built from the ordering columns; don't lazy-load them per row
+            page_queryset = page_queryset.only(*loaded, *(field.name for field in self.fields))
+        if values is not None:
+            page_queryset = page_queryset.filter(self.keyset_filter(values, reverse))
+
+        rows = list(page_queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.first_values = self.row_values(rows[0]) if rows else None
+        self.last_values = self.row_values(rows[-1]) if rows else None
+        if not rows and values is not None:
+            # Past either end: link back to where the cursor pointed
+            self.first_values = self.last_values = values
+            self.has_next, self.has_previous = reverse, not reverse
+
+        self.count = None
+        if request.query_params.get('count') in ('estimate', 'exact'):
+            self.count = queryset.count() if request.query_params['count'] == 'exact' else estimated_count(queryset)
+        return rows
+
+    def row_values(self, row):
+        return [getattr(row, field.attname) for field in self.fields]
+
+    def get_next_link(self):
+        if not self.has_next or self.last_values is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.last_values, False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_values is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.first_values, True)
+        )
+
+    def get_paginated_response(self, data):
+        body = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
+
+
+# ============================================
+# HIGH-VOLUME TABLES
+# ============================================
+
+class HighVolumePagination(PageNumberPagination):
+    """
+    Page numbers by default, keyset pages on request.
+
+    ?pagination=cursor (or any ?cursor=) switches to KeysetPagination, whose
+    responses carry next/previous cursor links and no count unless
+    ?count=estimate|exact is given. In page-number mode ?count=estimate
+    replaces the COUNT(*) with estimated_count().
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get('pagination') == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_cursor(request):
+            self.keyset = KeysetPagination(self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.django_paginator_class = (
+            EstimatedCountPaginator if request.query_params.get('count') == 'estimate' else Paginator
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,187 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# QUERY RECORDING
+# ============================================
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so one query shape maps to one key"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return ' '.join(sql.split())
+
+
+class QueryRecorder:
+    """
+    Records the SQL run on every database connection of the current thread.
+
+        with QueryRecorder() as recorder:
+            ...
+        recorder.count, recorder.time_ms, recorder.duplicates()
+
+    Works with DEBUG off (it uses execute wrappers, not connection.queries).
+    Queries run on other threads' connections (e.g. ConcurrentQueryRunner
+    workers) are not seen.
+    """
+
+    def __init__(self):
+        self.queries = []  # (sql, milliseconds)
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def _record(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time_ms(self):
+        return round(sum(elapsed for _, elapsed in self.queries), 2)
+
+    def duplicates(self, threshold=None):
+        """{fingerprint: times run} for query shapes repeated at least threshold times"""
+        threshold = threshold or duplicate_threshold()
+        shapes = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {shape: times for shape, times in shapes.most_common() if times >= threshold}
+
+
+# ============================================
+# BUDGETS
+# ============================================
+
+def duplicate_threshold():
+    return getattr(settings, 'QUERY_BUDGET_DUPLICATE_THRESHOLD', 5)
+
+
+def load_budgets(path=None):
+    """
+    Read the budget file: {"default": n, "endpoints": {url name: n}}.
+
+    A missing file means no per-endpoint budgets.
+    """
+    path = path or getattr(settings, 'QUERY_BUDGET_FILE', None)
+    if not path:
+        return {'default': None, 'endpoints': {}}
+    try:
+        with open(path) as budget_file:
+            budgets = json.load(budget_file)
+    except FileNotFoundError:
+        return {'default': None, 'endpoints': {}}
+    return {'default': budgets.get('default'), 'endpoints': budgets.get('endpoints', {})}
+
+
+def budget_for(endpoint, budgets):
+    return budgets['endpoints'].get(endpoint, budgets['default'])
+
+
+def endpoint_name(request):
+    """URL name of the resolved view (e.g. 'work-order-list'), or the path"""
+    match = getattr(request, 'resolver_match', None)
+    return (match and match.view_name) or request.path
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class QueryBudgetMiddleware:
+    """
+    Per-request query count, DB time and repeated-query detection.
+
+    In DEBUG the numbers are returned as X-DB-Queries / X-DB-Time (ms)
+    headers. Requests running more queries than their endpoint's budget
+    (QUERY_BUDGET_FILE) are logged, as are query shapes repeated at least
+    QUERY_BUDGET_DUPLICATE_THRESHOLD times - usually an N+1. Streaming
+    responses are measured up to the point the response is returned.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = load_budgets()
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        if settings.DEBUG:
+            response['X-DB-Queries'] = str(recorder.count)
+            response['X-DB-Time'] = str(recorder.time_ms)
+
+        endpoint = endpoint_name(request)
+        budget = budget_for(endpoint, self.budgets)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                'Query budget exceeded: %s %s ran %d queries (budget %d, %.1f ms)',
+                request.method, endpoint, recorder.count, budget, recorder.time_ms
+            )
+        for shape, times in recorder.duplicates().items():
+            logger.warning('Possible N+1: %s %s ran %dx: %s', request.method, endpoint, times, shape)
+
+        return response
+
+
+# ============================================
+# TEST HELPER
+# ============================================
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin enforcing the budget file.
+
+        response = self.assertWithinQueryBudget('work-order-list', self.client.get, url)
+
+    Fails when the call runs more queries than the endpoint's budget or
+    repeats one query shape QUERY_BUDGET_DUPLICATE_THRESHOLD or more times.
+    """
+
+    query_budgets = None
+
+    def assertWithinQueryBudget(self, endpoint, func, *args, **kwargs):
+        if self.query_budgets is None:
+            type(self).query_budgets = load_budgets()
+        budget = budget_for(endpoint, self.query_budgets)
+
+        with QueryRecorder() as recorder:
+            result = func(*args, **kwargs)
+
+        queries = '\n'.join(sql for sql, _ in recorder.queries)
+        if budget is not None:
+            self.assertLessEqual(
+                recorder.count, budget,
+                f'{endpoint} ran {recorder.count} queries (budget {budget}):\n{queries}'
+            )
+        self.assertEqual(
+            recorder.duplicates(), {},
+            f'{endpoint} repeats queries (likely N+1):\n{queries}'
+        )
+        return result
@@ -0,0 +1,104 @@
+from datetime import date
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .ml_service import ml_service
+from .models import Project, ProjectRiskScore
+from .vendor_metrics import VendorMetrics
+
+
+class ProjectRiskScoringService:
+    """
+    Scores every active project with the delay model and stores the results
+    in ProjectRiskScore.
+
+    Features for all active projects (status, priority, risk, start date,
+    contract value and the vendor's compliance score) come from one query,
+    read in chunks and scored BATCH_SIZE projects per model call. Each run
+    replaces the previous one: rows of projects that are no longer active,
+    or that have a category value the model was not trained on, are removed.
+    """
+
+    BATCH_SIZE = 5000
+
+    FEATURE_COLUMNS = [
+        'pk', 'status__status_name', 'priority', 'risk_score',
+        'start_date', 'contract_value', 'vendor__compliance_score',
+    ]
+
+    @classmethod
+    def active_projects(cls):
+        return Project.objects.filter(~Q(status__status_name__in=VendorMetrics.INACTIVE_PROJECT_STATUSES))
+
+    @staticmethod
+    def features(row, today):
+        """DelayPredictionSerializer-shaped features for one FEATURE_COLUMNS row"""
+        _, status_name, priority, risk_score, start_date, contract_value, compliance_score = row
+        return {
+            'status': status_name,
+            'priority': priority,
+            'risk_score': risk_score,
+            'days_since_start': (today - start_date).days if start_date else 0,
+            'contract_value': float(contract_value or 0),
+            'compliance_score': float(compliance_score or 0),
+        }
+
+    @staticmethod
+    def is_known(features):
+        index = ml_service.delay_class_index
+        return (
+            features['status'] in index['status']
+            and features['priority'] in index['priority']
+            and features['risk_score'] in index['risk']
+        )
+
+    @classmethod
+    def score(cls, today=None):
+        """Score all active projects; returns (projects scored, projects skipped)"""
+        today = today or date.today()
+        ml_service.ensure_loaded()
+        scored_at = timezone.now()
+        model_version = ml_service.model_version
+        rows = cls.active_projects().order_by().values_list(*cls.FEATURE_COLUMNS)
+
+        scored = skipped = 0
+        with transaction.atomic():
+            batch_ids, batch = [], []
+            for row in rows.iterator(chunk_size=cls.BATCH_SIZE):
+                features = cls.features(row, today)
+                if not cls.is_known(features):
+                    skipped += 1
+                    continue
+                batch_ids.append(row[0])
+                batch.append(features)
+                if len(batch) >= cls.BATCH_SIZE:
+                    scored += cls._write(batch_ids, batch, model_version, scored_at)
+                    batch_ids, batch = [], []
+            if batch:
+                scored += cls._write(batch_ids, batch, model_version, scored_at)
+
+            # Anything not rewritten by this run is stale
+            ProjectRiskScore.objects.exclude(scored_at=scored_at).delete()
+
+        return scored, skipped
+
+    @classmethod
+    def _write(cls, project_ids, batch, model_version, scored_at):
+        predictions = ml_service.predict_delay_batch(batch)
+        ProjectRiskScore.objects.bulk_create(
+            [
+                ProjectRiskScore(
+                    project_id=project_id,
+                    delay_probability=prediction['delay_probability'],
+                    will_delay=prediction['will_delay'],
+                    risk_level=prediction['risk_level'],
+                    model_version=model_version,
+                    scored_at=scored_at
+                )
+                for project_id, prediction in zip(project_ids, predictions)
+            ],
+            update_conflicts=True,
+            unique_fields=['project'],
+            update_fields=['delay_probability', 'will_delay', 'risk_level', 'model_version', 'scored_at']
+        )
+        return len(project_ids)
@@ -1,4 +1,8 @@
 from rest_framework import serializers
+from datetime import date
+from decimal import Decimal
+from django.db.models import BooleanField, Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from .models import *
 
@@ -16,6 +20,9 @@ class DelayPredictionSerializer(serializers.Serializer):
     contract_value = serializers.FloatField()
     compliance_score = serializers.FloatField()
 
+class DelayBatchPredictionSerializer(serializers.Serializer):
+    projects = DelayPredictionSerializer(many=True, allow_empty=False)
+
 class PenaltyPredictionSerializer(serializers.Serializer):
     violation_type = serializers.CharField()
     delay_days = serializers.IntegerField()
@@ -61,6 +68,7 @@ class UserLoginResponseSerializer(serializers.ModelSerializer):
         model = User
         fields = ['user_id', 'username', 'email', 'first_name', 'last_name', 
                   'full_name', 'role', 'role_name', 'phone_number']
+        method_field_relations = {'full_name': ['first_name', 'last_name']}
 
     def get_full_name(self, obj):
         return obj.get_full_name()
@@ -127,6 +135,70 @@ class RegisterUserSerializer(serializers.ModelSerializer):
         return user
 
 
+# ============================================
+# ANNOTATED FIELDS
+# ============================================
+
+class AnnotatedField(serializers.Field):
+    """
+    Read-only value served from a queryset annotation.
+    
+    The viewset annotates the whole queryset once (see AnnotatedFieldsMixin),
+    which also makes the value filterable and orderable in SQL; the field
+    reads the annotation named after itself. When the instance wasn't loaded
+    that way (e.g. right after a create) the same expression is evaluated for
+    that one object instead.
+    
+    expression: the expression to annotate, or a callable returning it when it
+                depends on the request time (e.g. today's date)
+    """
+    
+    def __init__(self, expression=None, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+        self.expression = expression
+    
+    def get_expression(self):
+        return self.expression() if callable(self.expression) else self.expression
+    
+    def to_representation(self, obj):
+        if self.field_name in obj.__dict__:
+            return obj.__dict__[self.field_name]
+        return type(obj)._default_manager.filter(pk=obj.pk).annotate(
+            value=self.get_expression()
+        ).values_list('value', flat=True).get()
+    
+    @staticmethod
+    def annotations_for(serializer_class):
+        """{field name: expression} for every AnnotatedField on serializer_class"""
+        return {
+            name: field.get_expression()
+            for name, field in serializer_class().fields.items()
+            if isinstance(field, AnnotatedField)
+        }
+
+
+class AnnotatedCountField(AnnotatedField):
+    """
+    AnnotatedField counting a reverse relation.
+    
+    relation:   reverse relation to count, e.g. 'projects'
+    filter:     optional Q (relative to this model) restricting what is counted
+    expression: optional expression used instead of Count(relation, filter=...)
+    """
+    
+    def __init__(self, relation=None, filter=None, expression=None, **kwargs):
+        super().__init__(expression=expression, **kwargs)
+        self.relation = relation
+        self.filter = filter
+    
+    def get_expression(self):
+        if self.expression is not None:
+            return super().get_expression()
+        return Count(self.relation, filter=self.filter, distinct=True)
+
+
 # ============================================
 # USER MANAGEMENT SERIALIZERS
 # ============================================
@@ -164,6 +236,7 @@ class UserSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'password': {'write_only': True}
         }
+        method_field_relations = {'full_name': ['first_name', 'last_name']}
     
     def get_full_name(self, obj):
         return obj.get_full_name()
@@ -197,26 +270,30 @@ class VendorPerformanceSerializer(serializers.ModelSerializer):
 
 class VendorSerializer(serializers.ModelSerializer):
     contacts = VendorContactSerializer(many=True, read_only=True)
-    project_count = serializers.SerializerMethodField()
-    active_projects = serializers.SerializerMethodField()
+    # Read from the vendor scorecard: they lag until VendorScorecardService's
+    # on-commit refresh runs, and are 0 for a vendor without a scorecard row
+    project_count = AnnotatedField(expression=Coalesce('scorecard__total_projects', 0))
+    active_projects = AnnotatedField(expression=Coalesce('scorecard__active_projects', 0))
     
     class Meta:
         model = Vendor
         fields = '__all__'
-    
-    def get_project_count(self, obj):
-        return obj.projects.count()
-    
-    def get_active_projects(self, obj):
-        return obj.projects.exclude(status__status_name__in=['Completed', 'Cancelled', 'Billed']).count()
+
+
+class VendorScorecardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VendorScorecard
+        exclude = ['vendor']
 
 
 class VendorListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for list views"""
+    scorecard = VendorScorecardSerializer(read_only=True)
+    
     class Meta:
         model = Vendor
-        fields = ['id', 'vendor_code', 'vendor_name', 'email', 'phone_number', 
-                  'compliance_score', 'is_active', 'is_blacklisted']
+        fields = ['vendor_id', 'vendor_code', 'vendor_name', 'email', 'phone_number', 
+                  'compliance_score', 'is_active', 'is_blacklisted', 'scorecard']
 
 
 # ============================================
@@ -225,25 +302,19 @@ class VendorListSerializer(serializers.ModelSerializer):
 
 class SectorSerializer(serializers.ModelSerializer):
     sector_manager_name = serializers.CharField(source='sector_manager.get_full_name', read_only=True)
-    project_count = serializers.SerializerMethodField()
+    project_count = AnnotatedCountField('projects')
     
     class Meta:
         model = Sector
         fields = '__all__'
-    
-    def get_project_count(self, obj):
-        return obj.projects.count()
 
 
 class ProjectStatusSerializer(serializers.ModelSerializer):
-    project_count = serializers.SerializerMethodField()
+    project_count = AnnotatedCountField('projects')
     
     class Meta:
         model = ProjectStatus
         fields = '__all__'
-    
-    def get_project_count(self, obj):
-        return obj.projects.count()
 
 
 class ProjectMilestoneSerializer(serializers.ModelSerializer):
@@ -271,6 +342,8 @@ class ProjectSerializer(serializers.ModelSerializer):
     wo_supervisor_name = serializers.CharField(source='wo_supervisor.get_full_name', read_only=True)
     milestones = ProjectMilestoneSerializer(many=True, read_only=True)
     team_members = ProjectTeamSerializer(many=True, read_only=True)
+    delay_probability = AnnotatedField(expression=F('risk_prediction__delay_probability'))
+    predicted_risk_level = AnnotatedField(expression=F('risk_prediction__risk_level'))
     
     class Meta:
         model = Project
@@ -282,12 +355,16 @@ class ProjectListSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.vendor_name', read_only=True)
     status_name = serializers.CharField(source='status.status_name', read_only=True)
     status_color = serializers.CharField(source='status.status_color', read_only=True)
+    # From the nightly ProjectRiskScore run; null until a project is scored
+    delay_probability = AnnotatedField(expression=F('risk_prediction__delay_probability'))
+    predicted_risk_level = AnnotatedField(expression=F('risk_prediction__risk_level'))
     
     class Meta:
         model = Project
-        fields = ['id', 'project_code', 'project_name', 'vendor', 'vendor_name',
+        fields = ['project_id', 'project_code', 'project_name', 'vendor', 'vendor_name',
                   'status', 'status_name', 'status_color', 'start_date', 
-                  'completion_date', 'is_delayed', 'delay_days', 'priority', 'risk_score']
+                  'completion_date', 'is_delayed', 'delay_days', 'priority', 'risk_score',
+                  'delay_probability', 'predicted_risk_level']
 
 
 # ============================================
@@ -311,6 +388,7 @@ class ProjectWorkflowSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectWorkflow
         fields = '__all__'
+        method_field_relations = {'days_in_stage': ['start_date', 'completion_date']}
     
     def get_days_in_stage(self, obj):
         if obj.completion_date and obj.start_date:
@@ -340,6 +418,7 @@ class ProjectDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectDocument
         fields = '__all__'
+        method_field_relations = {'file_size_mb': ['file_size']}
     
     def get_file_size_mb(self, obj):
         if obj.file_size:
@@ -380,6 +459,7 @@ class SLATrackingSerializer(serializers.ModelSerializer):
     class Meta:
         model = SLATracking
         fields = '__all__'
+        method_field_relations = {'days_remaining': ['completion_date', 'due_date']}
     
     def get_days_remaining(self, obj):
         if obj.completion_date is None and obj.due_date:
@@ -410,6 +490,7 @@ class QIInspectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = QIInspection
         fields = '__all__'
+        method_field_relations = {'is_overdue': ['is_completed', 'scheduled_date']}
     
     def get_is_overdue(self, obj):
         if not obj.is_completed and obj.scheduled_date:
@@ -425,6 +506,7 @@ class QIDailyTargetSerializer(serializers.ModelSerializer):
     class Meta:
         model = QIDailyTarget
         fields = '__all__'
+        method_field_relations = {'achievement_percentage': ['target_audits', 'actual_audits']}
     
     def get_achievement_percentage(self, obj):
         if obj.target_audits > 0:
@@ -439,6 +521,7 @@ class QIPerformanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = QIPerformance
         fields = '__all__'
+        method_field_relations = {'target_achievement_rate': ['targets_met', 'targets_missed']}
     
     def get_target_achievement_rate(self, obj):
         total_targets = obj.targets_met + obj.targets_missed
@@ -485,6 +568,21 @@ class PaymentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+def invoice_total_paid():
+    return Coalesce(
+        Sum('payments__payment_amount'), Value(Decimal('0')),
+        output_field=DecimalField(max_digits=15, decimal_places=2)
+    )
+
+
+def invoice_is_overdue():
+    return Case(
+        When(Q(due_date__lt=date.today()) & ~Q(payment_status='Paid'), then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField()
+    )
+
+
 class InvoiceSerializer(serializers.ModelSerializer):
     project_code = serializers.CharField(source='project.project_code', read_only=True)
     project_name = serializers.CharField(source='project.project_name', read_only=True)
@@ -492,26 +590,14 @@ class InvoiceSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
     payments = PaymentSerializer(many=True, read_only=True)
-    total_paid = serializers.SerializerMethodField()
-    outstanding_amount = serializers.SerializerMethodField()
-    is_overdue = serializers.SerializerMethodField()
+    # Annotated by InvoiceViewSet, so they can be filtered and ordered on
+    total_paid = AnnotatedField(expression=invoice_total_paid)
+    outstanding_amount = AnnotatedField(expression=lambda: F('net_amount') - invoice_total_paid())
+    is_overdue = AnnotatedField(expression=invoice_is_overdue)
     
     class Meta:
         model = Invoice
         fields = '__all__'
-    
-    def get_total_paid(self, obj):
-        return sum(payment.payment_amount for payment in obj.payments.all())
-    
-    def get_outstanding_amount(self, obj):
-        total_paid = self.get_total_paid(obj)
-        return obj.net_amount - total_paid
-    
-    def get_is_overdue(self, obj):
-        if obj.payment_status != 'Paid' and obj.due_date:
-            from datetime import date
-            return obj.due_date < date.today()
-        return False
 
 
 # ============================================
@@ -564,14 +650,11 @@ class EscalationSerializer(serializers.ModelSerializer):
 # ============================================
 
 class DelayFactorSerializer(serializers.ModelSerializer):
-    occurrence_count = serializers.SerializerMethodField()
+    occurrence_count = AnnotatedCountField('project_delays')
     
     class Meta:
         model = DelayFactor
         fields = '__all__'
-    
-    def get_occurrence_count(self, obj):
-        return obj.project_delays.count()
 
 
 class ProjectDelaySerializer(serializers.ModelSerializer):
@@ -822,6 +905,7 @@ class WorkOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['wo_id', 'created_at', 'updated_at', 'days_from_energized_to_coc', 
                            'days_from_coc_to_audit', 'days_from_audit_to_billing', 
                            'total_resolution_days', 'is_delayed', 'delay_days']
+        method_field_relations = {'supervisor_name': ['supervisor'], 'qi_name': ['assigned_qi']}
     
     def get_supervisor_name(self, obj):
         return obj.supervisor.get_full_name() if obj.supervisor else None
@@ -852,6 +936,7 @@ class WorkOrderListSerializer(serializers.ModelSerializer):
                  'supervisor_name', 'status', 'status_display', 'priority', 
                  'date_energized', 'total_resolution_days', 'is_delayed', 
                  'delay_days', 'created_at']
+        method_field_relations = {'supervisor_name': ['supervisor']}
     
     def get_supervisor_name(self, obj):
         return obj.supervisor.get_full_name() if obj.supervisor else None
@@ -911,6 +996,7 @@ class QIMonthlyAccomplishmentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['total_inspections', 'target_met', 
                            'achievement_percentage', 'created_at', 'updated_at']
+        method_field_relations = {'month_display': ['month']}
     
     def get_month_display(self, obj):
         return obj.month.strftime('%B %Y')
@@ -938,6 +1024,7 @@ class WorkOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['wo_id', 'created_at', 'updated_at', 'days_from_energized_to_coc', 
                            'days_from_coc_to_audit', 'days_from_audit_to_billing', 
                            'total_resolution_days', 'is_delayed', 'delay_days']
+        method_field_relations = {'supervisor_name': ['supervisor'], 'qi_name': ['assigned_qi']}
     
     def get_supervisor_name(self, obj):
         return obj.supervisor.get_full_name() if obj.supervisor else None
@@ -968,6 +1055,7 @@ class WorkOrderListSerializer(serializers.ModelSerializer):
                  'supervisor_name', 'status', 'status_display', 'priority', 
                  'date_energized', 'total_resolution_days', 'is_delayed', 
                  'delay_days', 'created_at']
+        method_field_relations = {'supervisor_name': ['supervisor']}
     
     def get_supervisor_name(self, obj):
         return obj.supervisor.get_full_name() if obj.supervisor else None
@@ -1027,6 +1115,7 @@ class QIMonthlyAccomplishmentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['total_inspections', 'target_met', 
                            'achievement_percentage', 'created_at', 'updated_at']
+        method_field_relations = {'month_display': ['month']}
     
     def get_month_display(self, obj):
         return obj.month.strftime('%B %Y')
@@ -1044,6 +1133,7 @@ class PCAGoalSerializer(serializers.ModelSerializer):
     class Meta:
         model = PCAGoal
         fields = '__all__'
+        method_field_relations = {'month_display': ['month']}
     
     def get_month_display(self, obj):
         return obj.month.strftime('%B %Y')
@@ -1051,15 +1141,23 @@ class PCAGoalSerializer(serializers.ModelSerializer):
 
 class PCASummarySerializer(serializers.ModelSerializer):
     month_display = serializers.SerializerMethodField()
-    goal = PCAGoalSerializer(source='month', read_only=True)
+    goal = serializers.SerializerMethodField()
     class Meta:
         model = PCASummary
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at']
+        method_field_relations = {'month_display': ['month'], 'goal': ['month']}
 
     def get_month_display(self, obj):
         return obj.month.strftime('%B %Y')
 
+    def get_goal(self, obj):
+        # Goals are matched on month, not a foreign key; load them once per response
+        if 'pca_goals' not in self.context:
+            self.context['pca_goals'] = {goal.month: goal for goal in PCAGoal.objects.all()}
+        goal = self.context['pca_goals'].get(obj.month)
+        return PCAGoalSerializer(goal).data if goal else None
+
 # ============================================
 # VENDOR PRODUCTIVITY SERIALIZERS
 # ============================================
@@ -1072,6 +1170,7 @@ class VendorProductivityMonthlySerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['actual_capability_percentage', 'productivity_percentage', 
                         'created_at', 'updated_at']
+        method_field_relations = {'month_display': ['month']}
 
     def get_month_display(self, obj):
         return obj.month.strftime('%B %Y')
@@ -1087,6 +1186,7 @@ class AgeingAnalysisSerializer(serializers.ModelSerializer):
     class Meta:
         model = AgeingAnalysis
         fields = '__all__'
+        method_field_relations = {'supervisor_name': ['supervisor']}
 
     def get_supervisor_name(self, obj):
         return obj.supervisor.get_full_name() if obj.supervisor else None
@@ -1109,6 +1209,7 @@ class BackjobMonitoringSerializer(serializers.ModelSerializer):
         model = BackjobMonitoring
         fields = '__all__'
         read_only_fields = ['days_pending', 'is_overdue', 'created_at', 'updated_at']
+        method_field_relations = {'assigned_to_name': ['assigned_to']}
 
     def get_assigned_to_name(self, obj):
         return obj.assigned_to.get_full_name() if obj.assigned_to else None
@@ -1125,6 +1226,7 @@ class KPISnapshotSerializer(serializers.ModelSerializer):
     class Meta:
         model = KPISnapshot
         fields = '__all__'
+        method_field_relations = {'status': ['kpi_value', 'target_value'], 'variance': ['kpi_value', 'target_value']}
     
     def get_status(self, obj):
         """Determine status based on target comparison"""
@@ -1176,4 +1278,19 @@ class KPIDashboardSerializer(serializers.Serializer):
     historical_trends = serializers.DictField()
     
     # Charts Data
-    chart_data = serializers.DictField()
\ No newline at end of file
+    chart_data = serializers.DictField()
+
+# ============================================
+# IMPORT JOB SERIALIZERS
+# ============================================
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    progress_percent = serializers.ReadOnlyField()
+    rows_per_second = serializers.ReadOnlyField()
+    eta_seconds = serializers.ReadOnlyField()
+    elapsed_seconds = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = ImportJob
+        exclude = ['file']
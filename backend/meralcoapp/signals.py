@@ -0,0 +1,68 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import WorkOrder, VendorProductivityMonthly, QIInspection, Project, Penalty, SLATracking, Vendor
+from .kpi_cache import KPICacheService
+from .kpi_rollup import WorkOrderRollupService
+from .vendor_metrics import VendorScorecardService
+
+
+# ============================================
+# KPI CACHE INVALIDATION
+# ============================================
+
+@receiver([post_save, post_delete], sender=WorkOrder)
+@receiver([post_save, post_delete], sender=VendorProductivityMonthly)
+@receiver([post_save, post_delete], sender=QIInspection)
+def invalidate_kpi_cache(sender, **kwargs):
+    KPICacheService.invalidate()
+
+
+# ============================================
+# WORK ORDER DAILY ROLLUPS
+# ============================================
+
+@receiver(post_delete, sender=WorkOrder)
+def remove_work_order_from_rollups(sender, instance, **kwargs):
+    WorkOrderRollupService.remove(instance)
+
+
+# ============================================
+# VENDOR SCORECARDS
+# ============================================
+
+# Remember the vendor (project for SLA records) an instance was loaded with,
+# so moving it to another vendor refreshes both scorecards. Read from
+# __dict__ to avoid loading a deferred field.
+
+@receiver(post_init, sender=WorkOrder)
+@receiver(post_init, sender=Project)
+@receiver(post_init, sender=Penalty)
+def remember_scorecard_vendor(sender, instance, **kwargs):
+    instance._scorecard_vendor_id = instance.__dict__.get('vendor_id')
+
+
+@receiver(post_init, sender=SLATracking)
+def remember_scorecard_project(sender, instance, **kwargs):
+    instance._scorecard_project_id = instance.__dict__.get('project_id')
+
+
+@receiver([post_save, post_delete], sender=WorkOrder)
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Penalty)
+def refresh_vendor_scorecard(sender, instance, **kwargs):
+    VendorScorecardService.schedule([instance.vendor_id, getattr(instance, '_scorecard_vendor_id', None)])
+    instance._scorecard_vendor_id = instance.vendor_id
+
+
+@receiver([post_save, post_delete], sender=SLATracking)
+def refresh_sla_vendor_scorecard(sender, instance, **kwargs):
+    project_ids = {instance.project_id, getattr(instance, '_scorecard_project_id', None)} - {None}
+    VendorScorecardService.schedule(
+        Project.objects.filter(pk__in=project_ids).values_list('vendor_id', flat=True)
+    )
+    instance._scorecard_project_id = instance.project_id
+
+
+@receiver(post_save, sender=Vendor)
+def refresh_own_scorecard(sender, instance, **kwargs):
+    VendorScorecardService.schedule([instance.pk])
@@ -1,3 +1,663 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+import pandas as pd
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .ageing_service import AgeingAnalysisService
+from .dashboard_service import ConcurrentQueryRunner, DashboardStatsService
+from .import_jobs import ImportJobService
+from .importers import WorkOrderExcelImporter
+from .kpi_rollup import WorkOrderRollupService
+from .models import (
+    UserRole, Permission, RolePermission, User, UserSession, Vendor, VendorContact, VendorPerformance,
+    Sector, ProjectStatus, Project, ProjectMilestone, ProjectTeam, WorkflowStage, ProjectWorkflow,
+    DocumentType, ProjectDocument, DocumentCompliance, SLARule, SLATracking, InspectionType,
+    QIInspection, QIDailyTarget, QIPerformance, PenaltyRule, Penalty, Invoice, Payment,
+    NotificationTemplate, Notification, EscalationRule, Escalation, DelayFactor, ProjectDelay,
+    VendorDispute, VendorFeedback, ChangeLog, SystemAuditLog, SystemSetting, WorkOrder,
+    WorkOrderDocument, CrewType, DailyCrewMonitoring, QIWeeklyAccomplishment, QIMonthlyAccomplishment,
+    PCAGoal, PCASummary, VendorProductivityMonthly, BackjobMonitoring, KPISnapshot, KPITarget, ImportJob,
+    WorkOrderDailyRollup, AgeingRunSummary
+)
+from .query_budget import QueryBudgetTestMixin, QueryRecorder, fingerprint, load_budgets
+from .vendor_metrics import VendorScorecardService
 
-# Create your tests here.
+
+# ============================================
+# QUERY BUDGETS
+# ============================================
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """
+    Every endpoint in query_budgets.json must stay within its budget and run
+    no repeated query shapes. Every table behind a budgeted endpoint gets at
+    least ROWS rows pointing at distinct related rows, and every row matches
+    the filters of the custom actions listing that table (delayed, overdue,
+    mine, unread...), so a per-row lookup shows up as a duplicate. Tables
+    whose actions filter on opposite conditions get ROWS rows for each.
+
+    dashboard-bootstrap is measured on its inline path only: inside TestCase's
+    transaction ConcurrentQueryRunner runs every tile on the request thread,
+    so its budget is the sum of the tiles' queries. When the tiles run on the
+    pool, the recorder (which only sees the request thread) can't count them.
+    """
+
+    ROWS = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        month = today.replace(day=1)
+        week_start = today - timedelta(days=today.weekday())
+        cls.admin = User.objects.create_superuser(
+            username='budget-admin', password='x', email='budget-admin@example.com'
+        )
+
+        for i in range(cls.ROWS):
+            role = UserRole.objects.create(role_name=f'Role {i}')
+            permission = Permission.objects.create(permission_name=f'Permission {i}')
+            RolePermission.objects.create(role=role, permission=permission)
+            user = User.objects.create_user(
+                username=f'user{i}', first_name='User', last_name=str(i), role=role
+            )
+            UserSession.objects.create(user=user)
+
+            # The "my_*" actions filter on the requesting user
+            vendor = Vendor.objects.create(
+                vendor_code=f'V{i}', vendor_name=f'Vendor {i}', email=cls.admin.email
+            )
+            VendorContact.objects.create(vendor=vendor, contact_name=f'Contact {i}')
+            VendorPerformance.objects.create(vendor=vendor, evaluation_date=today, evaluator=user)
+            VendorFeedback.objects.create(
+                vendor=vendor, feedback_type='Suggestion', feedback_subject='Subject',
+                feedback_text='Text', reviewed_by=user
+            )
+
+            sector = Sector.objects.create(sector_code=f'S{i}', sector_name=f'Sector {i}', sector_manager=user)
+            project_status = ProjectStatus.objects.create(
+                status_name=['New', 'Ongoing', 'Completed', 'Cancelled', 'Billed', 'On Hold'][i % 6],
+                status_order=i
+            )
+            project = Project.objects.create(
+                project_code=f'P{i}', project_name=f'Project {i}', vendor=vendor, sector=sector,
+                status=project_status, assigned_engineer=user, assigned_qi=user, wo_supervisor=user,
+                priority='Critical', is_delayed=True, delay_days=i
+            )
+            ProjectMilestone.objects.create(project=project, milestone_name=f'Milestone {i}')
+            ProjectTeam.objects.create(project=project, user=user)
+
+            stage = WorkflowStage.objects.create(stage_name=f'Stage {i}', stage_order=i)
+            ProjectWorkflow.objects.create(
+                project=project, stage=stage, assigned_user=user, due_date=today - timedelta(days=i + 1)
+            )
+            doc_type = DocumentType.objects.create(doc_type_name=f'Document {i}')
+            ProjectDocument.objects.create(
+                project=project, doc_type=doc_type, document_name=f'Document {i}',
+                document_path=f'/documents/{i}.pdf', uploaded_by=user, approved_by=user
+            )
+            DocumentCompliance.objects.create(
+                project=project, doc_type=doc_type, due_date=today - timedelta(days=i + 1), is_overdue=True
+            )
+            DocumentCompliance.objects.create(
+                project=project, doc_type=doc_type, due_date=today + timedelta(days=i)
+            )
+
+            sla_rule = SLARule.objects.create(rule_name=f'Rule {i}', stage=stage, deadline_days=30)
+            SLATracking.objects.create(
+                project=project, sla_rule=sla_rule, start_date=today, due_date=today + timedelta(days=i % 3)
+            )
+            SLATracking.objects.create(
+                project=project, sla_rule=sla_rule, start_date=today, due_date=today - timedelta(days=i + 1),
+                status='Breached', is_breached=True, breach_days=i + 1, waived_by=user
+            )
+
+            inspection_type = InspectionType.objects.create(inspection_name=f'Inspection {i}')
+            QIInspection.objects.create(
+                project=project, inspection_type=inspection_type, assigned_qi=cls.admin,
+                scheduled_date=today - timedelta(days=i + 1)
+            )
+            QIDailyTarget.objects.create(qi_user=cls.admin, target_date=today - timedelta(days=i), target_audits=5)
+            QIPerformance.objects.create(
+                qi_user=user, evaluation_period_start=month, evaluation_period_end=today
+            )
+            QIWeeklyAccomplishment.objects.create(
+                qi_user=user, week_start_date=week_start, week_end_date=week_start + timedelta(days=6)
+            )
+            QIMonthlyAccomplishment.objects.create(qi_user=user, month=month)
+
+            penalty_rule = PenaltyRule.objects.create(
+                rule_name=f'Penalty {i}', violation_type='Delay', penalty_formula='1%'
+            )
+            penalty = Penalty.objects.create(
+                project=project, vendor=vendor, penalty_rule=penalty_rule, violation_date=today,
+                penalty_amount=Decimal('5'), created_by=user, approved_by=user, waived_by=user
+            )
+            invoice = Invoice.objects.create(
+                project=project, vendor=vendor, invoice_number=f'I{i}', invoice_date=today,
+                due_date=today - timedelta(days=i + 1), invoice_amount=Decimal('100'),
+                net_amount=Decimal('90'), created_by=user, approved_by=user
+            )
+            Payment.objects.create(
+                invoice=invoice, payment_amount=Decimal('10'), payment_date=today, processed_by=user
+            )
+
+            template = NotificationTemplate.objects.create(
+                template_name=f'Template {i}', template_body='Body', notification_type='Email'
+            )
+            Notification.objects.create(
+                recipient_user=cls.admin, related_project=project, notification_type='In-App', message='Hi'
+            )
+            escalation_rule = EscalationRule.objects.create(
+                rule_name=f'Escalation {i}', trigger_condition='Delay', delay_threshold_days=7,
+                escalate_to_role=role, notification_template=template
+            )
+            Escalation.objects.create(
+                project=project, escalation_rule=escalation_rule, escalation_reason='Late',
+                escalated_from_user=user, escalated_to_user=cls.admin, resolved_by=user
+            )
+
+            delay_factor = DelayFactor.objects.create(factor_name=f'Factor {i}')
+            ProjectDelay.objects.create(
+                project=project, factor=delay_factor, delay_days=i + 1, delay_start_date=today, reported_by=user
+            )
+            VendorDispute.objects.create(
+                vendor=vendor, project=project, related_penalty=penalty, dispute_subject='Subject',
+                dispute_description='Description', assigned_to=user, resolved_by=user
+            )
+            ChangeLog.objects.create(table_name='projects', record_id=i, change_type='UPDATE', changed_by=user)
+            SystemAuditLog.objects.create(action_type='LOGIN', status='Success', user=user)
+            SystemSetting.objects.create(setting_key=f'setting_{i}', setting_type='String')
+
+            work_order = WorkOrder.objects.create(
+                wo_no=f'WO{i}', vendor=vendor, supervisor=user, assigned_qi=user,
+                status='NEW', date_energized=today - timedelta(days=40 * i),
+                is_delayed=True, delay_days=i
+            )
+            WorkOrderDocument.objects.create(
+                work_order=work_order, document_type='COC', document_name=f'COC {i}',
+                uploaded_by=user, approved_by=user
+            )
+            BackjobMonitoring.objects.create(
+                work_order=work_order, issue_description='Loose connection', reported_date=today,
+                target_resolution_date=today - timedelta(days=1), assigned_to=user
+            )
+            crew_type = CrewType.objects.create(crew_code=f'C{i}', crew_name=f'Crew {i}')
+            DailyCrewMonitoring.objects.create(crew_type=crew_type, monitoring_date=today)
+            VendorProductivityMonthly.objects.create(vendor=vendor, month=month)
+
+            period = (month - timedelta(days=31 * i)).replace(day=1)
+            PCAGoal.objects.create(month=period)
+            PCASummary.objects.create(month=period)
+            KPISnapshot.objects.create(
+                kpi_type='AVG_RESOLUTION_DAYS', period_start=today, period_end=today,
+                kpi_value=Decimal(10 + i), target_value=Decimal('10'), calculated_by=user
+            )
+            KPITarget.objects.create(
+                kpi_type='AVG_RESOLUTION_DAYS', period_start=period, period_end=today, target_value=Decimal('10')
+            )
+            ImportJob.objects.create(import_type='WORK_ORDERS', file=f'import_jobs/{i}.xlsx', created_by=user)
+
+        # Scorecard refreshes wait for a commit that never comes inside TestCase
+        VendorScorecardService.rebuild()
+        AgeingAnalysisService.generate(today)
+
+        cls.detail_pks = {
+            'project-detail': Project.objects.values_list('pk', flat=True).first(),
+            'invoice-detail': Invoice.objects.values_list('pk', flat=True).first(),
+            'work-order-detail': WorkOrder.objects.values_list('pk', flat=True).first(),
+            'vendor-detail': Vendor.objects.values_list('pk', flat=True).first(),
+        }
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_endpoints_within_budget(self):
+        endpoints = load_budgets()['endpoints']
+        self.assertTrue(endpoints, 'QUERY_BUDGET_FILE lists no endpoints')
+        for endpoint in sorted(endpoints):
+            with self.subTest(endpoint=endpoint):
+                cache.clear()
+                pk = self.detail_pks.get(endpoint)
+                url = reverse(endpoint, kwargs={'pk': pk} if pk is not None else None)
+                response = self.assertWithinQueryBudget(endpoint, self.client.get, url)
+                self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+
+    def test_debug_headers(self):
+        with self.settings(DEBUG=True):
+            response = self.client.get(reverse('work-order-list'))
+        self.assertIn('X-DB-Queries', response)
+        self.assertIn('X-DB-Time', response)
+
+    def test_repeated_queries_are_flagged(self):
+        with QueryRecorder() as recorder:
+            for work_order in WorkOrder.objects.all():
+                work_order.supervisor.get_full_name()
+        self.assertEqual(list(recorder.duplicates().values()), [self.ROWS])
+
+    def test_fingerprint_collapses_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s) AND name = 'y' LIMIT 5")
+        )
+
+
+# ============================================
+# PAGINATED ACTIONS
+# ============================================
+
+class PaginatedActionTests(TestCase):
+    """Custom list actions page like list and stream NDJSON with ?stream=1"""
+
+    ROWS = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='pages-admin', password='x')
+        vendor = Vendor.objects.create(vendor_code='V1', vendor_name='Vendor 1')
+        for i in range(cls.ROWS):
+            WorkOrder.objects.create(
+                wo_no=f'WO{i}', vendor=vendor, supervisor=cls.admin, status='NEW',
+                is_delayed=True, delay_days=i
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('work-order-delayed-projects')
+
+    def test_paginated(self):
+        response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], self.ROWS)
+        self.assertEqual([row['delay_days'] for row in response.data['results']], [11, 10, 9, 8, 7])
+
+    def test_stream(self):
+        with self.settings(EXPORT_CHUNK_SIZE=5):
+            response = self.client.get(self.url, {'stream': 1})
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            body = b''.join(response.streaming_content).decode()
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['delay_days'] for row in rows], list(range(self.ROWS - 1, -1, -1)))
+
+
+# ============================================
+# ANNOTATED FIELDS
+# ============================================
+
+class InvoiceAnnotationTests(TestCase):
+    """Invoice payment totals are annotated for filtering and ordering, and fresh after an update"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        vendor = Vendor.objects.create(vendor_code='V1', vendor_name='Vendor 1')
+        project = Project.objects.create(project_code='P1', project_name='Project 1', vendor=vendor)
+        cls.invoices = {}
+        for number, net_amount, paid, due_in in [('I1', 100, 35, -3), ('I2', 200, 0, 7), ('I3', 50, 50, -1)]:
+            invoice = Invoice.objects.create(
+                project=project, vendor=vendor, invoice_number=number, invoice_date=today,
+                due_date=today + timedelta(days=due_in), invoice_amount=Decimal(net_amount),
+                net_amount=Decimal(net_amount), payment_status='Paid' if paid == net_amount else 'Unpaid'
+            )
+            if paid:
+                Payment.objects.create(invoice=invoice, payment_amount=Decimal(paid), payment_date=today)
+            cls.invoices[number] = invoice
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @staticmethod
+    def rows(response):
+        return response.data['results'] if isinstance(response.data, dict) else response.data
+
+    def test_ordering(self):
+        response = self.client.get(reverse('invoice-list'), {'ordering': '-outstanding_amount'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['invoice_number'], Decimal(str(row['outstanding_amount']))) for row in self.rows(response)],
+            [('I2', Decimal('200')), ('I1', Decimal('65')), ('I3', Decimal('0'))]
+        )
+
+    def test_filter_overdue(self):
+        response = self.client.get(reverse('invoice-list'), {'is_overdue': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['invoice_number'] for row in self.rows(response)], ['I1'])
+
+    def test_update_response_is_recomputed(self):
+        url = reverse('invoice-detail', args=[self.invoices['I1'].pk])
+        response = self.client.patch(url, {
+            'net_amount': '500.00', 'due_date': (date.today() + timedelta(days=7)).isoformat()
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.data['outstanding_amount'])), Decimal('465'))
+        self.assertEqual(Decimal(str(response.data['total_paid'])), Decimal('35'))
+        self.assertFalse(response.data['is_overdue'])
+        self.assertEqual(response.data, self.client.get(url).data)
+
+
+# ============================================
+# KEYSET PAGINATION
+# ============================================
+
+# Links carry FORCE_SCRIPT_NAME, which the test client doesn't strip
+@override_settings(FORCE_SCRIPT_NAME=None)
+class KeysetPaginationTests(TestCase):
+    """
+    Cursor pages walked forwards (next) and backwards (previous) return every
+    row exactly once, in the list's order: NULLs last ascending and first
+    descending, ties broken by the primary key.
+    """
+
+    ROWS = 23
+    PAGE_SIZE = 4
+    ORDERINGS = [
+        None,  # the viewset's -date_received_jacket
+        'date_energized',
+        '-date_energized',
+        'total_resolution_days',
+        'date_energized,-date_received_jacket',
+        '-total_resolution_days,date_received_jacket',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='keyset-admin', password='x')
+        start = date(2024, 1, 1)
+        for i in range(cls.ROWS):
+            # Few distinct values, so most rows tie; every field has NULLs
+            energized = None if i % 4 == 0 else start + timedelta(days=i % 2)
+            WorkOrder.objects.create(
+                wo_no=f'WO{i}',
+                date_received_jacket=None if i % 5 == 0 else start + timedelta(days=i % 3),
+                date_energized=energized,
+                date_audited=None if energized is None or i % 3 == 0 else energized + timedelta(days=30 + i % 2)
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def expected(self, ordering):
+        terms = (ordering or '-date_received_jacket').split(',')
+        rows = list(WorkOrder.objects.values('wo_id', *(term.lstrip('-') for term in terms)))
+        rows.sort(key=lambda row: row['wo_id'], reverse=terms[-1].startswith('-'))
+        # Stable sorts, last term first; (is NULL, value) puts NULLs last ascending
+        for term in reversed(terms):
+            name = term.lstrip('-')
+            rows.sort(key=lambda row: (row[name] is None, row[name]), reverse=term.startswith('-'))
+        return [str(row['wo_id']) for row in rows]
+
+    def walk(self, url, link):
+        """Follow link from url; returns the pages' wo_ids and the last response"""
+        pages = []
+        while url:
+            self.assertLessEqual(len(pages), self.ROWS, 'cursor links never reach the end')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            pages.append([row['wo_id'] for row in response.data['results']])
+            url = response.data[link]
+        return pages, response
+
+    def test_walk_both_ways(self):
+        for ordering in self.ORDERINGS:
+            with self.subTest(ordering=ordering):
+                params = {'pagination': 'cursor', 'page_size': self.PAGE_SIZE}
+                if ordering:
+                    params['ordering'] = ordering
+                expected = self.expected(ordering)
+
+                forward, last = self.walk(f"{reverse('work-order-list')}?{urlencode(params)}", 'next')
+                self.assertEqual([pk for page in forward for pk in page], expected)
+                self.assertEqual(len(forward), -(-self.ROWS // self.PAGE_SIZE))
+
+                backward, first = self.walk(last.data['previous'], 'previous')
+                backward = [pk for page in reversed(backward) for pk in page] + forward[-1]
+                self.assertEqual(backward, expected)
+                self.assertIsNone(first.data['previous'])
+
+
+# ============================================
+# WORK ORDER ROLLUPS
+# ============================================
+
+class WorkOrderRollupTests(TestCase):
+    """Rollup deltas applied on save, delete, tracked bulk writes and imports match a rebuild"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vendors = [
+            Vendor.objects.create(vendor_code=f'V{i}', vendor_name=f'Vendor {i}') for i in range(2)
+        ]
+        start = date(2024, 1, 1)
+        for i in range(6):
+            WorkOrder.objects.create(
+                wo_no=f'WO{i}', vendor=cls.vendors[i % 2], assigned_crew='' if i % 3 == 0 else f'Crew {i % 2}',
+                status='NEW' if i % 2 else 'ENERGIZED',
+                date_received_jacket=None if i == 5 else start + timedelta(days=i % 2),
+                date_energized=None if i % 3 == 0 else start + timedelta(days=10),
+                total_manhours=Decimal('1.50') * i, total_estimated_cost=Decimal('100.25') * i
+            )
+
+    @staticmethod
+    def snapshot():
+        """{bucket key: measures}, summed over duplicate rows, without empty buckets"""
+        buckets = {}
+        for row in WorkOrderDailyRollup.objects.values(*WorkOrderRollupService.KEY_FIELDS, *WorkOrderRollupService.MEASURES):
+            key = tuple(row[field] for field in WorkOrderRollupService.KEY_FIELDS)
+            measures = buckets.get(key, (0, Decimal('0'), Decimal('0'), Decimal('0')))
+            buckets[key] = tuple(
+                total + row[field] for total, field in zip(measures, WorkOrderRollupService.MEASURES)
+            )
+        return {key: measures for key, measures in buckets.items() if any(measures)}
+
+    def assertMatchesRebuild(self):
+        applied = self.snapshot()
+        WorkOrderRollupService.rebuild()
+        self.assertEqual(applied, self.snapshot())
+
+    def test_create(self):
+        self.assertTrue(self.snapshot())
+        self.assertMatchesRebuild()
+
+    def test_save_moves_buckets(self):
+        work_order = WorkOrder.objects.get(wo_no='WO1')
+        work_order.status = 'AUDITED'
+        work_order.vendor = self.vendors[0]
+        work_order.assigned_crew = ''
+        work_order.date_energized = date(2024, 2, 1)
+        work_order.date_audited = date(2024, 2, 15)
+        work_order.billed_cost = Decimal('80.00')
+        work_order.save()
+
+        work_order = WorkOrder.objects.get(wo_no='WO2')
+        work_order.date_received_jacket = None
+        work_order.date_energized = None
+        work_order.save()
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        WorkOrder.objects.get(wo_no='WO3').delete()
+        WorkOrder.objects.filter(wo_no='WO4').get().delete()
+        self.assertMatchesRebuild()
+
+    def test_tracked_bulk_update(self):
+        work_orders = WorkOrder.objects.filter(wo_no__in=['WO0', 'WO1', 'WO2'])
+        with WorkOrderRollupService.track(work_orders):
+            work_orders.update(status='BILLED', billed_cost=Decimal('12.50'), vendor=self.vendors[1])
+        self.assertMatchesRebuild()
+
+    def test_import_updates_and_creates(self):
+        sheet = pd.DataFrame({
+            'WO NO': ['WO0', 'WO5', 'WO9'],
+            'Date Energized': ['2024-03-01', '2024-03-02', '2024-03-03'],
+            'ASSIGNED': ['Crew 9', 'Crew 9', ''],
+            'TOTAL MANHOURS': [2, 3, 4],
+        })
+        WorkOrderExcelImporter(batch_size=2).run(sheet)
+        self.assertTrue(WorkOrder.objects.filter(wo_no='WO9').exists())
+        self.assertMatchesRebuild()
+
+
+# ============================================
+# AGEING ANALYSIS
+# ============================================
+
+class AgeingLatestRunTests(TestCase):
+    """The latest run is read from the database, so runs written by another process show up at once"""
+
+    def test_run_from_elsewhere_is_seen(self):
+        today = date.today()
+        self.assertIsNone(AgeingAnalysisService.latest_run_date())
+        AgeingAnalysisService.generate(today - timedelta(days=1))
+        AgeingRunSummary.objects.create(analysis_date=today - timedelta(days=1), age_bracket='0-3')
+        self.assertEqual(AgeingAnalysisService.latest_run_date(), today - timedelta(days=1))
+
+        # As written by manage.py generate_ageing_analysis, without this process's hooks
+        AgeingRunSummary.objects.create(analysis_date=today, age_bracket='0-3', wo_count=1)
+        self.assertEqual(AgeingAnalysisService.latest_run_date(), today)
+
+
+# ============================================
+# DASHBOARD
+# ============================================
+
+class DashboardBootstrapTests(TransactionTestCase):
+    """
+    Bootstrap tiles run on the query pool and may fan out again (stats).
+    TransactionTestCase, since inside TestCase's atomic block everything runs
+    inline and the pool is never used.
+    """
+
+    TIMEOUT = 30
+
+    def setUp(self):
+        cache.clear()
+        ConcurrentQueryRunner.shutdown()
+        self.admin = User.objects.create_superuser(username='dashboard-admin', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def tearDown(self):
+        ConcurrentQueryRunner.shutdown()
+        DashboardStatsService.shutdown_refresh()
+        cache.clear()
+
+    @staticmethod
+    def thread_connection():
+        """The DB-API connection the calling thread runs its queries on"""
+        User.objects.exists()
+        return connection.connection
+
+    def test_pool_threads_keep_their_connection(self):
+        tasks = {name: self.thread_connection for name in ('a', 'b')}
+        with self.settings(DASHBOARD_QUERY_WORKERS=1):
+            first, _ = ConcurrentQueryRunner.run(tasks)
+            second, _ = ConcurrentQueryRunner.run(tasks)
+        self.assertEqual(len({id(raw) for raw in [*first.values(), *second.values()]}), 1)
+        self.assertIsNot(first['a'], connection.connection)
+
+    def test_unusable_connection_is_replaced(self):
+        def break_connection():
+            raw = self.thread_connection()
+            raw.close()  # As if the server dropped it
+            return raw
+
+        with self.settings(DASHBOARD_QUERY_WORKERS=1, DASHBOARD_CONNECTION_IDLE_CHECK=0):
+            results, _ = ConcurrentQueryRunner.run({'a': break_connection, 'b': self.thread_connection})
+        self.assertIsNot(results['a'], results['b'])
+
+    def test_bootstrap_with_one_worker(self):
+        responses = []
+        with self.settings(DASHBOARD_QUERY_WORKERS=1):
+            request = threading.Thread(
+                target=lambda: responses.append(self.client.get(reverse('dashboard-bootstrap'))),
+                daemon=True
+            )
+            request.start()
+            request.join(self.TIMEOUT)
+        self.assertFalse(request.is_alive(), 'bootstrap deadlocked the dashboard query pool')
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].data['stats']['total_projects'], 0)
+
+    def refresh_in_background(self):
+        """Serve stale stats, which starts a background refresh, and wait for it"""
+        cache.set(DashboardStatsService.CACHE_KEY, {'stats': {'total_projects': -1}, 'refresh_at': 0})
+        self.assertEqual(DashboardStatsService.get_stats(), {'total_projects': -1})
+        deadline = time.monotonic() + self.TIMEOUT
+        while cache.get(DashboardStatsService.REFRESH_LOCK_KEY) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def test_background_refresh_with_one_worker(self):
+        with self.settings(DASHBOARD_QUERY_WORKERS=1):
+            self.refresh_in_background()
+        self.assertEqual(cache.get(DashboardStatsService.CACHE_KEY)['stats']['total_projects'], 0)
+
+    def test_background_refreshes_reuse_connections(self):
+        created = []
+
+        def record(sender, connection, **kwargs):
+            created.append(threading.current_thread().name)
+
+        with self.settings(DASHBOARD_QUERY_WORKERS=2):
+            self.refresh_in_background()
+            connection_created.connect(record)
+            try:
+                self.refresh_in_background()
+            finally:
+                connection_created.disconnect(record)
+        self.assertEqual(cache.get(DashboardStatsService.CACHE_KEY)['stats']['total_projects'], 0)
+        self.assertEqual(created, [])
+
+
+# ============================================
+# IMPORTS
+# ============================================
+
+class ImportProgressTests(TransactionTestCase):
+    """Import batches and progress must be visible to other connections while a job runs"""
+
+    @staticmethod
+    def count_elsewhere():
+        """WorkOrder count as seen from another connection"""
+        counts = []
+
+        def count():
+            counts.append(WorkOrder.objects.count())
+            connection.close()
+        thread = threading.Thread(target=count)
+        thread.start()
+        thread.join()
+        return counts[0]
+
+    def test_batches_commit_as_they_go(self):
+        seen = []
+        sheet = pd.DataFrame({'WO NO': [f'WO{i}' for i in range(5)]})
+        WorkOrderExcelImporter(batch_size=2).run(
+            sheet, progress=lambda rows_processed, *counts: seen.append((rows_processed, self.count_elsewhere()))
+        )
+        self.assertEqual(seen, [(2, 2), (4, 4), (5, 5), (5, 5)])
+
+    def test_stale_running_jobs_are_requeued(self):
+        long_ago = timezone.now() - timedelta(minutes=31)
+        stale = ImportJob.objects.create(
+            import_type='WORK_ORDERS', file='stale.xlsx', status='RUNNING', started_at=long_ago
+        )
+        ImportJob.objects.create(
+            import_type='WORK_ORDERS', file='alive.xlsx', status='RUNNING', started_at=long_ago,
+            heartbeat_at=timezone.now()
+        )
+        with self.settings(IMPORT_JOB_STALE_MINUTES=30):
+            self.assertEqual(ImportJobService.requeue_stale(), [stale.pk])
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.started_at), ('PENDING', None))
+        self.assertEqual(ImportJobService.claim_next().pk, stale.pk)
@@ -121,9 +121,23 @@ router.register(r'kpi-snapshots', KPISnapshotViewSet, basename='kpi-snapshot')
 router.register(r'kpi-targets', KPITargetViewSet, basename='kpi-target')
 router.register(r'kpi-dashboard', KPIDashboardViewSet, basename='kpi-dashboard')
 
+# Background imports
+router.register(r'import-jobs', ImportJobViewSet, basename='import-job')
+
 
 # URL patterns
 urlpatterns = [
+    # Excel Import/Export endpoints - listed before the router, whose
+    # work-orders/<pk>/ route would otherwise match them first
+    path('api/v1/work-orders/import-excel/', import_work_orders_excel, name='import-work-orders'),
+    path('api/v1/work-orders/export-excel/', export_work_orders_excel, name='export-work-orders'),
+    path('api/v1/crew-monitoring/import-excel/', import_crew_monitoring_excel, name='import-crew-monitoring'),
+    path('api/v1/qi-monitoring/import-excel/', import_qi_monitoring_excel, name='import-qi-monitoring'),
+    
+    # Bulk operations
+    path('api/v1/work-orders/bulk-update/', bulk_update_work_orders, name='bulk-update-work-orders'),
+    path('api/v1/work-orders/bulk-upload-documents/', bulk_upload_documents, name='bulk-upload-documents'),
+    
     # Include router URLs
     path('api/v1/', include(router.urls)),
     path('test-email/', test_email_view, name='test-email'),
@@ -136,6 +150,7 @@ urlpatterns = [
     
     # ML Predictions
     path('predict/delay/', predict_delay, name='predict-delay'),
+    path('predict/delay/batch/', predict_delay_batch, name='predict-delay-batch'),
     path('predict/penalty/', predict_penalty, name='predict-penalty'),
     
     # Emailings
@@ -143,16 +158,6 @@ urlpatterns = [
     path('check-daily-email-status/', check_daily_email_status, name='check_daily_email_status'),
     path('auto-send-daily-email/', auto_send_daily_email, name='auto_send_daily_email'),
     
-    # Excel Import/Export endpoints
-    path('api/v1/work-orders/import-excel/', import_work_orders_excel, name='import-work-orders'),
-    path('api/v1/work-orders/export-excel/', export_work_orders_excel, name='export-work-orders'),
-    path('api/v1/crew-monitoring/import-excel/', import_crew_monitoring_excel, name='import-crew-monitoring'),
-    path('api/v1/qi-monitoring/import-excel/', import_qi_monitoring_excel, name='import-qi-monitoring'),
-    
-    # Bulk operations
-    path('api/v1/work-orders/bulk-update/', bulk_update_work_orders, name='bulk-update-work-orders'),
-    path('api/v1/work-orders/bulk-upload-documents/', bulk_upload_documents, name='bulk-upload-documents'),
-    
     # Chat endpoints
     path('chat/', chat, name='chat'),
     path('chat/health/', chat_health, name='chat-health'),
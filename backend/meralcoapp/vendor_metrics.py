@@ -0,0 +1,158 @@
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from .models import Project, Penalty, SLATracking, Vendor, VendorScorecard, WorkOrder
+
+
+def _per_vendor(queryset, vendor_path, aggregate, output_field, default=Value(0)):
+    """
+    Correlated subquery aggregating queryset for the outer vendor.
+
+    Each metric is computed over its own table, so combining several on one
+    Vendor queryset doesn't multiply joined rows the way chained
+    Count()/Sum() over one-to-many relations does.
+    """
+    subquery = Subquery(
+        queryset.filter(**{vendor_path: OuterRef('pk')}).order_by().values(
+            vendor_path
+        ).annotate(value=aggregate).values('value'),
+        output_field=output_field
+    )
+    if default is None:
+        return subquery
+    return Coalesce(subquery, default, output_field=output_field)
+
+
+class VendorMetrics:
+    """Project, penalty, SLA and work order metrics per vendor"""
+
+    INACTIVE_PROJECT_STATUSES = ['Completed', 'Cancelled', 'Billed']
+
+    @classmethod
+    def annotations(cls):
+        return {
+            'total_projects': _per_vendor(
+                Project.objects.all(), 'vendor', Count('pk'), IntegerField()
+            ),
+            'active_projects': _per_vendor(
+                Project.objects.filter(~Q(status__status_name__in=cls.INACTIVE_PROJECT_STATUSES)),
+                'vendor', Count('pk'), IntegerField()
+            ),
+            'delayed_projects': _per_vendor(
+                Project.objects.filter(is_delayed=True), 'vendor', Count('pk'), IntegerField()
+            ),
+            'total_penalties': _per_vendor(
+                Penalty.objects.exclude(penalty_status='Waived'), 'vendor',
+                Sum('penalty_amount'), DecimalField(max_digits=15, decimal_places=2)
+            ),
+            'sla_breaches': _per_vendor(
+                SLATracking.objects.filter(is_breached=True), 'project__vendor', Count('pk'), IntegerField()
+            ),
+            'total_work_orders': _per_vendor(
+                WorkOrder.objects.all(), 'vendor', Count('pk'), IntegerField()
+            ),
+            'completed_work_orders': _per_vendor(
+                WorkOrder.objects.filter(status='AUDITED'), 'vendor', Count('pk'), IntegerField()
+            ),
+            'delayed_work_orders': _per_vendor(
+                WorkOrder.objects.filter(is_delayed=True), 'vendor', Count('pk'), IntegerField()
+            ),
+            'avg_resolution_days': _per_vendor(
+                WorkOrder.objects.all(), 'vendor', Avg('total_resolution_days'), FloatField(), default=None
+            ),
+        }
+
+    @classmethod
+    def annotate(cls, queryset):
+        return queryset.annotate(**cls.annotations())
+
+    @staticmethod
+    def on_time_percentage(total_projects, delayed_projects):
+        if not total_projects:
+            return 0
+        return round(((total_projects - delayed_projects) / total_projects) * 100, 2)
+
+
+class VendorScorecardService:
+    """
+    Keeps VendorScorecard rows current.
+
+    Writes schedule the touched vendors; the pending set is refreshed once
+    when the surrounding transaction commits (immediately outside one), so a
+    loop of saves costs one refresh per vendor rather than one per save. A
+    refresh recomputes the vendor's metrics with VendorMetrics in one query
+    and upserts the rows.
+    """
+
+    _pending = threading.local()
+
+    METRIC_FIELDS = [
+        'total_projects', 'active_projects', 'delayed_projects', 'total_penalties', 'sla_breaches',
+        'total_work_orders', 'completed_work_orders', 'delayed_work_orders', 'avg_resolution_days',
+    ]
+    REBUILD_BATCH_SIZE = 500
+
+    @classmethod
+    def schedule(cls, vendor_ids):
+        vendor_ids = {vendor_id for vendor_id in vendor_ids if vendor_id is not None}
+        if not vendor_ids:
+            return
+        if not hasattr(cls._pending, 'vendor_ids'):
+            cls._pending.vendor_ids = set()
+        cls._pending.vendor_ids |= vendor_ids
+        transaction.on_commit(cls._flush)
+
+    @classmethod
+    def _flush(cls):
+        vendor_ids = getattr(cls._pending, 'vendor_ids', set())
+        cls._pending.vendor_ids = set()
+        if vendor_ids:
+            cls.refresh(vendor_ids)
+
+    @classmethod
+    def refresh(cls, vendor_ids):
+        """Recompute the scorecards of the given vendors; returns the number written"""
+        rows = VendorMetrics.annotate(
+            Vendor.objects.filter(pk__in=list(vendor_ids)).order_by()
+        ).values('pk', 'compliance_score', *cls.METRIC_FIELDS)
+
+        scorecards = [
+            VendorScorecard(
+                vendor_id=row['pk'],
+                compliance_score=row['compliance_score'] or 0,
+                on_time_percentage=Decimal(str(VendorMetrics.on_time_percentage(
+                    row['total_projects'], row['delayed_projects']
+                ))),
+                **{field: row[field] for field in cls.METRIC_FIELDS}
+            )
+            for row in rows
+        ]
+        VendorScorecard.objects.bulk_create(
+            scorecards,
+            update_conflicts=True,
+            unique_fields=['vendor'],
+            update_fields=cls.METRIC_FIELDS + ['compliance_score', 'on_time_percentage', 'refreshed_at']
+        )
+        return len(scorecards)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every vendor's scorecard; returns the number of vendors"""
+        vendor_ids = list(Vendor.objects.order_by().values_list('pk', flat=True))
+        with transaction.atomic():
+            VendorScorecard.objects.exclude(vendor_id__in=vendor_ids).delete()
+            for start in range(0, len(vendor_ids), cls.REBUILD_BATCH_SIZE):
+                cls.refresh(vendor_ids[start:start + cls.REBUILD_BATCH_SIZE])
+        return len(vendor_ids)
+
+    @classmethod
+    @contextmanager
+    def track_work_orders(cls, queryset):
+        """Schedule the vendors of work orders written by a bulk operation that bypasses save()"""
+        before = set(queryset.order_by().values_list('vendor_id', flat=True).distinct())
+        yield
+        after = set(queryset.order_by().values_list('vendor_id', flat=True).distinct())
+        cls.schedule(before | after)
@@ -47,10 +47,11 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime
-from .ml_service import ml_service
-from .chatbot_service import chatbot_service
+from .inference import chatbot_backend, ml_backend
+from .model_loading import readiness
 from .serializers import (
     DelayPredictionSerializer,
+    DelayBatchPredictionSerializer,
     PenaltyPredictionSerializer,
     ChatRequestSerializer
 )
@@ -67,39 +68,30 @@ from django.utils import timezone
 from datetime import date, timedelta
 from .models import *
 from .serializers import *
+from .dashboard_service import ConcurrentQueryRunner, DashboardStatsService
+from django.db.models.functions import Coalesce
+from .mixins import AnnotatedFieldsMixin, PaginatedActionsMixin, QuerysetOptimizerMixin
+from .filters import InvoiceFilter, ProjectFilter
+from .pagination import HighVolumePagination
+import time
 
 
 class DashboardViewSet(viewsets.ViewSet):
     """Dashboard analytics and statistics"""
     permission_classes = [AllowAny]
 
+    # Tiles returned by bootstrap (action names)
+    BOOTSTRAP_TILES = [
+        'stats', 'project_status_summary', 'vendor_performance', 'delay_analysis',
+        'monthly_trends', 'project_priority_distribution', 'upcoming_deadlines',
+        'financial_overview', 'sector_summary',
+    ]
+
     @action(detail=False, methods=['get'], url_path='stats')
     def stats(self, request):
-        """Get overall dashboard statistics"""
+        """Get overall dashboard statistics (cached, refreshed in the background)"""
         try:
-            stats = {
-                'total_projects': Project.objects.count(),
-                'active_projects': Project.objects.exclude(
-                    status__status_name__in=['Completed', 'Cancelled', 'Billed']
-                ).count(),
-                'delayed_projects': Project.objects.filter(is_delayed=True).count(),
-                'completed_projects': Project.objects.filter(
-                    status__status_name='Completed'
-                ).count(),
-                'total_vendors': Vendor.objects.count(),
-                'active_vendors': Vendor.objects.filter(is_active=True).count(),
-                'blacklisted_vendors': Vendor.objects.filter(is_blacklisted=True).count(),
-                'pending_inspections': QIInspection.objects.filter(is_completed=False).count(),
-                'overdue_documents': DocumentCompliance.objects.filter(
-                    is_overdue=True, is_submitted=False
-                ).count(),
-                'sla_breaches': SLATracking.objects.filter(is_breached=True).count(),
-                'total_penalties': float(Penalty.objects.aggregate(
-                    total=Sum('penalty_amount')
-                )['total'] or 0),
-                'pending_invoices': Invoice.objects.exclude(payment_status='Paid').count(),
-            }
-            return Response(stats)
+            return Response(DashboardStatsService.get_stats())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -131,27 +123,19 @@ class DashboardViewSet(viewsets.ViewSet):
         try:
             limit = int(request.query_params.get('limit', 10))
             
-            vendors = Vendor.objects.filter(is_active=True).annotate(
-                total_projects=Count('projects'),
-                delayed_projects=Count('projects', filter=Q(projects__is_delayed=True)),
-                total_penalties=Sum('penalties__penalty_amount', 
-                                   filter=~Q(penalties__penalty_status='Waived')),
-                sla_breaches=Count('projects__sla_tracking', 
-                                  filter=Q(projects__sla_tracking__is_breached=True))
-            ).values(
+            # Metrics come from the vendor scorecards; the limit is applied in SQL
+            vendors = Vendor.objects.filter(is_active=True).values(
                 'vendor_id', 'vendor_code', 'vendor_name', 'compliance_score',
-                'total_projects', 'delayed_projects', 'total_penalties', 'sla_breaches'
+                total_projects=Coalesce('scorecard__total_projects', 0),
+                delayed_projects=Coalesce('scorecard__delayed_projects', 0),
+                total_penalties=F('scorecard__total_penalties'),
+                sla_breaches=Coalesce('scorecard__sla_breaches', 0),
+                on_time_percentage=F('scorecard__on_time_percentage'),
             )[:limit]
             
             vendors_list = list(vendors)
             for vendor in vendors_list:
-                if vendor['total_projects'] > 0:
-                    on_time = vendor['total_projects'] - vendor['delayed_projects']
-                    vendor['on_time_percentage'] = round(
-                        (on_time / vendor['total_projects']) * 100, 2
-                    )
-                else:
-                    vendor['on_time_percentage'] = 0
+                vendor['on_time_percentage'] = float(vendor['on_time_percentage'] or 0)
                 vendor['total_penalties'] = float(vendor['total_penalties'] or 0)
                 vendor['compliance_score'] = float(vendor['compliance_score'] or 0)
             
@@ -337,11 +321,33 @@ class DashboardViewSet(viewsets.ViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['get'], url_path='bootstrap')
+    def bootstrap(self, request):
+        """
+        All dashboard tiles in one payload, computed concurrently.
+        
+        Each tile is the response of its own action (query params such as
+        ?limit= are passed through); per-tile milliseconds are in `_timings`.
+        """
+        started = time.perf_counter()
+        tasks = {
+            tile: (lambda tile=tile: getattr(self, tile)(request))
+            for tile in self.BOOTSTRAP_TILES
+        }
+        responses, timings = ConcurrentQueryRunner.run(tasks)
+        
+        payload = {tile: responses[tile].data for tile in self.BOOTSTRAP_TILES}
+        timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+        payload['_timings'] = timings
+        return Response(payload)
+
 @api_view(['GET'])
 def health_check(request):
+    """Liveness plus model readiness; models are reported, never loaded, here"""
     return Response({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'models': readiness()
     })
 
 @api_view(['POST'])
@@ -351,11 +357,26 @@ def predict_delay(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        prediction = ml_service.predict_delay(serializer.validated_data)
+        prediction = ml_backend().predict_delay(serializer.validated_data)
         return Response(prediction)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+def predict_delay_batch(request):
+    """Delay predictions for {"projects": [...]} in one model call, in input order"""
+    serializer = DelayBatchPredictionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        predictions = ml_backend().predict_delay_batch(serializer.validated_data['projects'])
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response({'count': len(predictions), 'predictions': predictions})
+
 @api_view(['POST'])
 def predict_penalty(request):
     serializer = PenaltyPredictionSerializer(data=request.data)
@@ -363,7 +384,7 @@ def predict_penalty(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        prediction = ml_service.predict_penalty(
+        prediction = ml_backend().predict_penalty(
             serializer.validated_data['violation_type'],
             serializer.validated_data['delay_days']
         )
@@ -375,7 +396,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
-from .chatbot_service import chatbot_service
+from .inference import chatbot_backend
 from .serializers import ChatRequestSerializer
 import logging
 
@@ -421,7 +442,7 @@ def chat(request):
         print(f"{'='*80}")
         
         # Get answer from chatbot service
-        answer = chatbot_service.answer(question)
+        answer = chatbot_backend().answer(question)
         
         # Log the response
         logger.info(f"Chat answer generated: {answer[:100]}...")
@@ -451,15 +472,25 @@ def chat(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def chat_health(request):
-    """Check if chatbot is loaded and working"""
+    """Check if chatbot is loaded and working (503 until it has loaded)"""
+    chatbot = chatbot_backend()
+    readiness_state = chatbot.status()
+    if readiness_state['state'] != 'ready':
+        return Response({
+            'status': readiness_state['state'],
+            'chatbot_loaded': False,
+            'readiness': readiness_state
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
     try:
         # Test the chatbot
-        test_answer = chatbot_service.answer("test")
+        test_answer = chatbot.answer("test")
         
         return Response({
             'status': 'healthy',
             'chatbot_loaded': True,
-            'knowledge_base_size': len(chatbot_service.kb_questions),
+            'readiness': readiness_state,
+            'knowledge_base_size': readiness_state.get('knowledge_base_size'),
             'model': 'all-MiniLM-L6-v2',
             'test_response': test_answer[:100] + "..."
         })
@@ -485,7 +516,7 @@ def chat_debug(request):
     
     try:
         # Get similar questions
-        similar = chatbot_service.get_similar_questions(question, top_k=10)
+        similar = chatbot_backend().get_similar_questions(question, top_k=10)
         
         return Response({
             'question': question,
@@ -747,7 +778,7 @@ def get_user_roles(request):
 # USER MANAGEMENT VIEWSETS
 # ============================================
 
-class UserRoleViewSet(viewsets.ModelViewSet):
+class UserRoleViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = UserRole.objects.all()
     serializer_class = UserRoleSerializer
     permission_classes = [AllowAny]
@@ -756,7 +787,7 @@ class UserRoleViewSet(viewsets.ModelViewSet):
     ordering_fields = ['role_name', 'created_at']
 
 
-class PermissionViewSet(viewsets.ModelViewSet):
+class PermissionViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = Permission.objects.all()
     serializer_class = PermissionSerializer
     permission_classes = [AllowAny]
@@ -765,7 +796,7 @@ class PermissionViewSet(viewsets.ModelViewSet):
     search_fields = ['permission_name', 'permission_description']
 
 
-class RolePermissionViewSet(viewsets.ModelViewSet):
+class RolePermissionViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = RolePermission.objects.select_related('role', 'permission').all()
     serializer_class = RolePermissionSerializer
     permission_classes = [AllowAny]
@@ -773,7 +804,7 @@ class RolePermissionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['role', 'permission']
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = User.objects.select_related('role').all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
@@ -797,9 +828,10 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response({'status': 'user deactivated'})
 
 
-class UserSessionViewSet(viewsets.ReadOnlyModelViewSet):
+class UserSessionViewSet(QuerysetOptimizerMixin, viewsets.ReadOnlyModelViewSet):
     queryset = UserSession.objects.select_related('user').all()
     serializer_class = UserSessionSerializer
+    pagination_class = HighVolumePagination
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['user', 'is_active']
@@ -810,8 +842,8 @@ class UserSessionViewSet(viewsets.ReadOnlyModelViewSet):
 # VENDOR MANAGEMENT VIEWSETS
 # ============================================
 
-class VendorViewSet(viewsets.ModelViewSet):
-    queryset = Vendor.objects.prefetch_related('contacts').all()
+class VendorViewSet(AnnotatedFieldsMixin, PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
+    queryset = Vendor.objects.select_related('scorecard').prefetch_related('contacts').all()
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'is_blacklisted', 'city', 'region']
@@ -848,19 +880,20 @@ class VendorViewSet(viewsets.ModelViewSet):
         """Get vendor performance history"""
         vendor = self.get_object()
         performance = vendor.performance_records.all()
-        serializer = VendorPerformanceSerializer(performance, many=True)
-        return Response(serializer.data)
+        return self.list_response(performance, VendorPerformanceSerializer)
 
     @action(detail=False, methods=['get'])
     def top_performers(self, request):
         """Get top performing vendors"""
         limit = int(request.query_params.get('limit', 10))
-        vendors = Vendor.objects.filter(is_active=True, is_blacklisted=False).order_by('-compliance_score')[:limit]
+        vendors = Vendor.objects.filter(is_active=True, is_blacklisted=False).select_related(
+            'scorecard'
+        ).order_by('-compliance_score', F('scorecard__on_time_percentage').desc(nulls_last=True))[:limit]
         serializer = VendorListSerializer(vendors, many=True)
         return Response(serializer.data)
 
 
-class VendorContactViewSet(viewsets.ModelViewSet):
+class VendorContactViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = VendorContact.objects.select_related('vendor').all()
     serializer_class = VendorContactSerializer
     permission_classes = [AllowAny]
@@ -869,7 +902,7 @@ class VendorContactViewSet(viewsets.ModelViewSet):
     search_fields = ['contact_name', 'contact_email', 'contact_phone']
 
 
-class VendorPerformanceViewSet(viewsets.ModelViewSet):
+class VendorPerformanceViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = VendorPerformance.objects.select_related('vendor', 'evaluator').all()
     serializer_class = VendorPerformanceSerializer
     permission_classes = [AllowAny]
@@ -882,7 +915,7 @@ class VendorPerformanceViewSet(viewsets.ModelViewSet):
 # PROJECT MANAGEMENT VIEWSETS
 # ============================================
 
-class SectorViewSet(viewsets.ModelViewSet):
+class SectorViewSet(AnnotatedFieldsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = Sector.objects.select_related('sector_manager').all()
     serializer_class = SectorSerializer
     permission_classes = [AllowAny]
@@ -891,7 +924,7 @@ class SectorViewSet(viewsets.ModelViewSet):
     search_fields = ['sector_code', 'sector_name', 'location']
 
 
-class ProjectStatusViewSet(viewsets.ModelViewSet):
+class ProjectStatusViewSet(AnnotatedFieldsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = ProjectStatus.objects.all()
     serializer_class = ProjectStatusSerializer
     permission_classes = [AllowAny]
@@ -899,35 +932,33 @@ class ProjectStatusViewSet(viewsets.ModelViewSet):
     ordering_fields = ['status_order', 'status_name']
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(AnnotatedFieldsMixin, PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
+    # delay_probability and predicted_risk_level are annotated from the serializer
     queryset = Project.objects.select_related(
         'vendor', 'sector', 'status', 'assigned_engineer', 'assigned_qi', 'wo_supervisor'
     ).prefetch_related('milestones', 'team_members').all()
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['vendor', 'sector', 'status', 'priority', 'risk_score', 
-                        'is_delayed', 'assigned_engineer', 'assigned_qi']
+    filterset_class = ProjectFilter
     search_fields = ['project_code', 'project_name', 'project_location']
-    ordering_fields = ['project_code', 'start_date', 'completion_date', 'created_at']
+    ordering_fields = ['project_code', 'start_date', 'completion_date', 'created_at', 'delay_probability']
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'delayed', 'critical'):
             return ProjectListSerializer
         return ProjectSerializer
 
     @action(detail=False, methods=['get'])
     def delayed(self, request):
         """Get all delayed projects"""
-        projects = self.queryset.filter(is_delayed=True)
-        serializer = ProjectListSerializer(projects, many=True)
-        return Response(serializer.data)
+        projects = self.get_queryset().filter(is_delayed=True)
+        return self.list_response(projects)
 
     @action(detail=False, methods=['get'])
     def critical(self, request):
         """Get critical priority projects"""
-        projects = self.queryset.filter(priority='Critical')
-        serializer = ProjectListSerializer(projects, many=True)
-        return Response(serializer.data)
+        projects = self.get_queryset().filter(priority='Critical')
+        return self.list_response(projects)
 
     @action(detail=True, methods=['get'])
     def timeline(self, request, pk=None):
@@ -956,7 +987,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(status_summary)
 
 
-class ProjectMilestoneViewSet(viewsets.ModelViewSet):
+class ProjectMilestoneViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = ProjectMilestone.objects.select_related('project').all()
     serializer_class = ProjectMilestoneSerializer
     permission_classes = [AllowAny]
@@ -965,7 +996,7 @@ class ProjectMilestoneViewSet(viewsets.ModelViewSet):
     ordering_fields = ['milestone_order', 'target_date']
 
 
-class ProjectTeamViewSet(viewsets.ModelViewSet):
+class ProjectTeamViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = ProjectTeam.objects.select_related('project', 'user').all()
     serializer_class = ProjectTeamSerializer
     permission_classes = [AllowAny]
@@ -977,7 +1008,7 @@ class ProjectTeamViewSet(viewsets.ModelViewSet):
 # WORKFLOW MANAGEMENT VIEWSETS
 # ============================================
 
-class WorkflowStageViewSet(viewsets.ModelViewSet):
+class WorkflowStageViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = WorkflowStage.objects.all()
     serializer_class = WorkflowStageSerializer
     permission_classes = [AllowAny]
@@ -985,7 +1016,7 @@ class WorkflowStageViewSet(viewsets.ModelViewSet):
     ordering_fields = ['stage_order', 'stage_name']
 
 
-class ProjectWorkflowViewSet(viewsets.ModelViewSet):
+class ProjectWorkflowViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = ProjectWorkflow.objects.select_related(
         'project', 'stage', 'assigned_user'
     ).all()
@@ -998,19 +1029,18 @@ class ProjectWorkflowViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue workflow stages"""
-        overdue = self.queryset.filter(
+        overdue = self.get_queryset().filter(
             completion_date__isnull=True,
             due_date__lt=date.today()
         )
-        serializer = self.get_serializer(overdue, many=True)
-        return Response(serializer.data)
+        return self.list_response(overdue)
 
 
 # ============================================
 # DOCUMENT MANAGEMENT VIEWSETS
 # ============================================
 
-class DocumentTypeViewSet(viewsets.ModelViewSet):
+class DocumentTypeViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = DocumentType.objects.all()
     serializer_class = DocumentTypeSerializer
     permission_classes = [AllowAny]
@@ -1018,7 +1048,7 @@ class DocumentTypeViewSet(viewsets.ModelViewSet):
     search_fields = ['doc_type_name', 'doc_type_description']
 
 
-class ProjectDocumentViewSet(viewsets.ModelViewSet):
+class ProjectDocumentViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = ProjectDocument.objects.select_related(
         'project', 'doc_type', 'uploaded_by', 'approved_by'
     ).all()
@@ -1051,12 +1081,11 @@ class ProjectDocumentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending_approval(self, request):
         """Get documents pending approval"""
-        pending = self.queryset.filter(approval_status='Pending')
-        serializer = self.get_serializer(pending, many=True)
-        return Response(serializer.data)
+        pending = self.get_queryset().filter(approval_status='Pending')
+        return self.list_response(pending)
 
 
-class DocumentComplianceViewSet(viewsets.ModelViewSet):
+class DocumentComplianceViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = DocumentCompliance.objects.select_related('project', 'doc_type').all()
     serializer_class = DocumentComplianceSerializer
     permission_classes = [AllowAny]
@@ -1066,16 +1095,15 @@ class DocumentComplianceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue documents"""
-        overdue = self.queryset.filter(is_overdue=True, is_submitted=False)
-        serializer = self.get_serializer(overdue, many=True)
-        return Response(serializer.data)
+        overdue = self.get_queryset().filter(is_overdue=True, is_submitted=False)
+        return self.list_response(overdue)
 
 
 # ============================================
 # SLA MANAGEMENT VIEWSETS
 # ============================================
 
-class SLARuleViewSet(viewsets.ModelViewSet):
+class SLARuleViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = SLARule.objects.select_related('stage').all()
     serializer_class = SLARuleSerializer
     permission_classes = [AllowAny]
@@ -1084,7 +1112,7 @@ class SLARuleViewSet(viewsets.ModelViewSet):
     search_fields = ['rule_name', 'rule_description']
 
 
-class SLATrackingViewSet(viewsets.ModelViewSet):
+class SLATrackingViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = SLATracking.objects.select_related(
         'project', 'sla_rule', 'waived_by'
     ).all()
@@ -1097,21 +1125,19 @@ class SLATrackingViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def breached(self, request):
         """Get all SLA breaches"""
-        breaches = self.queryset.filter(is_breached=True, status='Breached')
-        serializer = self.get_serializer(breaches, many=True)
-        return Response(serializer.data)
+        breaches = self.get_queryset().filter(is_breached=True, status='Breached')
+        return self.list_response(breaches)
 
     @action(detail=False, methods=['get'])
     def at_risk(self, request):
         """Get SLAs at risk of breach"""
         warning_date = date.today() + timedelta(days=2)
-        at_risk = self.queryset.filter(
+        at_risk = self.get_queryset().filter(
             completion_date__isnull=True,
             due_date__lte=warning_date,
             is_breached=False
         )
-        serializer = self.get_serializer(at_risk, many=True)
-        return Response(serializer.data)
+        return self.list_response(at_risk)
 
     @action(detail=True, methods=['post'])
     def waive(self, request, pk=None):
@@ -1129,13 +1155,13 @@ class SLATrackingViewSet(viewsets.ModelViewSet):
 # QUALITY INSPECTION VIEWSETS
 # ============================================
 
-class InspectionTypeViewSet(viewsets.ModelViewSet):
+class InspectionTypeViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = InspectionType.objects.all()
     serializer_class = InspectionTypeSerializer
     permission_classes = [AllowAny]
 
 
-class QIInspectionViewSet(viewsets.ModelViewSet):
+class QIInspectionViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = QIInspection.objects.select_related(
         'project', 'inspection_type', 'assigned_qi'
     ).all()
@@ -1148,29 +1174,26 @@ class QIInspectionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get pending inspections"""
-        pending = self.queryset.filter(is_completed=False)
-        serializer = self.get_serializer(pending, many=True)
-        return Response(serializer.data)
+        pending = self.get_queryset().filter(is_completed=False)
+        return self.list_response(pending)
 
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue inspections"""
-        overdue = self.queryset.filter(
+        overdue = self.get_queryset().filter(
             is_completed=False,
             scheduled_date__lt=date.today()
         )
-        serializer = self.get_serializer(overdue, many=True)
-        return Response(serializer.data)
+        return self.list_response(overdue)
 
     @action(detail=False, methods=['get'])
     def my_inspections(self, request):
         """Get inspections assigned to current user"""
-        my_inspections = self.queryset.filter(assigned_qi=request.user)
-        serializer = self.get_serializer(my_inspections, many=True)
-        return Response(serializer.data)
+        my_inspections = self.get_queryset().filter(assigned_qi=request.user)
+        return self.list_response(my_inspections)
 
 
-class QIDailyTargetViewSet(viewsets.ModelViewSet):
+class QIDailyTargetViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = QIDailyTarget.objects.select_related('qi_user').all()
     serializer_class = QIDailyTargetSerializer
     permission_classes = [AllowAny]
@@ -1181,12 +1204,11 @@ class QIDailyTargetViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_targets(self, request):
         """Get targets for current user"""
-        targets = self.queryset.filter(qi_user=request.user)
-        serializer = self.get_serializer(targets, many=True)
-        return Response(serializer.data)
+        targets = self.get_queryset().filter(qi_user=request.user)
+        return self.list_response(targets)
 
 
-class QIPerformanceViewSet(viewsets.ReadOnlyModelViewSet):
+class QIPerformanceViewSet(QuerysetOptimizerMixin, viewsets.ReadOnlyModelViewSet):
     queryset = QIPerformance.objects.select_related('qi_user').all()
     serializer_class = QIPerformanceSerializer
     permission_classes = [AllowAny]
@@ -1199,7 +1221,7 @@ class QIPerformanceViewSet(viewsets.ReadOnlyModelViewSet):
 # PENALTY MANAGEMENT VIEWSETS
 # ============================================
 
-class PenaltyRuleViewSet(viewsets.ModelViewSet):
+class PenaltyRuleViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = PenaltyRule.objects.all()
     serializer_class = PenaltyRuleSerializer
     permission_classes = [AllowAny]
@@ -1208,7 +1230,7 @@ class PenaltyRuleViewSet(viewsets.ModelViewSet):
     search_fields = ['rule_name', 'rule_description']
 
 
-class PenaltyViewSet(viewsets.ModelViewSet):
+class PenaltyViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = Penalty.objects.select_related(
         'project', 'vendor', 'penalty_rule', 'created_by', 'approved_by', 'waived_by'
     ).all()
@@ -1245,9 +1267,8 @@ class PenaltyViewSet(viewsets.ModelViewSet):
         """Get penalties grouped by vendor"""
         vendor_id = request.query_params.get('vendor_id')
         if vendor_id:
-            penalties = self.queryset.filter(vendor_id=vendor_id)
-            serializer = self.get_serializer(penalties, many=True)
-            return Response(serializer.data)
+            penalties = self.get_queryset().filter(vendor_id=vendor_id)
+            return self.list_response(penalties)
         return Response({'error': 'vendor_id required'}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'])
@@ -1268,26 +1289,26 @@ class PenaltyViewSet(viewsets.ModelViewSet):
 # BILLING MANAGEMENT VIEWSETS
 # ============================================
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(AnnotatedFieldsMixin, PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
+    # total_paid, outstanding_amount and is_overdue are annotated from the serializer
     queryset = Invoice.objects.select_related(
         'project', 'vendor', 'created_by', 'approved_by'
     ).prefetch_related('payments').all()
     serializer_class = InvoiceSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['vendor', 'project', 'payment_status']
+    filterset_class = InvoiceFilter
     search_fields = ['invoice_number']
-    ordering_fields = ['invoice_date', 'due_date', 'invoice_amount']
+    ordering_fields = ['invoice_date', 'due_date', 'invoice_amount', 'total_paid', 'outstanding_amount']
 
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue invoices"""
-        overdue = self.queryset.filter(
+        overdue = self.get_queryset().filter(
             payment_status__in=['Unpaid', 'Partially Paid'],
             due_date__lt=date.today()
         )
-        serializer = self.get_serializer(overdue, many=True)
-        return Response(serializer.data)
+        return self.list_response(overdue)
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -1312,7 +1333,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         return Response({'status': 'invoice marked as paid'})
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.select_related('invoice', 'processed_by').all()
     serializer_class = PaymentSerializer
     permission_classes = [AllowAny]
@@ -1325,7 +1346,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
 # NOTIFICATION MANAGEMENT VIEWSETS
 # ============================================
 
-class NotificationTemplateViewSet(viewsets.ModelViewSet):
+class NotificationTemplateViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = NotificationTemplate.objects.all()
     serializer_class = NotificationTemplateSerializer
     permission_classes = [AllowAny]
@@ -1334,11 +1355,12 @@ class NotificationTemplateViewSet(viewsets.ModelViewSet):
     search_fields = ['template_name', 'template_subject']
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.select_related(
         'recipient_user', 'related_project'
     ).all()
     serializer_class = NotificationSerializer
+    pagination_class = HighVolumePagination
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['recipient_user', 'notification_type', 'status', 'related_project']
@@ -1347,19 +1369,17 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_notifications(self, request):
         """Get notifications for current user"""
-        notifications = self.queryset.filter(recipient_user=request.user)
-        serializer = self.get_serializer(notifications, many=True)
-        return Response(serializer.data)
+        notifications = self.get_queryset().filter(recipient_user=request.user)
+        return self.list_response(notifications)
 
     @action(detail=False, methods=['get'])
     def unread(self, request):
         """Get unread notifications for current user"""
-        unread = self.queryset.filter(
+        unread = self.get_queryset().filter(
             recipient_user=request.user,
             read_at__isnull=True
         )
-        serializer = self.get_serializer(unread, many=True)
-        return Response(serializer.data)
+        return self.list_response(unread)
 
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
@@ -1384,7 +1404,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
 # ESCALATION MANAGEMENT VIEWSETS
 # ============================================
 
-class EscalationRuleViewSet(viewsets.ModelViewSet):
+class EscalationRuleViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = EscalationRule.objects.select_related(
         'escalate_to_role', 'notification_template'
     ).all()
@@ -1395,7 +1415,7 @@ class EscalationRuleViewSet(viewsets.ModelViewSet):
     search_fields = ['rule_name', 'rule_description']
 
 
-class EscalationViewSet(viewsets.ModelViewSet):
+class EscalationViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = Escalation.objects.select_related(
         'project', 'escalation_rule', 'escalated_from_user', 
         'escalated_to_user', 'resolved_by'
@@ -1409,16 +1429,14 @@ class EscalationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_escalations(self, request):
         """Get escalations assigned to current user"""
-        escalations = self.queryset.filter(escalated_to_user=request.user)
-        serializer = self.get_serializer(escalations, many=True)
-        return Response(serializer.data)
+        escalations = self.get_queryset().filter(escalated_to_user=request.user)
+        return self.list_response(escalations)
 
     @action(detail=False, methods=['get'])
     def open(self, request):
         """Get open escalations"""
-        open_escalations = self.queryset.filter(status='Open')
-        serializer = self.get_serializer(open_escalations, many=True)
-        return Response(serializer.data)
+        open_escalations = self.get_queryset().filter(status='Open')
+        return self.list_response(open_escalations)
 
     @action(detail=True, methods=['post'])
     def resolve(self, request, pk=None):
@@ -1436,7 +1454,7 @@ class EscalationViewSet(viewsets.ModelViewSet):
 # ANALYTICS VIEWSETS
 # ============================================
 
-class DelayFactorViewSet(viewsets.ModelViewSet):
+class DelayFactorViewSet(AnnotatedFieldsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = DelayFactor.objects.all()
     serializer_class = DelayFactorSerializer
     permission_classes = [AllowAny]
@@ -1445,7 +1463,7 @@ class DelayFactorViewSet(viewsets.ModelViewSet):
     search_fields = ['factor_name', 'factor_description']
 
 
-class ProjectDelayViewSet(viewsets.ModelViewSet):
+class ProjectDelayViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = ProjectDelay.objects.select_related(
         'project', 'factor', 'reported_by'
     ).all()
@@ -1475,7 +1493,7 @@ class ProjectDelayViewSet(viewsets.ModelViewSet):
 # VENDOR PORTAL VIEWSETS
 # ============================================
 
-class VendorDisputeViewSet(viewsets.ModelViewSet):
+class VendorDisputeViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = VendorDispute.objects.select_related(
         'vendor', 'project', 'related_penalty', 'assigned_to', 'resolved_by'
     ).all()
@@ -1488,9 +1506,8 @@ class VendorDisputeViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_disputes(self, request):
         """Get disputes for current user's vendor"""
-        disputes = self.queryset.filter(vendor__email=request.user.email)
-        serializer = self.get_serializer(disputes, many=True)
-        return Response(serializer.data)
+        disputes = self.get_queryset().filter(vendor__email=request.user.email)
+        return self.list_response(disputes)
 
     @action(detail=True, methods=['post'])
     def assign(self, request, pk=None):
@@ -1517,7 +1534,7 @@ class VendorDisputeViewSet(viewsets.ModelViewSet):
         return Response({'status': 'dispute resolved'})
 
 
-class VendorFeedbackViewSet(viewsets.ModelViewSet):
+class VendorFeedbackViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = VendorFeedback.objects.select_related(
         'vendor', 'reviewed_by'
     ).all()
@@ -1532,18 +1549,20 @@ class VendorFeedbackViewSet(viewsets.ModelViewSet):
 # AUDIT & CHANGE LOG VIEWSETS
 # ============================================
 
-class ChangeLogViewSet(viewsets.ReadOnlyModelViewSet):
+class ChangeLogViewSet(QuerysetOptimizerMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ChangeLog.objects.select_related('changed_by').all()
     serializer_class = ChangeLogSerializer
+    pagination_class = HighVolumePagination
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['table_name', 'change_type', 'changed_by']
     ordering_fields = ['created_at']
 
 
-class SystemAuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class SystemAuditLogViewSet(QuerysetOptimizerMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SystemAuditLog.objects.select_related('user').all()
     serializer_class = SystemAuditLogSerializer
+    pagination_class = HighVolumePagination
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['user', 'action_type', 'status', 'entity_type']
@@ -1554,7 +1573,7 @@ class SystemAuditLogViewSet(viewsets.ReadOnlyModelViewSet):
 # SYSTEM CONFIGURATION VIEWSETS
 # ============================================
 
-class SystemSettingViewSet(viewsets.ModelViewSet):
+class SystemSettingViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = SystemSetting.objects.all()
     serializer_class = SystemSettingSerializer
     permission_classes = [AllowAny]
@@ -1572,14 +1591,18 @@ from django.db.models import Count, Sum, Avg, Q, F
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.renderers import JSONRenderer
+from .exporters import WorkOrderExporter, EXPORT_RENDERERS, ExportContentNegotiation
+from .ageing_service import AgeingAnalysisService
 
 # ============================================
 # WORK ORDER VIEWSETS
 # ============================================
 
-class WorkOrderViewSet(viewsets.ModelViewSet):
+class WorkOrderViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = WorkOrder.objects.all()
     serializer_class = WorkOrderSerializer
+    pagination_class = HighVolumePagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'priority', 'vendor', 'assigned_crew', 'supervisor', 'is_vip', 'is_delayed']
     search_fields = ['wo_no', 'description', 'location', 'municipality']
@@ -1610,7 +1633,7 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
         )
         
         # Recent work orders
-        recent_wo = WorkOrder.objects.all()[:10]
+        recent_wo = WorkOrder.objects.select_related('vendor', 'supervisor')[:10]
         
         # VIP projects
         vip_count = WorkOrder.objects.filter(is_vip=True).count()
@@ -1628,16 +1651,26 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def by_vendor(self, request):
         """Get work orders grouped by vendor"""
-        vendor_stats = WorkOrder.objects.values(
-            'vendor__vendor_code', 
-            'vendor__vendor_name'
-        ).annotate(
+        vendor_stats = list(VendorScorecard.objects.filter(total_work_orders__gt=0).values(
+            'vendor__vendor_code',
+            'vendor__vendor_name',
+            'avg_resolution_days',
+            total_wo=F('total_work_orders'),
+            completed=F('completed_work_orders'),
+            delayed=F('delayed_work_orders')
+        ).order_by())
+        
+        # Work orders without a vendor have no scorecard
+        unassigned = WorkOrder.objects.filter(vendor__isnull=True).aggregate(
             total_wo=Count('wo_id'),
             completed=Count('wo_id', filter=Q(status='AUDITED')),
             delayed=Count('wo_id', filter=Q(is_delayed=True)),
             avg_resolution_days=Avg('total_resolution_days')
-        ).order_by('-total_wo')
+        )
+        if unassigned['total_wo']:
+            vendor_stats.append({'vendor__vendor_code': None, 'vendor__vendor_name': None, **unassigned})
         
+        vendor_stats.sort(key=lambda row: row['total_wo'], reverse=True)
         return Response(vendor_stats)
     
     @action(detail=False, methods=['get'])
@@ -1655,23 +1688,23 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def delayed_projects(self, request):
         """Get all delayed projects"""
-        delayed = WorkOrder.objects.filter(is_delayed=True).order_by('-delay_days')
-        serializer = self.get_serializer(delayed, many=True)
-        return Response(serializer.data)
+        delayed = self.get_queryset().filter(is_delayed=True).order_by('-delay_days')
+        return self.list_response(delayed)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer] + EXPORT_RENDERERS,
+            content_negotiation_class=ExportContentNegotiation)
     def export_excel(self, request):
-        """Export work orders to Excel format (matching your C1 sheet)"""
-        # This will be implemented with pandas/openpyxl
-        # For now, return the data structure
-        work_orders = self.get_queryset()
-        serializer = self.get_serializer(work_orders, many=True)
-        
-        return Response({
-            'message': 'Excel export endpoint',
-            'data': serializer.data,
-            'format': 'C1_sheet_format'
-        })
+        """
+        Export work orders in the C1 sheet layout (?format=xlsx|csv|ndjson|parquet).
+
+        Honours the list filters, search and ordering; rows are streamed in
+        chunks by WorkOrderExporter.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return WorkOrderExporter(queryset).response(request.query_params.get('format', 'xlsx'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=True, methods=['post'])
     def upload_document(self, request, pk=None):
@@ -1692,11 +1725,10 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
         """Get all documents for this work order"""
         work_order = self.get_object()
         documents = work_order.wo_documents.all()
-        serializer = WorkOrderDocumentSerializer(documents, many=True)
-        return Response(serializer.data)
+        return self.list_response(documents, WorkOrderDocumentSerializer)
 
 
-class WorkOrderDocumentViewSet(viewsets.ModelViewSet):
+class WorkOrderDocumentViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = WorkOrderDocument.objects.all()
     serializer_class = WorkOrderDocumentSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -1720,7 +1752,7 @@ class WorkOrderDocumentViewSet(viewsets.ModelViewSet):
 # CREW MONITORING VIEWSETS
 # ============================================
 
-class CrewTypeViewSet(viewsets.ModelViewSet):
+class CrewTypeViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = CrewType.objects.all()
     serializer_class = CrewTypeSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -1728,7 +1760,7 @@ class CrewTypeViewSet(viewsets.ModelViewSet):
     ordering = ['crew_code']
 
 
-class DailyCrewMonitoringViewSet(viewsets.ModelViewSet):
+class DailyCrewMonitoringViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = DailyCrewMonitoring.objects.all()
     serializer_class = DailyCrewMonitoringSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -1801,7 +1833,7 @@ class DailyCrewMonitoringViewSet(viewsets.ModelViewSet):
 # QI MONITORING VIEWSETS
 # ============================================
 
-class QIWeeklyAccomplishmentViewSet(viewsets.ModelViewSet):
+class QIWeeklyAccomplishmentViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = QIWeeklyAccomplishment.objects.all()
     serializer_class = QIWeeklyAccomplishmentSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -1814,12 +1846,11 @@ class QIWeeklyAccomplishmentViewSet(viewsets.ModelViewSet):
         today = timezone.now().date()
         week_start = today - timedelta(days=today.weekday())
         
-        current_week = QIWeeklyAccomplishment.objects.filter(
+        current_week = self.get_queryset().filter(
             week_start_date=week_start
         )
         
-        serializer = self.get_serializer(current_week, many=True)
-        return Response(serializer.data)
+        return self.list_response(current_week)
     
     @action(detail=False, methods=['get'])
     def qi_performance(self, request):
@@ -1847,7 +1878,7 @@ class QIWeeklyAccomplishmentViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
-class QIMonthlyAccomplishmentViewSet(viewsets.ModelViewSet):
+class QIMonthlyAccomplishmentViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = QIMonthlyAccomplishment.objects.all()
     serializer_class = QIMonthlyAccomplishmentSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -1859,12 +1890,11 @@ class QIMonthlyAccomplishmentViewSet(viewsets.ModelViewSet):
         """Get current month's accomplishments"""
         current_month = timezone.now().date().replace(day=1)
         
-        accomplishments = QIMonthlyAccomplishment.objects.filter(
+        accomplishments = self.get_queryset().filter(
             month=current_month
         )
         
-        serializer = self.get_serializer(accomplishments, many=True)
-        return Response(serializer.data)
+        return self.list_response(accomplishments)
     
     @action(detail=False, methods=['get'])
     def yearly_summary(self, request):
@@ -1904,13 +1934,13 @@ class QIMonthlyAccomplishmentViewSet(viewsets.ModelViewSet):
 # PCA VIEWSETS
 # ============================================
 
-class PCAGoalViewSet(viewsets.ModelViewSet):
+class PCAGoalViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = PCAGoal.objects.all()
     serializer_class = PCAGoalSerializer
     ordering = ['-month']
 
 
-class PCASummaryViewSet(viewsets.ModelViewSet):
+class PCASummaryViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = PCASummary.objects.all()
     serializer_class = PCASummarySerializer
     ordering = ['-month']
@@ -1949,28 +1979,25 @@ class PCASummaryViewSet(viewsets.ModelViewSet):
         else:
             next_month = month_date.replace(month=month_date.month + 1)
         
-        # Get work orders for the month
-        monthly_wos = WorkOrder.objects.filter(
-            date_energized__gte=month_date,
-            date_energized__lt=next_month
+        # Energized counts come from the daily rollups (one aggregate query)
+        energized_in_month = Q(date_field='ENERGIZED', day__gte=month_date, day__lt=next_month)
+        totals = WorkOrderRollupService.totals(
+            energized=('wo_count', energized_in_month),
+            completed=('wo_count', energized_in_month & Q(status='AUDITED')),
+            cancelled=('wo_count', energized_in_month & Q(status='CANCELLED')),
+            ytd_energized=('wo_count', Q(
+                date_field='ENERGIZED', day__year=month_date.year, day__lte=month_date
+            )),
         )
         
-        ytd_energized = WorkOrder.objects.filter(
-            date_energized__year=month_date.year,
-            date_energized__lte=month_date
-        ).count()
-        
-        completed_count = monthly_wos.filter(status='AUDITED').count()
-        cancelled_count = monthly_wos.filter(status='CANCELLED').count()
-        
         # Get or create summary
         summary, created = PCASummary.objects.update_or_create(
             month=month_date,
             defaults={
-                'ytd_energized': ytd_energized,
-                'completed_count': completed_count,
-                'cancelled_count': cancelled_count,
-                'new_work_orders_count': monthly_wos.count()
+                'ytd_energized': totals['ytd_energized'],
+                'completed_count': totals['completed'],
+                'cancelled_count': totals['cancelled'],
+                'new_work_orders_count': totals['energized']
             }
         )
         
@@ -1982,7 +2009,7 @@ class PCASummaryViewSet(viewsets.ModelViewSet):
 # VENDOR PRODUCTIVITY VIEWSETS
 # ============================================
 
-class VendorProductivityMonthlyViewSet(viewsets.ModelViewSet):
+class VendorProductivityMonthlyViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = VendorProductivityMonthly.objects.all()
     serializer_class = VendorProductivityMonthlySerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -1999,12 +2026,11 @@ class VendorProductivityMonthlyViewSet(viewsets.ModelViewSet):
         else:
             month_date = datetime.strptime(month_param, '%Y-%m-%d').date()
         
-        comparison = VendorProductivityMonthly.objects.filter(
+        comparison = self.get_queryset().filter(
             month=month_date
-        ).select_related('vendor').order_by('-productivity_percentage')
+        ).order_by('-productivity_percentage')
         
-        serializer = self.get_serializer(comparison, many=True)
-        return Response(serializer.data)
+        return self.list_response(comparison)
     
     @action(detail=False, methods=['get'])
     def vendor_trend(self, request):
@@ -2033,21 +2059,44 @@ class VendorProductivityMonthlyViewSet(viewsets.ModelViewSet):
 # AGEING ANALYSIS VIEWSETS
 # ============================================
 
-class AgeingAnalysisViewSet(viewsets.ModelViewSet):
+class AgeingAnalysisViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = AgeingAnalysis.objects.all()
     serializer_class = AgeingAnalysisSerializer
+    pagination_class = HighVolumePagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['analysis_date', 'age_bracket', 'supervisor', 'crew']
     ordering = ['-analysis_date', '-age_in_days']
     
+    def perform_create(self, serializer):
+        record = serializer.save()
+        AgeingAnalysisService.summarize(record.analysis_date)
+    
+    def perform_update(self, serializer):
+        previous_date = serializer.instance.analysis_date
+        record = serializer.save()
+        for analysis_date in {previous_date, record.analysis_date}:
+            AgeingAnalysisService.summarize(analysis_date)
+    
+    def perform_destroy(self, instance):
+        analysis_date = instance.analysis_date
+        instance.delete()
+        AgeingAnalysisService.summarize(analysis_date)
+    
     @action(detail=False, methods=['get'])
     def current_analysis(self, request):
-        """Get current ageing analysis"""
-        latest_date = AgeingAnalysis.objects.latest('analysis_date').analysis_date
-        current = AgeingAnalysis.objects.filter(analysis_date=latest_date)
+        """Get current ageing analysis (paginated detail rows of the latest run)"""
+        latest_date = AgeingAnalysisService.latest_run_date()
+        if latest_date is None:
+            return Response(
+                {'error': 'No ageing analysis has been generated yet'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-        serializer = self.get_serializer(current, many=True)
-        return Response(serializer.data)
+        current = self.filter_queryset(
+            self.get_queryset().filter(analysis_date=latest_date)
+        ).select_related('work_order', 'supervisor')
+        
+        return self.list_response(current)
     
     @action(detail=False, methods=['get'])
     def summary_by_bracket(self, request):
@@ -2057,55 +2106,26 @@ class AgeingAnalysisViewSet(viewsets.ModelViewSet):
         if analysis_date:
             date_filter = datetime.strptime(analysis_date, '%Y-%m-%d').date()
         else:
-            date_filter = AgeingAnalysis.objects.latest('analysis_date').analysis_date
+            date_filter = AgeingAnalysisService.latest_run_date()
         
-        summary = AgeingAnalysis.objects.filter(
-            analysis_date=date_filter
-        ).values('age_bracket').annotate(
-            count=Count('id'),
-            total_manhours=Sum('work_order__total_manhours')
-        ).order_by('age_bracket')
+        summary = AgeingAnalysisService.bracket_summary(date_filter)
         
         return Response(summary)
     
     @action(detail=False, methods=['post'])
     def generate_analysis(self, request):
-        """Generate ageing analysis for current work orders"""
+        """Generate ageing analysis for current work orders (replaces an existing run for the date)"""
         analysis_date = timezone.now().date()
-        
-        # Get all open work orders
-        open_wos = WorkOrder.objects.filter(
-            status__in=['NEW', 'FOR AUDIT', 'NO COC']
-        )
-        
-        created_count = 0
-        
-        for wo in open_wos:
-            if wo.date_energized:
-                age_days = (analysis_date - wo.date_energized).days
-                age_months = age_days // 30
-                
-                # Determine age bracket
-                if age_months <= 3:
-                    age_bracket = '0-3'
-                elif age_months <= 6:
-                    age_bracket = '4-6'
-                elif age_months <= 9:
-                    age_bracket = '7-9'
-                else:
-                    age_bracket = '10+'
-                
-                AgeingAnalysis.objects.create(
-                    analysis_date=analysis_date,
-                    work_order=wo,
-                    age_bracket=age_bracket,
-                    age_in_days=age_days,
-                    age_in_months=age_months,
-                    supervisor=wo.supervisor,
-                    crew=wo.assigned_crew,
-                    status_at_analysis=wo.status
+        if request.data.get('analysis_date'):
+            try:
+                analysis_date = datetime.strptime(request.data['analysis_date'], '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                created_count += 1
+        
+        created_count = AgeingAnalysisService.generate(analysis_date)
         
         return Response({
             'message': f'Generated ageing analysis for {created_count} work orders',
@@ -2117,7 +2137,7 @@ class AgeingAnalysisViewSet(viewsets.ModelViewSet):
 # BACKJOB MONITORING VIEWSETS
 # ============================================
 
-class BackjobMonitoringViewSet(viewsets.ModelViewSet):
+class BackjobMonitoringViewSet(PaginatedActionsMixin, QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = BackjobMonitoring.objects.all()
     serializer_class = BackjobMonitoringSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -2128,23 +2148,21 @@ class BackjobMonitoringViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending_backjobs(self, request):
         """Get all pending backjobs"""
-        pending = BackjobMonitoring.objects.filter(
+        pending = self.get_queryset().filter(
             status__in=['PENDING', 'IN_PROGRESS']
         ).order_by('-days_pending')
         
-        serializer = self.get_serializer(pending, many=True)
-        return Response(serializer.data)
+        return self.list_response(pending)
     
     @action(detail=False, methods=['get'])
     def overdue_backjobs(self, request):
         """Get all overdue backjobs"""
-        overdue = BackjobMonitoring.objects.filter(
+        overdue = self.get_queryset().filter(
             is_overdue=True,
             status__in=['PENDING', 'IN_PROGRESS']
         ).order_by('-days_pending')
         
-        serializer = self.get_serializer(overdue, many=True)
-        return Response(serializer.data)
+        return self.list_response(overdue)
     
     @action(detail=True, methods=['post'])
     def resolve(self, request, pk=None):
@@ -2174,18 +2192,35 @@ class BackjobMonitoringViewSet(viewsets.ModelViewSet):
         }
         
         return Response(stats)
+
+
+# ============================================
+# IMPORT JOB VIEWSETS
+# ============================================
+
+class ImportJobViewSet(QuerysetOptimizerMixin, viewsets.ReadOnlyModelViewSet):
+    """Background Excel imports - poll /import-jobs/<id>/ for progress"""
+    queryset = ImportJob.objects.select_related('created_by').all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['import_type', 'status', 'created_by']
+    ordering_fields = ['created_at', 'finished_at']
     
     
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from bisect import bisect_right
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from .models import KPISnapshot, KPITarget
 from .serializers import KPISnapshotSerializer, KPITargetSerializer, KPIDashboardSerializer
 from .kpi_service import KPICalculationService
+from .kpi_cache import KPICacheService
+from .kpi_rollup import WorkOrderRollupService
 
-class KPISnapshotViewSet(viewsets.ModelViewSet):
+class KPISnapshotViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = KPISnapshot.objects.all()
     serializer_class = KPISnapshotSerializer
     
@@ -2210,8 +2245,8 @@ class KPISnapshotViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Calculate all KPIs
-        kpis = KPICalculationService.calculate_all_kpis(period_start, period_end)
+        # Calculate all KPIs (served from cache when the period is unchanged)
+        kpis = KPICacheService.get_all_kpis(period_start, period_end)
         
         # Save snapshots
         snapshots_created = []
@@ -2257,7 +2292,7 @@ class KPISnapshotViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class KPITargetViewSet(viewsets.ModelViewSet):
+class KPITargetViewSet(QuerysetOptimizerMixin, viewsets.ModelViewSet):
     queryset = KPITarget.objects.all()
     serializer_class = KPITargetSerializer
 
@@ -2286,19 +2321,24 @@ class KPIDashboardViewSet(viewsets.ViewSet):
                 request.query_params['period_end'], '%Y-%m-%d'
             ).date()
         
-        # Calculate all KPIs
-        kpis = KPICalculationService.calculate_all_kpis(period_start, period_end)
+        # Calculate all KPIs (served from cache when the period is unchanged)
+        kpis = KPICacheService.get_all_kpis(period_start, period_end)
+        
+        # Get targets (one query; the newest target covering the period wins)
+        kpi_types = ['CCTI', 'PCA_CONVERSION', 'AGEING_COMPLETION', 'TERM_APT', 
+                     'PRDI', 'COST_SETTLEMENT', 'QUALITY_INDEX', 'CAPABILITY_UTIL']
+        latest_targets = {}
+        for target in KPITarget.objects.filter(
+            kpi_type__in=kpi_types,
+            period_start__lte=period_start,
+            period_end__gte=period_end,
+            is_active=True
+        ):
+            latest_targets.setdefault(target.kpi_type, target)
         
-        # Get targets
         targets = {}
-        for kpi_type_key in ['CCTI', 'PCA_CONVERSION', 'AGEING_COMPLETION', 'TERM_APT', 
-                            'PRDI', 'COST_SETTLEMENT', 'QUALITY_INDEX', 'CAPABILITY_UTIL']:
-            target = KPITarget.objects.filter(
-                kpi_type=kpi_type_key,
-                period_start__lte=period_start,
-                period_end__gte=period_end,
-                is_active=True
-            ).first()
+        for kpi_type_key in kpi_types:
+            target = latest_targets.get(kpi_type_key)
             
             targets[kpi_type_key] = {
                 'value': float(target.target_value) if target else None,
@@ -2342,30 +2382,113 @@ class KPIDashboardViewSet(viewsets.ViewSet):
         serializer = KPIDashboardSerializer(dashboard_data)
         return Response(serializer.data)
     
-    def _get_historical_trends(self, current_period_start, months=6):
-        """Get historical KPI trends"""
-        trends = {}
+    MAX_TREND_MONTHS = 60
+    
+    def _get_historical_trends(self, current_period_start, months=6, kpi_types=None):
+        """
+        Get historical KPI trends
         
+        Fetches every snapshot for the window in one range query and buckets
+        them per month in memory; a snapshot counts for a month when its period
+        falls inside it. When a month has several snapshots of one KPI, the one
+        ending last (then calculated last) wins.
+        """
+        windows = []
         for i in range(months):
             month_start = current_period_start - relativedelta(months=i)
             month_end = (month_start + relativedelta(months=1)) - timedelta(days=1)
+            windows.append((month_start, month_end, month_start.strftime('%Y-%m')))
+        
+        trends = {month_key: {} for _, _, month_key in windows}
+        
+        # Oldest first, so bisect can find the window a snapshot starts in
+        windows.reverse()
+        window_starts = [month_start for month_start, _, _ in windows]
+        
+        snapshots = KPISnapshot.objects.filter(
+            period_start__gte=window_starts[0],
+            period_end__lte=windows[-1][1]
+        )
+        if kpi_types:
+            snapshots = snapshots.filter(kpi_type__in=kpi_types)
+        
+        rows = snapshots.order_by('period_end', 'calculated_at').values_list(
+            'kpi_type', 'period_start', 'period_end', 'kpi_value', 'target_value'
+        )
+        for kpi_type, period_start, period_end, kpi_value, target_value in rows:
+            index = bisect_right(window_starts, period_start) - 1
+            month_start, month_end, month_key = windows[index]
+            if period_end > month_end:
+                continue
             
-            snapshots = KPISnapshot.objects.filter(
-                period_start__gte=month_start,
-                period_end__lte=month_end
-            )
-            
-            month_key = month_start.strftime('%Y-%m')
-            trends[month_key] = {}
-            
-            for snapshot in snapshots:
-                trends[month_key][snapshot.kpi_type] = {
-                    'value': float(snapshot.kpi_value),
-                    'target': float(snapshot.target_value) if snapshot.target_value else None
-                }
+            trends[month_key][kpi_type] = {
+                'value': float(kpi_value),
+                'target': float(target_value) if target_value else None
+            }
         
         return trends
     
+    @action(detail=False, methods=['get'])
+    def trends(self, request):
+        """
+        Historical KPI trends
+        
+        Query params: months (default 6, max 60), kpi_type (comma-separated
+        KPI types, default all), period_start (latest month, default current).
+        """
+        try:
+            months = int(request.query_params.get('months', 6))
+        except ValueError:
+            return Response(
+                {'error': 'months must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 1 <= months <= self.MAX_TREND_MONTHS:
+            return Response(
+                {'error': f'months must be between 1 and {self.MAX_TREND_MONTHS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        kpi_types = None
+        if request.query_params.get('kpi_type'):
+            kpi_types = [value.strip() for value in request.query_params['kpi_type'].split(',') if value.strip()]
+            valid_types = [choice for choice, _ in KPISnapshot.KPI_TYPE_CHOICES]
+            invalid_types = [value for value in kpi_types if value not in valid_types]
+            if invalid_types:
+                return Response(
+                    {'error': f'Invalid KPI type. Choose from: {", ".join(valid_types)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        period_start = datetime.now().date().replace(day=1)
+        if request.query_params.get('period_start'):
+            try:
+                period_start = datetime.strptime(
+                    request.query_params['period_start'], '%Y-%m-%d'
+                ).date()
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        trends = self._get_historical_trends(period_start, months, kpi_types)
+        
+        # Chart-ready series, oldest month first
+        month_keys = list(reversed(list(trends.keys())))
+        series_types = kpi_types or sorted({kpi_type for month in trends.values() for kpi_type in month})
+        series = {
+            kpi_type: [trends[month_key].get(kpi_type, {}).get('value') for month_key in month_keys]
+            for kpi_type in series_types
+        }
+        
+        return Response({
+            'months': month_keys,
+            'trends': trends,
+            'series': series
+        })
+    
     def _prepare_chart_data(self, current_kpis, historical_trends):
         """Prepare data formatted for charts"""
         return {
@@ -2428,7 +2551,7 @@ class KPIDashboardViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        kpi_data = kpi_methods[kpi_type](period_start, period_end)
+        kpi_data = KPICacheService.get_kpi(kpi_type, period_start, period_end, kpi_methods[kpi_type])
 
         return Response({
             'kpi_type': kpi_type,
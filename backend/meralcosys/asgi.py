@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meralcosys.settings')
 
 application = get_asgi_application()
+
+from meralcoapp.model_loading import warmup_from_settings  # noqa: E402
+
+warmup_from_settings()
@@ -17,6 +17,70 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ML_MODELS_PATH = os.path.join(BASE_DIR, 'ml_models', 'ml_models.pkl')
 CHATBOT_CONFIG_PATH = os.path.join(BASE_DIR, 'ml_models', 'knowledge_base.json')
+# Knowledge base embeddings are persisted here (memory-mapped .npy per model and KB
+# version) so a start only encodes new or edited questions; None re-encodes every time
+CHATBOT_EMBEDDINGS_DIR = os.path.join(BASE_DIR, 'ml_models', 'embeddings')
+
+# The ML and chatbot models load on first use. The WSGI/ASGI entry points warm them
+# up: 'background' (worker serves at once, models load in a thread), 'blocking'
+# (worker starts once they are loaded) or 'off' (first request loads them; use with
+# gunicorn --preload and call model_loading.warmup() in post_fork).
+MODEL_WARMUP = 'background'
+
+# Optional shared model server (`manage.py run_inference_server`). When INFERENCE_SOCKET
+# is set, the prediction and chat endpoints call it over this Unix socket and web
+# workers never load the models themselves. The server groups requests arriving within
+# INFERENCE_BATCH_WINDOW_MS into one model call of up to INFERENCE_MAX_BATCH items.
+INFERENCE_SOCKET = None  # e.g. '/run/meralcosys/inference.sock'
+INFERENCE_TIMEOUT = 30  # seconds
+INFERENCE_BATCH_WINDOW_MS = 5
+INFERENCE_MAX_BATCH = 512
+
+# KPI engine: 'rollup' (sums work_order_daily_rollups, falls back to work_orders for
+# per-WO detail KPIs), 'vectorized' (single pass over work_orders) or 'queryset'
+# (one query set per KPI). Rebuild rollups with `manage.py rebuild_work_order_rollups`.
+KPI_ENGINE = 'rollup'
+
+# Caching - local memory by default. Point 'default' (or add a 'kpi' alias) at
+# Redis/Memcached in production so KPI cache invalidation is shared by all workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'meralcosys-default',
+    }
+}
+KPI_CACHE_TIMEOUT = 300  # seconds
+
+# Background Excel imports: 'thread' runs jobs in a pool inside each web process,
+# 'worker' leaves them for `manage.py run_import_worker`
+IMPORT_JOB_RUNNER = 'thread'
+IMPORT_JOB_WORKERS = 2
+# RUNNING jobs without a progress write for this long are requeued (their
+# process died); picked up by the worker loop, or by the next upload in 'thread' mode
+IMPORT_JOB_STALE_MINUTES = 30
+
+# Rows fetched per round trip by the streaming exports (?format=xlsx|csv|parquet)
+EXPORT_CHUNK_SIZE = 2000
+
+# Dashboard stats are served from cache and refreshed in the background once
+# older than DASHBOARD_STATS_TTL seconds; the per-table queries run on up to
+# DASHBOARD_QUERY_WORKERS threads. Each thread keeps one DB connection open
+# across tasks and pings it before reuse once it was idle for more than
+# DASHBOARD_CONNECTION_IDLE_CHECK seconds.
+DASHBOARD_STATS_TTL = 60
+DASHBOARD_QUERY_WORKERS = 8
+DASHBOARD_CONNECTION_IDLE_CHECK = 60
+
+# Per-request SQL instrumentation (meralcoapp.query_budget.QueryBudgetMiddleware):
+# X-DB-Queries / X-DB-Time headers in DEBUG, a warning when a request runs more
+# queries than its endpoint's budget in QUERY_BUDGET_FILE, and a possible-N+1
+# warning when one query shape repeats QUERY_BUDGET_DUPLICATE_THRESHOLD+ times.
+# meralcoapp/tests.py enforces the same file.
+QUERY_BUDGET_FILE = os.path.join(BASE_DIR, 'meralcoapp', 'query_budgets.json')
+QUERY_BUDGET_DUPLICATE_THRESHOLD = 5
+
+# Tests create the unmanaged tables too (see meralcoapp/test_runner.py)
+TEST_RUNNER = 'meralcoapp.test_runner.ManagedModelTestRunner'
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -123,6 +187,7 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # ← must be first
+    'meralcoapp.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meralcosys.settings')
 
 application = get_wsgi_application()
+
+from meralcoapp.model_loading import warmup_from_settings  # noqa: E402
+
+warmup_from_settings()